@@ -0,0 +1,124 @@
+"""Paso de build: precomprimir assets de texto y generar variantes WebP/AVIF.
+
+Genera junto a cada archivo sus variantes (style.css.br, style.css.gz,
+fondo2.png.webp, fondo2.png.avif) para que PrecompressedStaticFiles las sirva
+sin comprimir en tiempo de request. Solo se guardan variantes más chicas que el
+original y se regeneran cuando el original es más nuevo.
+
+    cd backend && python build_assets.py static
+"""
+import argparse
+import gzip
+import io
+import os
+import sys
+
+from compression import TEXT_EXTENSIONS, IMAGE_EXTENSIONS
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import pillow_avif  # noqa: F401  (registra el encoder AVIF en Pillow)
+except ImportError:
+    pillow_avif = None
+
+WEBP_QUALITY = 80
+AVIF_QUALITY = 60
+
+
+def is_fresh(source, target):
+    return os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source)
+
+
+def write_if_smaller(source, target, data):
+    if len(data) >= os.path.getsize(source):
+        return False
+    with open(target, "wb") as f:
+        f.write(data)
+    return True
+
+
+def build_text_variants(path):
+    built = []
+    with open(path, "rb") as f:
+        data = f.read()
+    if not is_fresh(path, path + ".gz"):
+        if write_if_smaller(path, path + ".gz", gzip.compress(data, compresslevel=9, mtime=0)):
+            built.append(".gz")
+    if brotli is not None and not is_fresh(path, path + ".br"):
+        if write_if_smaller(path, path + ".br", brotli.compress(data, quality=11)):
+            built.append(".br")
+    return built
+
+
+def encode_image(image, image_format, quality):
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, quality=quality)
+    return buffer.getvalue()
+
+
+def build_image_variants(path):
+    if Image is None:
+        return []
+    built = []
+    with Image.open(path) as image:
+        image.load()
+        for extension, image_format, quality in ((".webp", "WEBP", WEBP_QUALITY), (".avif", "AVIF", AVIF_QUALITY)):
+            target = path + extension
+            if is_fresh(path, target):
+                continue
+            try:
+                data = encode_image(image, image_format, quality)
+            except (KeyError, OSError, ValueError):
+                # Pillow sin soporte para este formato (ej. AVIF sin pillow-avif-plugin)
+                continue
+            if write_if_smaller(path, target, data):
+                built.append(extension)
+    return built
+
+
+def build_assets(directory):
+    total = 0
+    for root, _, files in os.walk(directory):
+        for filename in files:
+            path = os.path.join(root, filename)
+            extension = os.path.splitext(filename)[1].lower()
+            if extension in TEXT_EXTENSIONS:
+                built = build_text_variants(path)
+            elif extension in IMAGE_EXTENSIONS:
+                built = build_image_variants(path)
+            else:
+                continue
+            if built:
+                total += len(built)
+                print(f"✅ {path}: {', '.join(built)}")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precomprimir assets estáticos de Ares Club")
+    parser.add_argument("directory", nargs="?", default="static")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        print(f"⚠️  No existe el directorio {args.directory}, nada que precomprimir")
+        return 0
+    if brotli is None:
+        print("⚠️  brotli no está instalado: solo se generan variantes .gz")
+    if Image is None:
+        print("⚠️  Pillow no está instalado: no se generan variantes WebP/AVIF")
+    total = build_assets(args.directory)
+    print(f"📦 {total} variantes generadas en {args.directory}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
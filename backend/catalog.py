@@ -0,0 +1,196 @@
+"""Catálogo de juegos, promociones, métodos de pago y preguntas frecuentes.
+
+Los índices (id, proveedor, categoría) se construyen una sola vez al importar
+el módulo, así que las búsquedas no recorren las listas completas.
+"""
+from itertools import combinations
+
+
+class Catalog:
+    """Lista de entradas indexada por id y por cada combinación de campos de filtrado"""
+
+    def __init__(self, items, key="id", indexed_fields=()):
+        self.key = key
+        self.indexed_fields = tuple(sorted(indexed_fields))
+        self._listeners = []
+        self._build(items)
+
+    def _build(self, items):
+        self.items = list(items)
+        self.by_id = {item[self.key]: item for item in self.items}
+        # Un índice por combinación de campos: un filtro combinado es un solo lookup
+        self.indexes = {}
+        for size in range(1, len(self.indexed_fields) + 1):
+            for fields in combinations(self.indexed_fields, size):
+                index = self.indexes[fields] = {}
+                for item in self.items:
+                    values = tuple(item.get(field) for field in fields)
+                    if None not in values:
+                        index.setdefault(tuple(self.normalize(v) for v in values), []).append(item)
+
+    def replace(self, items):
+        """Reemplazar el contenido, reconstruir los índices y avisar a los suscriptores"""
+        self._build(items)
+        for callback in self._listeners:
+            callback()
+
+    def subscribe(self, callback):
+        """Registrar una función a llamar cada vez que cambie el catálogo"""
+        self._listeners.append(callback)
+
+    @staticmethod
+    def normalize(value):
+        return str(value).strip().casefold()
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, item_id):
+        return self.by_id.get(item_id)
+
+    def values(self, field):
+        """Valores distintos de un campo indexado (para armar filtros en el frontend)"""
+        return sorted({item[field] for item in self.items if item.get(field) is not None})
+
+    def filter(self, **criteria):
+        """Entradas que cumplen todos los criterios, en el orden del catálogo"""
+        criteria = {field: value for field, value in criteria.items() if value is not None}
+        if not criteria:
+            return self.items
+        fields = tuple(sorted(criteria))
+        values = tuple(self.normalize(criteria[field]) for field in fields)
+        return self.indexes[fields].get(values, [])
+
+
+def paginate(items, offset=0, limit=None):
+    if limit is None:
+        return items[offset:]
+    return items[offset:offset + limit]
+
+
+# Juegos disponibles
+GAMES = [
+    {
+        "id": 1,
+        "name": "Volcano Rising",
+        "provider": "RubyPlay",
+        "image": "https://images.pexels.com/photos/2258536/pexels-photo-2258536.jpeg?auto=compress&cs=tinysrgb&w=400",
+        "category": "slots",
+        "description": "Una aventura volcánica llena de premios ardientes"
+    },
+    {
+        "id": 2,
+        "name": "Sweet Bonanza 1000",
+        "provider": "Pragmatic Play",
+        "image": "https://images.pexels.com/photos/1191710/pexels-photo-1191710.jpeg?auto=compress&cs=tinysrgb&w=400",
+        "category": "slots",
+        "description": "Dulces premios te esperan en esta deliciosa tragamonedas"
+    },
+    {
+        "id": 3,
+        "name": "Reactoonz",
+        "provider": "Play n' Go",
+        "image": "https://images.pexels.com/photos/163064/play-stone-network-networked-interactive-163064.jpeg?auto=compress&cs=tinysrgb&w=400",
+        "category": "slots",
+        "description": "Alienígenas divertidos con grandes multiplicadores"
+    },
+    {
+        "id": 4,
+        "name": "Book of Dead",
+        "provider": "Play n' Go",
+        "image": "https://images.pexels.com/photos/256541/pexels-photo-256541.jpeg?auto=compress&cs=tinysrgb&w=400",
+        "category": "slots",
+        "description": "Explora el antiguo Egipto en busca de tesoros"
+    },
+    {
+        "id": 5,
+        "name": "Zeus Rush Fever Deluxe",
+        "provider": "RubyPlay",
+        "image": "https://images.pexels.com/photos/2258536/pexels-photo-2258536.jpeg?auto=compress&cs=tinysrgb&w=400",
+        "category": "slots",
+        "description": "El poder de Zeus en tus manos para grandes premios"
+    },
+    {
+        "id": 6,
+        "name": "Wolf Gold",
+        "provider": "Pragmatic Play",
+        "image": "https://images.pexels.com/photos/1118873/pexels-photo-1118873.jpeg?auto=compress&cs=tinysrgb&w=400",
+        "category": "slots",
+        "description": "Caza junto a los lobos por el oro más preciado"
+    }
+]
+
+# Promociones y bonos
+PROMOTIONS = [
+    {
+        "id": 1,
+        "title": "Bono de Bienvenida",
+        "description": "Los nuevos jugadores son recibidos con un bono del 20% más en tu primer carga!",
+        "type": "welcome_bonus",
+        "percentage": 20,
+        "active": True
+    },
+    {
+        "id": 2,
+        "title": "Eventos Especiales",
+        "description": "Participa en eventos especiales donde puedes ganar recompensas y premios exclusivos.",
+        "type": "special_events",
+        "active": True
+    }
+]
+
+# Métodos de pago
+PAYMENT_METHODS = [
+    {"name": "Visa", "type": "card", "icon": "💳", "image": "https://images.pexels.com/photos/164501/pexels-photo-164501.jpeg?auto=compress&cs=tinysrgb&w=200"},
+    {"name": "Mastercard", "type": "card", "icon": "💳", "image": "https://images.pexels.com/photos/164501/pexels-photo-164501.jpeg?auto=compress&cs=tinysrgb&w=200"},
+    {"name": "Transferencia Bancaria", "type": "bank", "icon": "🏦", "image": "https://images.pexels.com/photos/259027/pexels-photo-259027.jpeg?auto=compress&cs=tinysrgb&w=200"},
+    {"name": "E-Wallets", "type": "ewallet", "icon": "📱", "image": "https://images.pexels.com/photos/4386321/pexels-photo-4386321.jpeg?auto=compress&cs=tinysrgb&w=200"}
+]
+
+
+# Preguntas frecuentes
+FAQ = [
+    {
+        "id": 1,
+        "question": "¿Es Ares Club seguro?",
+        "answer": "Sí, Ares Club es seguro para todos los jugadores. El sitio utiliza tecnología de cifrado avanzada para proteger tu información personal y financiera.",
+        "category": "security"
+    },
+    {
+        "id": 2,
+        "question": "¿Cuanto tiempo demora hacer mi usuario?",
+        "answer": "Los usuarios se crean al instante que lo solicitas.",
+        "category": "account"
+    },
+    {
+        "id": 3,
+        "question": "¿Cuánto tardan los retiros?",
+        "answer": "Los retiros son en el momento que lo solicitas.",
+        "category": "payments"
+    },
+    {
+        "id": 4,
+        "question": "¿Hay política de reembolsos?",
+        "answer": "Sí, la plataforma tiene una política de reembolsos. Puedes contactar al soporte al cliente para recibir asistencia.",
+        "category": "policies"
+    },
+    {
+        "id": 5,
+        "question": "¿Hay códigos promocionales?",
+        "answer": "Los jugadores nuevos y existentes pueden aprovechar los bonos y promociones regulares disponibles en el sitio.",
+        "category": "promotions"
+    },
+    {
+        "id": 6,
+        "question": "¿Cuanto demoran las recargas?",
+        "answer": "Las recargas son en el momento apenas impacte el deposito que solicitas.",
+        "category": "payments"
+    }
+]
+
+games_catalog = Catalog(GAMES, indexed_fields=("provider", "category"))
+promotions_catalog = Catalog(PROMOTIONS, indexed_fields=("type",))
+
+
+def active_promotions():
+    return [p for p in promotions_catalog.items if p.get("active", True)]
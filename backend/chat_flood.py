@@ -0,0 +1,166 @@
+"""Control de flood del chat: límites por conexión e IP, duplicados y ráfagas.
+
+- ChatFloodControl decide si se acepta un mensaje entrante: longitud máxima,
+  token bucket por sid y por IP (solo volumen), y supresión del mismo texto
+  repetido en una sala dentro de una ventana. Los duplicados no se cuentan
+  por IP: detrás de un NAT o un proxy muchos visitantes comparten IP y
+  escriben lo mismo ("hola").
+- BroadcastCoalescer agrupa los emits: el primer mensaje a una sala destino
+  sale en el acto y lo que llega a esa sala dentro de la ventana siguiente se
+  emite junto en un solo `new_messages`, así una ráfaga no se multiplica por
+  cada cliente conectado. La ventana es por sala: la ráfaga de una
+  conversación no demora los mensajes de las demás.
+"""
+import asyncio
+import os
+import time
+from collections import Counter, OrderedDict
+
+from rate_limit import KeyedRateLimiter
+
+# Motivos de rechazo (claves de las métricas)
+TOO_LONG = "too_long"
+THROTTLED_SID = "throttled_sid"
+THROTTLED_IP = "throttled_ip"
+DUPLICATE = "duplicate"
+
+
+class ChatFloodControl:
+    def __init__(self, max_length=1000, sid_rate=1.0, sid_burst=5, ip_rate=5.0, ip_burst=20, duplicate_window=30.0,
+                 max_keys=10000):
+        self.max_length = max_length
+        self.sid_limiter = KeyedRateLimiter(rate=sid_rate, capacity=sid_burst, max_keys=max_keys)
+        self.ip_limiter = KeyedRateLimiter(rate=ip_rate, capacity=ip_burst, max_keys=max_keys)
+        self.duplicate_window = duplicate_window
+        self.max_keys = max_keys
+        # (sala o sid, texto normalizado) -> momento del último envío
+        self._recent = OrderedDict()
+        self.accepted = 0
+        self.rejected = Counter()
+
+    def check(self, sid, ip, message, room=None, now=None):
+        """None si el mensaje se acepta, si no el motivo del rechazo
+
+        room: sala del remitente, para los duplicados; None los cuenta por conexión.
+        """
+        reason = self._reason(sid, ip, room or sid, message, time.monotonic() if now is None else now)
+        if reason is None:
+            self.accepted += 1
+        else:
+            self.rejected[reason] += 1
+        return reason
+
+    def _reason(self, sid, ip, sender, message, now):
+        if len(message) > self.max_length:
+            return TOO_LONG
+        # Los duplicados no consumen tokens: se descartan antes
+        key = (sender, " ".join(message.lower().split()))
+        sent_at = self._recent.get(key)
+        if sent_at is not None and now - sent_at < self.duplicate_window:
+            return DUPLICATE
+        if not self.sid_limiter.allow(sid):
+            return THROTTLED_SID
+        if not self.ip_limiter.allow(ip):
+            return THROTTLED_IP
+
+        self._recent[key] = now
+        self._recent.move_to_end(key)
+        while len(self._recent) > self.max_keys:
+            self._recent.popitem(last=False)
+        return None
+
+    def forget(self, sid):
+        """Liberar el bucket de una conexión cerrada"""
+        self.sid_limiter.forget(sid)
+
+    def stats(self):
+        return {
+            "accepted": self.accepted,
+            "rejected": dict(self.rejected),
+            "max_length": self.max_length,
+            "sid_limiter": self.sid_limiter.stats(),
+            "ip_limiter": self.ip_limiter.stats(),
+        }
+
+
+class BroadcastCoalescer:
+    """Emite el primer mensaje de una sala al instante y agrupa los que llegan
+    a esa misma sala dentro de `window`; cada sala tiene su propia ventana"""
+
+    def __init__(self, emit, window=0.05, max_batch=50):
+        # emit(event, data, room=...) -> awaitable (sio.emit)
+        self.emit = emit
+        self.window = window
+        self.max_batch = max_batch
+        # Por destino (sala o tupla de salas): mensajes sin emitir, flush
+        # programado y último emit (solo los de la última ventana)
+        self._pending = {}
+        self._flushers = {}
+        self._last_emit = OrderedDict()
+
+        self.messages = 0
+        self.emits = 0
+        self.coalesced = 0
+
+    async def publish(self, message, room=None):
+        """Emitir `message` a `room` (sala, tupla de salas o None = todos)"""
+        self._pending.setdefault(room, []).append(message)
+        self.messages += 1
+        if room in self._flushers:
+            return
+        wait = self._last_emit.get(room, 0.0) + self.window - time.monotonic()
+        if wait <= 0:
+            await self._flush_room(room)
+        else:
+            self._flushers[room] = asyncio.create_task(self._flush_later(room, wait))
+
+    async def _flush_later(self, room, delay):
+        await asyncio.sleep(delay)
+        del self._flushers[room]
+        await self._flush_room(room)
+
+    async def flush(self):
+        for room in list(self._pending):
+            await self._flush_room(room)
+
+    async def _flush_room(self, room):
+        self._mark_emit(room)
+        while room in self._pending:
+            messages = self._pending.pop(room)
+            for start in range(0, len(messages), self.max_batch):
+                batch = messages[start:start + self.max_batch]
+                self.emits += 1
+                if len(batch) == 1:
+                    await self.emit('new_message', batch[0], room=room)
+                else:
+                    self.coalesced += len(batch)
+                    await self.emit('new_messages', batch, room=room)
+
+    def _mark_emit(self, room):
+        now = time.monotonic()
+        self._last_emit[room] = now
+        self._last_emit.move_to_end(room)
+        # Una sala sin emits dentro de la ventana ya no necesita recordarse
+        while self._last_emit and now - next(iter(self._last_emit.values())) >= self.window:
+            self._last_emit.popitem(last=False)
+
+    def stats(self):
+        return {
+            "messages": self.messages,
+            "emits": self.emits,
+            "coalesced_messages": self.coalesced,
+            "pending": sum(len(messages) for messages in self._pending.values()),
+            "rooms": len(self._last_emit),
+        }
+
+
+chat_flood = ChatFloodControl(
+    max_length=int(os.getenv("CHAT_MAX_MESSAGE_LENGTH", "1000")),
+    sid_rate=float(os.getenv("CHAT_MESSAGES_PER_SECOND", "1")),
+    sid_burst=int(os.getenv("CHAT_MESSAGE_BURST", "5")),
+    ip_rate=float(os.getenv("CHAT_MESSAGES_PER_SECOND_PER_IP", "5")),
+    ip_burst=int(os.getenv("CHAT_MESSAGE_BURST_PER_IP", "20")),
+    duplicate_window=float(os.getenv("CHAT_DUPLICATE_WINDOW", "30")),
+)
+
+BROADCAST_WINDOW = float(os.getenv("CHAT_BROADCAST_WINDOW", "0.05"))
@@ -0,0 +1,130 @@
+"""Buffer circular en memoria con los últimos mensajes del chat.
+
+Se siembra desde la base al iniciar y se alimenta con cada mensaje emitido, así
+que abrir el chat no consulta Postgres. Las páginas más viejas que lo que
+guarda el buffer se piden a la base (ver query_chat_messages en server.py).
+
+chat_history guarda todas las salas (lo que ve el lobby de admins) y
+chat_rooms un buffer más chico por sala de visitante.
+"""
+import os
+from collections import OrderedDict, deque
+
+
+class ChatHistory:
+    def __init__(self, capacity=500):
+        self.capacity = capacity
+        self._messages = deque()
+        self._ids = set()
+        # True si el buffer contiene todos los mensajes que existen (no hay más viejos en la base)
+        self._complete = False
+        self.hits = 0
+        self.misses = 0
+
+    def seed(self, messages):
+        """Cargar los mensajes más recientes (ordenados por id ascendente)"""
+        self._messages.clear()
+        self._ids.clear()
+        for message in messages[-self.capacity:]:
+            self._messages.append(message)
+            self._ids.add(message["id"])
+        self._complete = len(messages) < self.capacity
+
+    def append(self, message):
+        """Agregar un mensaje nuevo; ignora duplicados (mismo id)"""
+        message_id = message.get("id")
+        if message_id is None or message_id in self._ids:
+            return
+        if self._messages and message_id < self._messages[-1]["id"]:
+            # Commits concurrentes pueden llegar desordenados: insertar en su lugar
+            if len(self._messages) == self.capacity and message_id < self._messages[0]["id"]:
+                return
+            self._messages = deque(sorted([*self._messages, message], key=lambda m: m["id"]))
+        else:
+            self._messages.append(message)
+        self._ids.add(message_id)
+        if len(self._messages) > self.capacity:
+            self._ids.discard(self._messages.popleft()["id"])
+            self._complete = False
+
+    def page(self, before_id=None, limit=50):
+        """Hasta `limit` mensajes anteriores a `before_id`, o None si hay que ir a la base"""
+        page = []
+        for message in reversed(self._messages):
+            if before_id is not None and message["id"] >= before_id:
+                continue
+            page.append(message)
+            if len(page) == limit:
+                break
+        if len(page) < limit and not self._complete:
+            self.misses += 1
+            return None
+        self.hits += 1
+        page.reverse()
+        return page
+
+    def since(self, last_id):
+        """Mensajes con id > last_id, o None si el buffer ya no llega tan atrás"""
+        # El buffer guarda siempre los N más recientes: si su mensaje más viejo es
+        # anterior o igual a last_id, todo lo posterior está en memoria
+        if not self._complete and (not self._messages or self._messages[0]["id"] > last_id):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [message for message in self._messages if message["id"] > last_id]
+
+    def buffered(self, after_id=None, before_id=None):
+        """Mensajes en memoria entre after_id y before_id (exclusivos), aunque falten
+        los más viejos: sirve para completar lo que se lee de la base"""
+        return [message for message in self._messages
+                if (after_id is None or message["id"] > after_id)
+                and (before_id is None or message["id"] < before_id)]
+
+    def stats(self):
+        return {
+            "size": len(self._messages),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class RoomHistories:
+    """Un ChatHistory por sala; se desalojan las salas menos usadas (LRU)"""
+
+    def __init__(self, capacity=100, max_rooms=1000):
+        self.capacity = capacity
+        self.max_rooms = max_rooms
+        self._rooms = OrderedDict()
+
+    def get(self, room):
+        # Una sala nueva arranca vacía e incompleta: sus páginas van a la base
+        # hasta que el buffer acumule suficientes mensajes
+        history = self._rooms.get(room)
+        if history is None:
+            history = self._rooms[room] = ChatHistory(self.capacity)
+            if len(self._rooms) > self.max_rooms:
+                self._rooms.popitem(last=False)
+        else:
+            self._rooms.move_to_end(room)
+        return history
+
+    def append(self, message):
+        if message.get("room"):
+            self.get(message["room"]).append(message)
+
+    def stats(self):
+        return {
+            "rooms": len(self._rooms),
+            "max_rooms": self.max_rooms,
+            "capacity": self.capacity,
+            "hits": sum(history.hits for history in self._rooms.values()),
+            "misses": sum(history.misses for history in self._rooms.values()),
+        }
+
+
+chat_history = ChatHistory(capacity=int(os.getenv("CHAT_HISTORY_SIZE", "500")))
+chat_rooms = RoomHistories(
+    capacity=int(os.getenv("CHAT_ROOM_HISTORY_SIZE", "100")),
+    max_rooms=int(os.getenv("CHAT_ROOM_HISTORY_ROOMS", "1000")),
+)
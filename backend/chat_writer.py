@@ -0,0 +1,322 @@
+"""Persistencia write-behind de los mensajes del chat.
+
+El mensaje se emite apenas llega, con un id asignado por el servidor, y se
+escribe después en lotes:
+
+- ChatIdAllocator genera los ids en el proceso, sin ir a la base: emitir no
+  espera a un nextval ni a un INSERT, y si la base está caída el mensaje se
+  emite igual y va al spool.
+- ChatWriter vuelca la cola en orden FIFO (= orden de id dentro del worker),
+  reintenta con backoff si la base falla y, si sigue fallando o la cola se
+  llena, agrega las filas a un spool en disco (JSON lines) que se vuelve a
+  insertar al iniciar y después de cada lote exitoso. Los INSERT ignoran ids
+  ya existentes, así que reintentar o re-aplicar el spool es idempotente; las
+  filas que la base descarta por id repetido se cuentan en `conflicts` (y se
+  loguean), no en `written`.
+
+Los ids son milisegundos desde 2026-01-01, una secuencia dentro del
+milisegundo y el slot del worker (40 + 5 + 8 = 53 bits, lo que entra en un
+Number de JavaScript). Dentro de un worker crecen siempre, aunque el reloj
+retroceda. Entre workers siguen el reloj de cada uno, así que el orden de los
+ids no garantiza el orden en que se emitieron: un mensaje de otro worker
+puede llegar con un id apenas menor al último que vio el cliente (reloj
+atrasado o demora en el bus). Por eso el sync por delta re-envía desde
+CHAT_SYNC_OVERLAP_MS antes de last_id (ver sync_floor) y el cliente descarta
+los ids que ya tiene.
+El slot sale de una secuencia de Postgres al iniciar (uno distinto por worker
+mientras haya menos de 256 vivos); sin base se elige al azar y una colisión
+se vería en `conflicts`. SQLite no tiene cómo repartir slots: con varios
+procesos se rechaza.
+"""
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from sqlalchemy import text
+
+from database import engine, run_db, ChatMessage
+
+
+def shared_chat():
+    """Varios procesos emiten al mismo chat (message queue o varios workers)"""
+    queue = os.getenv("SOCKETIO_MESSAGE_QUEUE", "")
+    # memory:// solo conecta servidores dentro de un mismo proceso
+    return bool(queue) and not queue.startswith("memory://") or int(os.getenv("WEB_CONCURRENCY") or "1") > 1
+
+
+def chat_insert(db):
+    """INSERT de chat_messages que ignora ids repetidos y devuelve los insertados"""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    table = ChatMessage.__table__
+    return insert(table).on_conflict_do_nothing(index_elements=["id"]).returning(table.c.id)
+
+
+# Bits de cada parte del id: milisegundos | secuencia | slot
+SEQUENCE_BITS = 5
+SLOT_BITS = 8
+CHAT_ID_EPOCH_MS = 1767225600000  # 2026-01-01 UTC
+
+
+class ChatIdAllocator:
+    """Genera ids de chat_messages ordenados por tiempo, sin consultar la base"""
+
+    def __init__(self, slot=0, clock=time.time):
+        self.slot = slot
+        self._clock = clock
+        self._last_ms = 0
+        self._sequence = 0
+        # Veces que se adelantó el milisegundo (secuencia agotada o reloj que retrocede)
+        self.borrowed_ms = 0
+
+    def next_id(self):
+        now_ms = int(self._clock() * 1000) - CHAT_ID_EPOCH_MS
+        if now_ms > self._last_ms:
+            self._last_ms, self._sequence = now_ms, 0
+        else:
+            self._sequence += 1
+            if self._sequence >> SEQUENCE_BITS:
+                self._last_ms += 1
+                self._sequence = 0
+                self.borrowed_ms += 1
+        return (self._last_ms << SEQUENCE_BITS | self._sequence) << SLOT_BITS | self.slot
+
+    async def claim_slot(self):
+        """Tomar el slot de este worker; sin base (o sin la migración 0003) uno al azar"""
+        if engine.dialect.name != "postgresql":
+            if shared_chat():
+                raise RuntimeError("SQLite no puede repartir ids de chat entre varios procesos: usar Postgres "
+                                   "o un solo worker sin SOCKETIO_MESSAGE_QUEUE")
+            self.slot = 0
+            return self.slot
+        try:
+            self.slot = await run_db(self._claim_slot)
+        except Exception as e:
+            self.slot = random.randrange(1 << SLOT_BITS)
+            print(f"⚠️ Slot de ids de chat elegido al azar ({self.slot}): {e}")
+        return self.slot
+
+    @staticmethod
+    def _claim_slot(db):
+        return db.execute(text("SELECT nextval('chat_id_slots')")).scalar() % (1 << SLOT_BITS)
+
+
+def sync_floor(last_id):
+    """Id desde el que re-enviar al sincronizar: last_id menos el margen entre workers"""
+    return max(last_id - (CHAT_SYNC_OVERLAP_MS << (SEQUENCE_BITS + SLOT_BITS)), 0)
+
+
+class ChatWriter:
+    """Cola write-behind de filas de chat_messages con reintentos y spool en disco"""
+
+    def __init__(self, flush_size=200, flush_interval=0.05, max_pending=10000, retries=3, retry_backoff=0.2,
+                 spool_path="chat_spool.jsonl"):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.spool_path = spool_path
+
+        self._pending = deque()
+        # Filas que no entraron en la cola, esperando a que un hilo las escriba en el spool
+        self._overflow = []
+        self._overflow_task = None
+        # Serializa los appends al spool (en hilos) con el rename del replay
+        self._spool_lock = threading.Lock()
+        self._wakeup = None
+        self._flush_lock = None
+        self._task = None
+
+        self.enqueued = 0
+        self.written = 0
+        self.retried = 0
+        self.spooled = 0
+        self.replayed = 0
+        self.conflicts = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+    # Productores
+    def write(self, row):
+        """Encolar una fila (con id ya asignado) sin tocar la base"""
+        if len(self._pending) >= self.max_pending:
+            # Base caída demasiado tiempo: no perder el mensaje, mandarlo al spool
+            # desde un hilo (el fsync no bloquea el event loop)
+            self._overflow.append(row)
+            if self._overflow_task is None:
+                self._overflow_task = asyncio.get_running_loop().create_task(self._spool_overflow())
+            return
+        self._pending.append(row)
+        self.enqueued += 1
+        if len(self._pending) >= self.flush_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    # Consumidor
+    async def start(self):
+        """Re-aplicar el spool pendiente y arrancar el flusher"""
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            await self.replay_spool()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Detener el flusher y volcar lo pendiente (a la base o al spool)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self._overflow_task is not None:
+            await self._overflow_task
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            while self._pending:
+                batch = [self._pending.popleft() for _ in range(min(self.flush_size, len(self._pending)))]
+                started = time.perf_counter()
+                inserted = await self._write_with_retry(batch)
+                if inserted is not None:
+                    self._count_conflicts(batch, inserted)
+                    if self.spooled > self.replayed:
+                        await self.replay_spool()
+                else:
+                    await self._spool(batch)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                self.flushes += 1
+                self.last_flush_ms = elapsed_ms
+                self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+
+    async def _write_with_retry(self, batch):
+        """Ids insertados, o None si la base sigue fallando"""
+        for attempt in range(self.retries + 1):
+            try:
+                return await run_db(self._insert_rows, batch)
+            except Exception as e:
+                print(f"Error guardando {len(batch)} mensajes de chat (intento {attempt + 1}): {e}")
+                if attempt < self.retries:
+                    self.retried += 1
+                    await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+        return None
+
+    def _count_conflicts(self, rows, inserted):
+        inserted = set(inserted)
+        self.written += len(inserted)
+        dropped = [row["id"] for row in rows if row["id"] not in inserted]
+        if dropped:
+            self.conflicts += len(dropped)
+            print(f"⚠️ {len(dropped)} mensajes de chat descartados por id repetido: {dropped[:10]}")
+
+    @staticmethod
+    def _insert_rows(db, rows):
+        inserted = db.execute(chat_insert(db), rows).scalars().all()
+        db.commit()
+        return inserted
+
+    # Spool en disco
+    async def _spool(self, rows):
+        await asyncio.to_thread(self._append_spool, rows)
+        self.spooled += len(rows)
+
+    async def _spool_overflow(self):
+        # Lo que llega mientras un hilo escribe va en el próximo append (un fsync por tanda)
+        try:
+            while self._overflow:
+                rows, self._overflow = self._overflow, []
+                try:
+                    await self._spool(rows)
+                except Exception as e:
+                    print(f"❌ {len(rows)} mensajes de chat perdidos: no se pudieron escribir en el spool: {e}")
+        finally:
+            self._overflow_task = None
+
+    def _append_spool(self, rows):
+        lines = "".join(json.dumps({**row, "created_at": row["created_at"].isoformat()}) + "\n" for row in rows)
+        with self._spool_lock, open(self.spool_path, "a", encoding="utf-8") as spool:
+            spool.write(lines)
+            spool.flush()
+            os.fsync(spool.fileno())
+
+    async def replay_spool(self):
+        """Insertar lo que quedó en el spool; si la base sigue caída queda para después"""
+        try:
+            replayed = await run_db(self._replay_spool)
+        except Exception as e:
+            print(f"Error re-aplicando spool de chat: {e}")
+            return 0
+        self.replayed += replayed
+        return replayed
+
+    def _replay_spool(self, db):
+        replaying = self.spool_path + ".replay"
+        # Un .replay previo es un intento que falló a mitad: se reprocesa entero
+        if not os.path.exists(replaying):
+            with self._spool_lock:
+                if not os.path.exists(self.spool_path):
+                    return 0
+                os.replace(self.spool_path, replaying)
+
+        rows = []
+        with open(replaying, encoding="utf-8") as spool:
+            for line in spool:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue  # línea cortada por un corte de energía
+                row["created_at"] = datetime.fromisoformat(row["created_at"])
+                rows.append(row)
+        for start in range(0, len(rows), self.flush_size):
+            self._insert_rows(db, rows[start:start + self.flush_size])
+        os.remove(replaying)
+        return len(rows)
+
+    def stats(self):
+        return {
+            "depth": len(self._pending),
+            "max_pending": self.max_pending,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "retried": self.retried,
+            "spooled": self.spooled,
+            "replayed": self.replayed,
+            "conflicts": self.conflicts,
+            "flushes": self.flushes,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2),
+        }
+
+
+CHAT_SYNC_OVERLAP_MS = int(os.getenv("CHAT_SYNC_OVERLAP_MS", "2000"))
+
+chat_ids = ChatIdAllocator()
+
+chat_writer = ChatWriter(
+    flush_size=int(os.getenv("CHAT_FLUSH_SIZE", "200")),
+    flush_interval=float(os.getenv("CHAT_FLUSH_INTERVAL", "0.05")),
+    max_pending=int(os.getenv("CHAT_QUEUE_MAX", "10000")),
+    retries=int(os.getenv("CHAT_WRITE_RETRIES", "3")),
+    spool_path=os.getenv("CHAT_SPOOL_PATH", "chat_spool.jsonl"),
+)
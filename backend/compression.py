@@ -0,0 +1,183 @@
+"""Compresión de respuestas y archivos estáticos precomprimidos.
+
+- CompressionMiddleware comprime (brotli si está instalado, si no gzip) las
+  respuestas JSON/texto que superan un tamaño mínimo.
+- PrecompressedStaticFiles sirve las variantes generadas por build_assets.py
+  (.br/.gz para texto, .avif/.webp para imágenes) según Accept y
+  Accept-Encoding, sin comprimir nada en tiempo de request.
+"""
+import gzip
+import mimetypes
+import os
+import stat
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se usa gzip
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+TEXT_EXTENSIONS = {".css", ".js", ".html", ".json", ".svg", ".txt", ".map", ".xml"}
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg"}
+
+
+def parse_accept(value):
+    """Nombres aceptados (en minúsculas) descartando los que tienen q=0"""
+    accepted = set()
+    for part in (value or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def choose_encoding(accept_encoding):
+    accepted = parse_accept(accept_encoding)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def weak_etag(etag):
+    """ETag débil para una versión comprimida: un ETag fuerte identifica bytes
+    exactos y no puede compartirse entre la versión comprimida y la original"""
+    return etag if etag.startswith("W/") else "W/" + etag
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """Middleware ASGI que comprime respuestas de un solo bloque por encima del umbral"""
+
+    def __init__(self, app, minimum_size=COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                if message["status"] == 304:
+                    # El 304 repite el ETag de la versión que el cliente tiene, que puede ser la comprimida
+                    headers = MutableHeaders(raw=message["headers"])
+                    if "etag" in headers:
+                        headers["ETag"] = weak_etag(headers["etag"])
+                    passthrough = True
+                    await send(message)
+                    return
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if "content-encoding" in headers or not content_type.startswith(COMPRESSIBLE_TYPES):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Esperar al cuerpo para decidir
+                    start_message = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            if start_message is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # Respuestas en streaming o chicas se envían tal cual
+                await send(start_message)
+                start_message = None
+                passthrough = True
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            if "etag" in headers:
+                headers["ETag"] = weak_etag(headers["etag"])
+            await send(start_message)
+            start_message = None
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles que prefiere variantes pre-generadas según Accept/Accept-Encoding"""
+
+    def variant_candidates(self, path, scope):
+        headers = Headers(scope=scope)
+        extension = os.path.splitext(path)[1].lower()
+        candidates = []
+        if extension in IMAGE_EXTENSIONS:
+            accepted = parse_accept(headers.get("accept"))
+            if "image/avif" in accepted:
+                candidates.append((path + ".avif", "image/avif", None))
+            if "image/webp" in accepted:
+                candidates.append((path + ".webp", "image/webp", None))
+        elif extension in TEXT_EXTENSIONS:
+            accepted = parse_accept(headers.get("accept-encoding"))
+            if "br" in accepted:
+                candidates.append((path + ".br", None, "br"))
+            if "gzip" in accepted:
+                candidates.append((path + ".gz", None, "gzip"))
+        return candidates
+
+    async def get_response(self, path, scope):
+        if scope["method"] in ("GET", "HEAD"):
+            for candidate, media_type, encoding in self.variant_candidates(path, scope):
+                full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, candidate)
+                if stat_result and stat.S_ISREG(stat_result.st_mode):
+                    response = self.file_response(full_path, stat_result, scope)
+                    if media_type:
+                        response.headers["content-type"] = media_type
+                    if encoding:
+                        original = os.path.basename(path)
+                        response.headers["content-type"] = self.guess_media_type(original)
+                        response.headers["content-encoding"] = encoding
+                    response.headers["vary"] = "Accept, Accept-Encoding"
+                    return response
+
+        response = await super().get_response(path, scope)
+        if os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS | TEXT_EXTENSIONS:
+            response.headers["vary"] = "Accept, Accept-Encoding"
+        return response
+
+    @staticmethod
+    def guess_media_type(filename):
+        media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        if media_type.startswith("text/"):
+            media_type += "; charset=utf-8"
+        return media_type
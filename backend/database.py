@@ -1,30 +1,133 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, text
+from sqlalchemy import create_engine, event, exc, BigInteger, Column, Integer, String, Text, DateTime, Boolean, Index, UniqueConstraint, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.sql import func
-from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextvars
+import functools
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
+from password_hashing import pwd_context, verify_password, get_password_hash
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+def env_flag(name, default=False):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+# Configuración del pool de conexiones (todas las variables son opcionales)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = env_flag("DB_POOL_PRE_PING", True)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+# Loguear cada sentencia SQL solo en modo debug
+DB_ECHO = env_flag("DB_ECHO") or env_flag("DB_DEBUG")
+
+def build_engine_kwargs(url):
+    kwargs = {
+        "echo": DB_ECHO,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if DB_STATEMENT_TIMEOUT_MS and url and url.startswith("postgres"):
+        kwargs["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return kwargs
+
 # Crear el engine de SQLAlchemy
-engine = create_engine(DATABASE_URL, echo=True)
+engine = create_engine(DATABASE_URL, **build_engine_kwargs(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+class PoolStats:
+    """Contadores del pool: tiempo para obtener conexión, timeouts, checkouts y conexiones nuevas
+
+    Cada sesión de run_db mide cuánto tardó en obtener su conexión (acquires):
+    incluye la espera en el pool si está agotado, el pre-ping y abrir una
+    conexión nueva, y es ~0 si había una libre. El promedio baja con las
+    obtenciones inmediatas; la presión del pool se ve en max_acquire_ms y
+    timeouts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.acquires = 0
+        self.timeouts = 0
+        self.total_acquire_ms = 0.0
+        self.max_acquire_ms = 0.0
+
+    def record_acquire(self, elapsed_ms):
+        with self._lock:
+            self.acquires += 1
+            self.total_acquire_ms += elapsed_ms
+            self.max_acquire_ms = max(self.max_acquire_ms, elapsed_ms)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+pool_stats = PoolStats()
+
+@event.listens_for(engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_stats.record_checkout()
+
+@event.listens_for(engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    pool_stats.record_connect()
+
+def get_pool_status():
+    """Estado actual del pool para dimensionarlo contra el tráfico real"""
+    pool = engine.pool
+    status = {
+        "pool_class": type(pool).__name__,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+        "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+        "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+        "checkouts": pool_stats.checkouts,
+        "connects": pool_stats.connects,
+        "timeouts": pool_stats.timeouts,
+        "acquires": pool_stats.acquires,
+        "avg_acquire_ms": round(pool_stats.total_acquire_ms / pool_stats.acquires, 3) if pool_stats.acquires else 0.0,
+        "max_acquire_ms": round(pool_stats.max_acquire_ms, 3),
+    }
+    return status
+
 # Base para los modelos
 Base = declarative_base()
 
-# Configuración para hash de contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # Modelos de base de datos
 class Contact(Base):
     __tablename__ = "contacts"
+    __table_args__ = (
+        Index("idx_contacts_created_at", "created_at"),
+        Index("idx_contacts_source", "source"),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=True)
     phone = Column(String(20), nullable=True)
     email = Column(String(120), nullable=True)
@@ -32,10 +135,19 @@ class Contact(Base):
     source = Column(String(50), default="whatsapp")  # whatsapp, form, etc
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+# game_interactions y promo_interactions están particionadas por mes en
+# Postgres (ver migrations/versions/0002 y partitions.py); la PK real es
+# (id, created_at) pero para el ORM alcanza con id
 class GameInteraction(Base):
     __tablename__ = "game_interactions"
+    __table_args__ = (
+        # Top de juegos por rango de fechas
+        Index("idx_game_interactions_game_name_created_at", "game_name", "created_at"),
+        Index("idx_game_interactions_created_at", "created_at"),
+        Index("idx_game_interactions_type", "interaction_type"),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     game_name = Column(String(100), nullable=False)
     interaction_type = Column(String(50), default="click")  # click, view, etc
     user_agent = Column(Text, nullable=True)
@@ -44,8 +156,13 @@ class GameInteraction(Base):
 
 class PromoInteraction(Base):
     __tablename__ = "promo_interactions"
+    __table_args__ = (
+        Index("idx_promo_interactions_promo_name_created_at", "promo_name", "created_at"),
+        Index("idx_promo_interactions_created_at", "created_at"),
+        Index("idx_promo_interactions_type", "interaction_type"),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     promo_name = Column(String(100), nullable=False)
     interaction_type = Column(String(50), default="click")
     user_agent = Column(Text, nullable=True)
@@ -55,7 +172,7 @@ class PromoInteraction(Base):
 class User(Base):
     __tablename__ = "users"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     username = Column(String(50), unique=True, nullable=False)
     email = Column(String(120), unique=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
@@ -65,14 +182,37 @@ class User(Base):
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # Historial por sala paginado por id
+        Index("ix_chat_messages_room_id", "room", "id"),
+        Index("idx_chat_messages_created_at", "created_at"),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    # Generado por el worker (ver chat_writer.py); INTEGER en SQLite para que sea el rowid
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    room = Column(String(100), nullable=False, default="lobby", server_default="lobby")
     user_id = Column(Integer, nullable=True)  # None para usuarios anónimos
     username = Column(String(50), nullable=False)
     message = Column(Text, nullable=False)
     is_admin = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+class InteractionRollup(Base):
+    """Contadores agregados por hora, día y total, mantenidos al ingerir interacciones"""
+    __tablename__ = "interaction_rollups"
+    
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(20), nullable=False)  # game, promo, contact
+    name = Column(String(100), nullable=False)  # juego, promoción o fuente del contacto
+    period = Column(String(10), nullable=False)  # hour, day, all
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        UniqueConstraint("kind", "name", "period", "bucket_start", name="uq_interaction_rollups_bucket"),
+        Index("ix_interaction_rollups_period_bucket", "period", "bucket_start"),
+    )
+
 # Función para obtener la sesión de base de datos
 def get_db():
     db = SessionLocal()
@@ -81,30 +221,79 @@ def get_db():
     finally:
         db.close()
 
-# Función para crear las tablas
-def create_tables():
-    Base.metadata.create_all(bind=engine)
-    
-    # Crear usuario admin por defecto
+# Pool de hilos dedicado al trabajo de base de datos: los handlers async nunca
+# llaman a la Session síncrona desde el event loop. Por defecto tiene tantos
+# hilos como conexiones puede abrir el pool.
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+db_executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db")
+
+async def run_in_db_executor(fn, *args, **kwargs):
+    """Ejecutar una función síncrona en el pool de base de datos
+
+    Corre en una copia del contexto del llamador, así las ContextVar (ej. el
+    request en curso del perfil de queries) siguen visibles en el hilo.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(db_executor, context.run, functools.partial(fn, *args, **kwargs))
+
+def _call_with_session(fn, *args, **kwargs):
     db = SessionLocal()
     try:
-        admin_user = db.query(User).filter(User.username == "admin").first()
-        if not admin_user:
-            hashed_password = pwd_context.hash("admin123")
-            admin_user = User(
-                username="admin",
-                email="admin@aresclub.com",
-                hashed_password=hashed_password,
-                is_admin=True
-            )
-            db.add(admin_user)
-            db.commit()
-            print("✅ Usuario admin creado")
-    except Exception as e:
-        print(f"Error creando admin: {e}")
+        # Obtener la conexión explícitamente para medir cuánto tarda (espera en el pool incluida)
+        started = time.perf_counter()
+        try:
+            db.connection()
+        except exc.TimeoutError:
+            pool_stats.record_timeout()
+            raise
+        pool_stats.record_acquire((time.perf_counter() - started) * 1000)
+        return fn(db, *args, **kwargs)
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
 
+async def run_db(fn, *args, **kwargs):
+    """Ejecutar fn(db, *args) en el pool de base de datos con una sesión propia"""
+    return await run_in_db_executor(_call_with_session, fn, *args, **kwargs)
+
+# Esquema: lo administra Alembic (migrations/), el arranque solo verifica la versión
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+
+def alembic_config():
+    from alembic.config import Config
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "migrations"))
+    # No reconfigurar el logging del proceso que llama (ej. el servidor)
+    config.attributes["configure_logger"] = False
+    return config
+
+def schema_head():
+    """Última revisión disponible en migrations/versions"""
+    from alembic.script import ScriptDirectory
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+def current_schema_version():
+    """Revisión aplicada en la base (None si nunca se migró)"""
+    from alembic.runtime.migration import MigrationContext
+    with engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+def run_migrations():
+    """Equivalente a `alembic upgrade head`"""
+    from alembic import command
+    command.upgrade(alembic_config(), "head")
+
+def check_schema(auto_migrate=False):
+    """Comparar la versión de la base con la de las migraciones (y migrar si se pide)"""
+    current, head = current_schema_version(), schema_head()
+    if current != head and auto_migrate:
+        run_migrations()
+        current = current_schema_version()
+    return {"current": current, "head": head, "ok": current == head}
+
 # Función para verificar conexión
 def check_db_connection():
     try:
@@ -117,14 +306,11 @@ def check_db_connection():
         return False
 
 # Funciones de autenticación
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password):
-    return pwd_context.hash(password)
+def get_user_by_username(db: Session, username: str):
+    return db.query(User).filter(User.username == username).first()
 
 def authenticate_user(db: Session, username: str, password: str):
-    user = db.query(User).filter(User.username == username).first()
+    user = get_user_by_username(db, username)
     if not user:
         return False
     if not verify_password(password, user.hashed_password):
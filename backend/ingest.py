@@ -0,0 +1,179 @@
+"""Cola de ingesta en memoria para el tracking de interacciones.
+
+Los endpoints encolan los eventos sin esperar a la base de datos y un flusher
+en segundo plano los escribe en lotes (INSERT multi-fila) cuando se alcanza el
+tamaño o el intervalo configurado. Un lote que falla se reintenta con backoff
+exponencial (la transacción incluye los rollups, así que no queda a medias) y
+recién si sigue fallando se descarta.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+
+from sqlalchemy import insert
+
+from database import run_db
+from rollups import record_batch
+
+# Políticas cuando la cola está llena
+DROP_NEWEST = "drop_newest"   # descartar el evento entrante
+DROP_OLDEST = "drop_oldest"   # descartar el evento más viejo de la cola
+REJECT = "reject"             # avisar al llamador (el endpoint responde 503)
+POLICIES = (DROP_NEWEST, DROP_OLDEST, REJECT)
+
+
+class QueueFullError(Exception):
+    """La cola alcanzó su límite de memoria y la política es REJECT"""
+
+
+class BatchQueue:
+    """Buffer acotado de filas pendientes que se vuelcan en lotes"""
+
+    def __init__(self, name, flush_size=500, flush_interval=1.0, max_pending=10000, policy=DROP_NEWEST,
+                 after_write=None, retries=3, retry_backoff=0.2):
+        if policy not in POLICIES:
+            raise ValueError(f"Política de backpressure desconocida: {policy}")
+        self.name = name
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.policy = policy
+        # Hook opcional after_write(db, batch) que corre en la misma transacción
+        self.after_write = after_write
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+
+        self._pending = deque()
+        self._wakeup = None
+        self._flush_lock = None
+        self._task = None
+
+        self.enqueued = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.retried = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    # Productores
+    def enqueue(self, model, **row):
+        """Encolar una fila para `model` sin tocar la base de datos"""
+        if len(self._pending) >= self.max_pending:
+            if self.policy == REJECT:
+                self.dropped += 1
+                raise QueueFullError(f"Cola {self.name} llena ({self.max_pending} eventos)")
+            if self.policy == DROP_NEWEST:
+                self.dropped += 1
+                return False
+            self._pending.popleft()
+            self.dropped += 1
+
+        self._pending.append((model, row))
+        self.enqueued += 1
+        if len(self._pending) >= self.flush_size and self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    # Consumidor
+    def start(self):
+        if self._task is None:
+            # Las primitivas se crean aquí para quedar ligadas al loop que corre
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Detener el flusher y volcar todo lo pendiente (shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            while self._pending:
+                batch = [self._pending.popleft() for _ in range(min(self.flush_size, len(self._pending)))]
+                started = time.perf_counter()
+                if await self._write_with_retry(batch):
+                    self.flushed += len(batch)
+                else:
+                    self.dropped += len(batch)
+                    print(f"❌ Cola {self.name}: {len(batch)} eventos descartados tras {self.retries + 1} intentos")
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                self.flushes += 1
+                self.last_flush_ms = elapsed_ms
+                self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+                self._total_flush_ms += elapsed_ms
+
+    async def _write_with_retry(self, batch):
+        for attempt in range(self.retries + 1):
+            try:
+                await run_db(self._write_batch, batch)
+                return True
+            except Exception as e:
+                self.flush_errors += 1
+                print(f"Error volcando cola {self.name} ({len(batch)} eventos, intento {attempt + 1}): {e}")
+                if attempt < self.retries:
+                    self.retried += 1
+                    await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+        return False
+
+    def _write_batch(self, db, batch):
+        """INSERT multi-fila por modelo dentro de una única transacción"""
+        # Agrupar por modelo y columnas para que cada grupo sea un único executemany
+        groups = {}
+        for model, row in batch:
+            groups.setdefault((model, tuple(sorted(row))), []).append(row)
+
+        for (model, _), rows in groups.items():
+            db.execute(insert(model), rows)
+        if self.after_write is not None:
+            self.after_write(db, batch)
+        db.commit()
+
+    def stats(self):
+        return {
+            "queue": self.name,
+            "depth": len(self._pending),
+            "max_pending": self.max_pending,
+            "policy": self.policy,
+            "enqueued": self.enqueued,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "retried": self.retried,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "avg_flush_ms": round(self._total_flush_ms / self.flushes, 2) if self.flushes else 0.0,
+            "max_flush_ms": round(self.max_flush_ms, 2),
+        }
+
+
+interaction_queue = BatchQueue(
+    "interactions",
+    flush_size=int(os.getenv("INTERACTION_FLUSH_SIZE", "500")),
+    flush_interval=float(os.getenv("INTERACTION_FLUSH_INTERVAL", "1.0")),
+    max_pending=int(os.getenv("INTERACTION_QUEUE_MAX", "10000")),
+    policy=os.getenv("INTERACTION_QUEUE_POLICY", DROP_NEWEST),
+    after_write=record_batch,
+    retries=int(os.getenv("INTERACTION_WRITE_RETRIES", "3")),
+)
@@ -0,0 +1,306 @@
+"""Métricas en formato de texto de Prometheus para /metrics.
+
+Contadores, gauges e histogramas en memoria (sin dependencias) pensados para
+el camino caliente: registrar un valor es un lock y un par de sumas; el texto
+se arma solo cuando Prometheus hace el scrape. Lo que ya existe como stats
+(colas, pool, historial) se expone con gauges que se calculan al scrapear.
+
+Se instrumenta:
+
+- HTTP: latencia por ruta (la plantilla, ej. /api/games/{game_id}, no la URL)
+  y requests en curso (MetricsMiddleware)
+- SQLAlchemy: cantidad y duración de queries por tipo de sentencia
+- Socket.IO: conexiones abiertas, eventos recibidos y a cuántos clientes
+  llega cada emit (fan-out) en este worker
+- Event loop: atraso de los timers (lag), medido cada LOOP_LAG_INTERVAL
+
+Con varios workers cada proceso tiene sus propias métricas: el label `pid` de
+ares_process_info permite distinguirlos si el scrape se hace por worker.
+METRICS_TOKEN (opcional) exige `Authorization: Bearer <token>` en /metrics.
+"""
+import asyncio
+import bisect
+import os
+import threading
+import time
+
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+FANOUT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Starlette agrega "; charset=utf-8" a los media types text/*
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names, values, extra=None):
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labels=()):
+        super().__init__(name, documentation, labels)
+        self._values = {}
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{format_labels(self.label_names, key)} {format_value(value)}" for key, value in values]
+
+
+class Gauge(Metric):
+    """Valor que sube y baja; con `function` se calcula al scrapear"""
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labels=(), function=None):
+        super().__init__(name, documentation, labels)
+        self._values = {}
+        # function() -> número, o {tupla de labels: número} si el gauge tiene labels
+        self.function = function
+
+    def set(self, value, *label_values):
+        with self._lock:
+            self._values[label_values] = value
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, *label_values, amount=1):
+        self.inc(*label_values, amount=-amount)
+
+    def render(self):
+        if self.function is not None:
+            try:
+                result = self.function()
+            except Exception:
+                return []
+            values = list(result.items()) if isinstance(result, dict) else [((), result)]
+        else:
+            with self._lock:
+                values = list(self._values.items())
+        return [f"{self.name}{format_labels(self.label_names, key)} {format_value(value)}"
+                for key, value in values if value is not None]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+        # labels -> [cuentas por bucket (no acumuladas) + overflow, suma, cantidad]
+        self._series = {}
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        with self._lock:
+            snapshot = [(key, list(series[0]), series[1], series[2]) for key, series in self._series.items()]
+        lines = []
+        for key, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, amount in zip(self.buckets + (float("inf"),), counts):
+                cumulative += amount
+                le = f'le="{format_value(bound) if bound != float("inf") else "+Inf"}"'
+                lines.append(f"{self.name}_bucket{format_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.label_names, key)} {format_value(total)}")
+            lines.append(f"{self.name}_count{format_labels(self.label_names, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs):
+        return self.register(Counter(*args, **kwargs))
+
+    def gauge(self, *args, **kwargs):
+        return self.register(Gauge(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs):
+        return self.register(Histogram(*args, **kwargs))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines += metric.header()
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+process_info = registry.gauge("ares_process_info", "Proceso que atiende el scrape", labels=("pid",),
+                              function=lambda: {(os.getpid(),): 1})
+http_requests = registry.counter("ares_http_requests_total", "Requests HTTP atendidos",
+                                 labels=("method", "route", "status"))
+http_latency = registry.histogram("ares_http_request_duration_seconds", "Latencia de requests HTTP por ruta",
+                                  labels=("method", "route"))
+http_in_flight = registry.gauge("ares_http_requests_in_flight", "Requests HTTP en curso")
+db_queries = registry.counter("ares_db_queries_total", "Sentencias SQL ejecutadas", labels=("operation",))
+db_query_latency = registry.histogram("ares_db_query_duration_seconds", "Duración de sentencias SQL",
+                                      labels=("operation",), buckets=QUERY_BUCKETS)
+db_query_errors = registry.counter("ares_db_query_errors_total", "Sentencias SQL que fallaron")
+socket_connections = registry.gauge("ares_socketio_connections", "Conexiones de Socket.IO abiertas en este worker")
+socket_events = registry.counter("ares_socketio_events_total", "Eventos de Socket.IO recibidos", labels=("event",))
+socket_fanout = registry.histogram("ares_socketio_emit_recipients", "Clientes de este worker que recibe cada emit",
+                                   labels=("event",), buckets=FANOUT_BUCKETS)
+loop_lag = registry.histogram("ares_event_loop_lag_seconds", "Atraso de los timers del event loop",
+                              buckets=LAG_BUCKETS)
+
+
+def route_label(scope):
+    """Plantilla de la ruta que atendió el request (cardinalidad acotada)"""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path:
+        return path
+    if scope.get("path", "").startswith("/static/"):
+        return "/static"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Latencia por ruta y requests en curso (ASGI puro, sin BaseHTTPMiddleware)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_in_flight.dec()
+            route = route_label(scope)
+            http_latency.observe(elapsed, scope["method"], route)
+            http_requests.inc(scope["method"], route, str(status[0]))
+
+
+def instrument_engine(engine):
+    """Contar y medir cada sentencia con los eventos de cursor de SQLAlchemy"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        operation = statement.lstrip()[:6].upper()
+        db_query_latency.observe(time.perf_counter() - context._metrics_started, operation)
+        db_queries.inc(operation)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        db_query_errors.inc()
+
+
+def count_recipients(manager, namespace, room):
+    rooms = room if isinstance(room, (list, tuple)) else (room,)
+    sids = set()
+    for name in rooms:
+        sids.update(sid for sid, _ in manager.get_participants(namespace or "/", name))
+    return len(sids)
+
+
+def instrument_socketio(manager):
+    """Registrar el fan-out de cada emit que este worker entrega a sus clientes
+
+    Con message queue se mide al recibir del bus (ahí se entrega localmente,
+    también para los emits propios); sin ella, en el emit del manager.
+    """
+    if isinstance(manager, AsyncPubSubManager):
+        original = manager._handle_emit
+
+        async def handle_emit(message):
+            try:
+                socket_fanout.observe(count_recipients(manager, message.get("namespace"), message.get("room")),
+                                      message.get("event"))
+            except Exception:
+                pass
+            await original(message)
+
+        manager._handle_emit = handle_emit
+    else:
+        original = manager.emit
+
+        async def emit(event, data, namespace, room=None, **kwargs):
+            if namespace in manager.rooms:
+                socket_fanout.observe(count_recipients(manager, namespace, room), event)
+            return await original(event, data, namespace, room=room, **kwargs)
+
+        manager.emit = emit
+
+
+async def monitor_loop_lag(interval=LOOP_LAG_INTERVAL):
+    """Cuánto tarda en despertar un sleep(interval) de más: lag del event loop"""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        loop_lag.observe(max(0.0, loop.time() - started - interval))
@@ -0,0 +1,130 @@
+"""Esquema inicial y usuario admin
+
+Adopta bases creadas antes con create_all() o create_tables.sql: solo crea
+las tablas, columnas e índices que falten.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def interaction_columns(name_column):
+    return [
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(name_column, sa.String(100), nullable=False),
+        sa.Column("interaction_type", sa.String(50)),
+        sa.Column("user_agent", sa.Text()),
+        sa.Column("ip_address", sa.String(45)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    ]
+
+
+TABLES = {
+    "contacts": lambda: [
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(100)),
+        sa.Column("phone", sa.String(20)),
+        sa.Column("email", sa.String(120)),
+        sa.Column("message", sa.Text()),
+        sa.Column("source", sa.String(50)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    ],
+    "game_interactions": lambda: interaction_columns("game_name"),
+    "promo_interactions": lambda: interaction_columns("promo_name"),
+    "users": lambda: [
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("username", sa.String(50), nullable=False, unique=True),
+        sa.Column("email", sa.String(120), nullable=False, unique=True),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("is_admin", sa.Boolean()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    ],
+    "chat_messages": lambda: [
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("room", sa.String(100), nullable=False, server_default="lobby"),
+        sa.Column("user_id", sa.Integer()),
+        sa.Column("username", sa.String(50), nullable=False),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("is_admin", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    ],
+    "interaction_rollups": lambda: [
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("kind", sa.String(20), nullable=False),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("period", sa.String(10), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.UniqueConstraint("kind", "name", "period", "bucket_start", name="uq_interaction_rollups_bucket"),
+    ],
+}
+
+INDEXES = [
+    ("ix_chat_messages_room_id", "chat_messages", ["room", "id"]),
+    ("ix_interaction_rollups_period_bucket", "interaction_rollups", ["period", "bucket_start"]),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    existing = set(inspector.get_table_names())
+
+    for name, columns in TABLES.items():
+        if name not in existing:
+            op.create_table(name, *columns())
+
+    # Bases anteriores a las salas de chat
+    if "chat_messages" in existing:
+        chat_columns = {column["name"] for column in inspector.get_columns("chat_messages")}
+        if "room" not in chat_columns:
+            op.add_column("chat_messages", sa.Column("room", sa.String(100), nullable=False, server_default="lobby"))
+
+    for index_name, table, columns in INDEXES:
+        present = {index["name"] for index in inspector.get_indexes(table)} if table in existing else set()
+        if index_name not in present:
+            op.create_index(index_name, table, columns)
+
+    seed_admin()
+
+
+def seed_admin():
+    """Crear el admin por defecto (bcrypt corre una sola vez, en el deploy)"""
+    from password_hashing import get_password_hash
+
+    bind = op.get_bind()
+    users = sa.table(
+        "users",
+        sa.column("username", sa.String),
+        sa.column("email", sa.String),
+        sa.column("hashed_password", sa.String),
+        sa.column("is_admin", sa.Boolean),
+        sa.column("is_active", sa.Boolean),
+    )
+    if bind.execute(sa.select(users.c.username).where(users.c.username == "admin")).first() is None:
+        op.bulk_insert(users, [{
+            "username": "admin",
+            "email": "admin@aresclub.com",
+            "hashed_password": get_password_hash(os.getenv("ADMIN_PASSWORD", "admin123")),
+            "is_admin": True,
+            "is_active": True,
+        }])
+
+
+def downgrade() -> None:
+    for index_name, table, _ in reversed(INDEXES):
+        op.drop_index(index_name, table_name=table)
+    for name in reversed(list(TABLES)):
+        op.drop_table(name)
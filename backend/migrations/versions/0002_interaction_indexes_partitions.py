@@ -0,0 +1,174 @@
+"""Índices de consulta y particiones mensuales de interacciones
+
+- Índices declarados en los modelos, incluido (game_name, created_at) para el
+  top de juegos y chat_messages(created_at). Se borran los que quedan de más:
+  el de game_name solo (lo cubre el compuesto) y los ix_<tabla>_id que
+  create_all() agregaba sobre la PK.
+- En Postgres game_interactions y promo_interactions pasan a estar
+  particionadas por rango de created_at (una partición por mes más una
+  DEFAULT). La PK pasa a ser (id, created_at) porque Postgres exige que incluya
+  la clave de partición; las filas se copian a la tabla nueva en esta
+  migración, así que en tablas grandes conviene correrla en una ventana de
+  mantenimiento. Las particiones siguientes las crea partitions.py.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("idx_game_interactions_game_name_created_at", "game_interactions", ["game_name", "created_at"]),
+    ("idx_game_interactions_created_at", "game_interactions", ["created_at"]),
+    ("idx_game_interactions_type", "game_interactions", ["interaction_type"]),
+    ("idx_promo_interactions_promo_name_created_at", "promo_interactions", ["promo_name", "created_at"]),
+    ("idx_promo_interactions_created_at", "promo_interactions", ["created_at"]),
+    ("idx_promo_interactions_type", "promo_interactions", ["interaction_type"]),
+    ("idx_contacts_created_at", "contacts", ["created_at"]),
+    ("idx_contacts_source", "contacts", ["source"]),
+    ("idx_chat_messages_created_at", "chat_messages", ["created_at"]),
+]
+
+# Índices que quedan cubiertos por otros (los de create_tables.sql y create_all())
+REDUNDANT_INDEXES = [
+    ("idx_game_interactions_game_name", "game_interactions", ["game_name"]),
+    ("idx_promo_interactions_promo_name", "promo_interactions", ["promo_name"]),
+] + [
+    (f"ix_{table}_id", table, ["id"])
+    for table in ("contacts", "game_interactions", "promo_interactions", "users", "chat_messages",
+                  "interaction_rollups")
+]
+
+# Tabla particionada -> columna con el nombre del juego/promo
+PARTITIONED = {
+    "game_interactions": "game_name",
+    "promo_interactions": "promo_name",
+}
+
+
+def index_names(table):
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        from partitions import is_partitioned
+        for table, name_column in PARTITIONED.items():
+            if not is_partitioned(bind, table):
+                partition_table(table, name_column)
+
+    for index_name, table, _ in REDUNDANT_INDEXES:
+        if index_name in index_names(table):
+            op.drop_index(index_name, table_name=table)
+
+    for index_name, table, columns in INDEXES:
+        if index_name not in index_names(table):
+            # En una tabla particionada el índice se crea en cada partición
+            op.create_index(index_name, table, columns)
+
+
+def partition_table(table, name_column):
+    """Reemplazar `table` por una tabla particionada por mes con las mismas filas"""
+    from partitions import PARTITION_MONTHS_AHEAD, add_months, create_default_partition, create_month_partition, month_start
+
+    bind = op.get_bind()
+    legacy = f"{table}_legacy"
+    op.rename_table(table, legacy)
+
+    # Liberar los nombres de la PK y los índices (son únicos por schema)
+    inspector = sa.inspect(bind)
+    primary_key = inspector.get_pk_constraint(legacy).get("name")
+    if primary_key:
+        op.execute(f"ALTER TABLE {legacy} RENAME CONSTRAINT {primary_key} TO {legacy}_pkey")
+    for index in inspector.get_indexes(legacy):
+        op.drop_index(index["name"], table_name=legacy)
+
+    # Seguir numerando con la misma secuencia
+    sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": legacy}).scalar()
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+    else:
+        sequence = f"{table}_id_seq"
+        op.execute(f"CREATE SEQUENCE {sequence}")
+        op.execute(f"SELECT setval('{sequence}', COALESCE((SELECT max(id) FROM {legacy}), 0) + 1, false)")
+
+    op.execute(f"""
+        CREATE TABLE {table} (
+            id INTEGER NOT NULL DEFAULT nextval('{sequence}'),
+            {name_column} VARCHAR(100) NOT NULL,
+            interaction_type VARCHAR(50),
+            user_agent TEXT,
+            ip_address VARCHAR(45),
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+
+    # Una partición por mes desde la fila más vieja hasta los meses que vienen
+    oldest = bind.execute(sa.text(f"SELECT min(created_at) FROM {legacy}")).scalar()
+    current = month_start(datetime.now(timezone.utc))
+    month = month_start(oldest) if oldest is not None else current
+    create_default_partition(bind, table)
+    while month <= add_months(current, PARTITION_MONTHS_AHEAD):
+        create_month_partition(bind, table, month)
+        month = add_months(month, 1)
+
+    op.execute(f"""
+        INSERT INTO {table} (id, {name_column}, interaction_type, user_agent, ip_address, created_at)
+        SELECT id, {name_column}, interaction_type, user_agent, ip_address, COALESCE(created_at, now())
+        FROM {legacy}
+    """)
+    op.drop_table(legacy)
+
+
+def unpartition_table(table, name_column):
+    """Volver a una tabla común con las filas de todas las particiones"""
+    bind = op.get_bind()
+    sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": table}).scalar()
+    op.rename_table(table, f"{table}_partitioned")
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+    op.execute(f"ALTER TABLE {table}_partitioned RENAME CONSTRAINT {table}_pkey TO {table}_partitioned_pkey")
+    op.execute(f"""
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY DEFAULT nextval('{sequence}'),
+            {name_column} VARCHAR(100) NOT NULL,
+            interaction_type VARCHAR(50),
+            user_agent TEXT,
+            ip_address VARCHAR(45),
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+        )
+    """)
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+    op.execute(f"INSERT INTO {table} SELECT id, {name_column}, interaction_type, user_agent, ip_address, created_at "
+               f"FROM {table}_partitioned")
+    # Borra también las particiones y sus índices
+    op.drop_table(f"{table}_partitioned")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        from partitions import is_partitioned
+        for table, name_column in PARTITIONED.items():
+            if is_partitioned(bind, table):
+                unpartition_table(table, name_column)
+
+    for index_name, table, _ in INDEXES:
+        if index_name in index_names(table):
+            op.drop_index(index_name, table_name=table)
+
+    # Los de create_tables.sql; los ix_<tabla>_id no hacen falta
+    for index_name, table, columns in REDUNDANT_INDEXES[:2]:
+        op.create_index(index_name, table, columns)
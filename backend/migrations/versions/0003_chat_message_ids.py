@@ -0,0 +1,39 @@
+"""Ids de chat generados por los workers
+
+- chat_messages.id pasa a BIGINT: los ids llevan milisegundos, secuencia y
+  slot del worker (ver chat_writer.py) y no entran en un INTEGER. Los ids
+  viejos de la secuencia son menores que cualquier id nuevo, así que el orden
+  se mantiene.
+- Secuencia chat_id_slots de la que cada worker toma su slot al iniciar.
+
+SQLite no cambia: INTEGER ya es de 64 bits y ahí hay un solo proceso.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.alter_column("chat_messages", "id", type_=sa.BigInteger(), existing_type=sa.Integer())
+    op.execute("CREATE SEQUENCE IF NOT EXISTS chat_id_slots")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP SEQUENCE IF EXISTS chat_id_slots")
+    # Falla si ya hay ids generados por los workers: no entran en INTEGER
+    op.alter_column("chat_messages", "id", type_=sa.Integer(), existing_type=sa.BigInteger())
@@ -0,0 +1,183 @@
+"""Particiones mensuales de game_interactions y promo_interactions (Postgres).
+
+La migración 0002 convierte las tablas en particionadas por rango de
+created_at. Este módulo crea las particiones de los próximos meses y borra las
+que quedaron fuera de la retención (DROP de una partición entera, sin DELETE
+fila por fila ni VACUUM). Las estadísticas se leen de interaction_rollups, así
+que borrar datos crudos viejos no cambia los totales; eso sí, `rollups.py
+backfill` solo puede reconstruir lo que siga en las tablas crudas.
+
+Una partición DEFAULT recibe las filas fuera de rango (p. ej. si el
+mantenimiento no corrió a tiempo) para que los inserts no fallen.
+
+En SQLite no hace nada. Variables:
+
+- PARTITION_MONTHS_AHEAD          meses futuros con partición creada (3)
+- PARTITION_RETENTION_MONTHS      meses completos a conservar, 0 = sin límite (0)
+- PARTITION_MAINTENANCE_INTERVAL  segundos entre corridas del mantenimiento (21600)
+
+Correr a mano (por ejemplo desde un cron):
+
+    cd backend && python partitions.py maintain
+"""
+import argparse
+import os
+import re
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+
+from database import SessionLocal
+
+PARTITIONED_TABLES = ("game_interactions", "promo_interactions")
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+PARTITION_RETENTION_MONTHS = int(os.getenv("PARTITION_RETENTION_MONTHS", "0"))
+PARTITION_MAINTENANCE_INTERVAL = float(os.getenv("PARTITION_MAINTENANCE_INTERVAL", "21600"))
+
+# Un solo worker hace el mantenimiento a la vez (pg_try_advisory_xact_lock)
+MAINTENANCE_LOCK_ID = 4172019
+
+PARTITION_NAME = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def month_start(moment):
+    return date(moment.year, moment.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month.year:04d}{month.month:02d}"
+
+
+def partition_month(name):
+    """Mes de una partición a partir de su nombre, o None (p. ej. la DEFAULT)"""
+    match = PARTITION_NAME.search(name)
+    if match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def dialect_name(db):
+    """Dialecto de una Session o de una Connection (las migraciones usan la conexión)"""
+    bind = db if hasattr(db, "dialect") else db.get_bind()
+    return bind.dialect.name
+
+
+def is_partitioned(db, table):
+    if dialect_name(db) != "postgresql":
+        return False
+    return db.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+        {"table": table},
+    ).first() is not None
+
+
+def list_partitions(db, table):
+    rows = db.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass(:table)"
+    ), {"table": table})
+    return [row[0] for row in rows]
+
+
+def create_default_partition(db, table):
+    db.execute(text(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"))
+
+
+def create_month_partition(db, table, month):
+    """Crear la partición de `month` si no existe; devuelve su nombre o None"""
+    name = partition_name(table, month)
+    if name in list_partitions(db, table):
+        return None
+    start, end = month, add_months(month, 1)
+    bounds = {"start": start, "end": end}
+    in_range = "created_at >= :start AND created_at < :end"
+    # Si la DEFAULT ya tiene filas de ese mes Postgres rechaza la partición
+    # nueva: sacarlas y volver a insertarlas después, en la misma transacción
+    moving = f"{table}_default" in list_partitions(db, table) and db.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {table}_default WHERE {in_range})"), bounds
+    ).scalar()
+    if moving:
+        db.execute(text(f"CREATE TEMP TABLE {name}_moving (LIKE {table}) ON COMMIT DROP"))
+        db.execute(text(
+            f"WITH moved AS (DELETE FROM {table}_default WHERE {in_range} RETURNING *) "
+            f"INSERT INTO {name}_moving SELECT * FROM moved"
+        ), bounds)
+    db.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    if moving:
+        db.execute(text(f"INSERT INTO {table} SELECT * FROM {name}_moving"))
+    return name
+
+
+def ensure_partitions(db, table, months_ahead=PARTITION_MONTHS_AHEAD, today=None):
+    """Partición DEFAULT más una por mes desde el actual hasta `months_ahead` adelante"""
+    current = month_start(today or datetime.now(timezone.utc))
+    create_default_partition(db, table)
+    created = []
+    for offset in range(months_ahead + 1):
+        name = create_month_partition(db, table, add_months(current, offset))
+        if name:
+            created.append(name)
+    return created
+
+
+def drop_expired_partitions(db, table, retention_months=PARTITION_RETENTION_MONTHS, today=None):
+    """Borrar las particiones de meses anteriores a los `retention_months` más recientes"""
+    if retention_months <= 0:
+        return []
+    cutoff = add_months(month_start(today or datetime.now(timezone.utc)), -retention_months)
+    dropped = []
+    for name in sorted(list_partitions(db, table)):
+        month = partition_month(name)
+        if month is not None and month < cutoff:
+            db.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    return dropped
+
+
+def maintain_partitions(db, months_ahead=PARTITION_MONTHS_AHEAD, retention_months=PARTITION_RETENTION_MONTHS):
+    """Crear las particiones que falten y borrar las vencidas (no-op fuera de Postgres)"""
+    report = {"created": [], "dropped": [], "skipped": False}
+    if dialect_name(db) != "postgresql":
+        report["skipped"] = True
+        return report
+    if not db.execute(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": MAINTENANCE_LOCK_ID}).scalar():
+        # Otro worker lo está haciendo
+        report["skipped"] = True
+        return report
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(db, table):
+            continue
+        report["created"] += ensure_partitions(db, table, months_ahead)
+        report["dropped"] += drop_expired_partitions(db, table, retention_months)
+    db.commit()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Particiones de las tablas de interacciones de Ares Club")
+    parser.add_argument("command", choices=["maintain"])
+    parser.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--retention-months", type=int, default=PARTITION_RETENTION_MONTHS)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        report = maintain_partitions(db, args.months_ahead, args.retention_months)
+        if report["skipped"]:
+            print("⚠️ Nada que hacer: la base no es Postgres o el mantenimiento ya está corriendo")
+        else:
+            print(f"✅ Particiones creadas: {report['created'] or '-'}; borradas: {report['dropped'] or '-'}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Perfil de queries: huellas, queries lentas y requests con demasiadas queries (N+1).
+
+Se engancha a before/after_cursor_execute del engine. Cada sentencia se
+reduce a una huella (literales y parámetros como ?, listas IN/VALUES
+colapsadas) y se acumulan cantidad, tiempo total, promedio y máximo por
+huella. QueryProfilerMiddleware abre un contador por request en una
+ContextVar; run_db copia el contexto al hilo de la base, así las queries
+quedan asociadas a la ruta que las disparó.
+
+- Las sentencias que superan QUERY_SLOW_MS se imprimen con su ruta.
+- Los requests que ejecutan más de QUERY_COUNT_THRESHOLD queries se imprimen
+  con la huella más repetida (el típico N+1).
+
+El resumen está en /api/stats/queries (solo admins). QUERY_PROFILER=false lo apaga.
+"""
+import functools
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+
+from database import env_flag
+from metrics import route_label
+
+QUERY_PROFILER = env_flag("QUERY_PROFILER", True)
+QUERY_SLOW_MS = float(os.getenv("QUERY_SLOW_MS", "100"))
+QUERY_COUNT_THRESHOLD = int(os.getenv("QUERY_COUNT_THRESHOLD", "10"))
+
+# Queries fuera de un request HTTP (colas en segundo plano, Socket.IO)
+NO_REQUEST = "(sin request)"
+
+WHITESPACE = re.compile(r"\s+")
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+PARAMETER = re.compile(r"%\(\w+\)s|%s|(?<![:\w]):\w+|\$\d+")
+VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+REPEATED_ROWS = re.compile(r"(\(\?, \.\.\.\))(?:, \(\?, \.\.\.\))+")
+
+
+@functools.lru_cache(maxsize=2048)
+def fingerprint(statement):
+    """Sentencia normalizada: las que solo cambian en valores comparten huella"""
+    text = WHITESPACE.sub(" ", statement).strip()
+    text = STRING_LITERAL.sub("?", text)
+    text = PARAMETER.sub("?", text)
+    text = NUMBER_LITERAL.sub("?", text)
+    text = VALUE_LIST.sub("(?, ...)", text)
+    text = REPEATED_ROWS.sub(r"\1, ...", text)
+    return text[:500]
+
+
+class RequestQueries:
+    """Queries de un request HTTP (se comparte entre el loop y los hilos de la base)"""
+
+    __slots__ = ("scope", "count", "total_ms", "fingerprints", "_lock")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.count = 0
+        self.total_ms = 0.0
+        self.fingerprints = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, key, elapsed_ms):
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.fingerprints[key] += 1
+
+    @property
+    def route(self):
+        return f"{self.scope.get('method', '')} {route_label(self.scope)}"
+
+
+current_request = ContextVar("current_request", default=None)
+
+
+class QueryProfiler:
+    def __init__(self, slow_ms=100.0, request_threshold=10, max_fingerprints=500, recent=50):
+        self.slow_ms = slow_ms
+        self.request_threshold = request_threshold
+        self.max_fingerprints = max_fingerprints
+        self.recent = recent
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # huella -> [cantidad, ms totales, ms máximo]
+            self.fingerprints = {}
+            # ruta -> [requests, queries, máximo de queries en un request]
+            self.routes = {}
+            self.slow_queries = deque(maxlen=self.recent)
+            self.flagged_requests = deque(maxlen=self.recent)
+
+    def instrument(self, engine):
+        from sqlalchemy import event
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            context._profiler_started = time.perf_counter()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            self.record(statement, (time.perf_counter() - context._profiler_started) * 1000)
+
+    def record(self, statement, elapsed_ms):
+        key = fingerprint(statement)
+        request = current_request.get()
+        if request is not None:
+            request.add(key, elapsed_ms)
+
+        with self._lock:
+            stats = self.fingerprints.get(key)
+            if stats is None:
+                if len(self.fingerprints) >= self.max_fingerprints:
+                    key = "(otras)"
+                stats = self.fingerprints.setdefault(key, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += elapsed_ms
+            stats[2] = max(stats[2], elapsed_ms)
+
+        if elapsed_ms > self.slow_ms:
+            route = request.route if request is not None else NO_REQUEST
+            self.slow_queries.append({"route": route, "ms": round(elapsed_ms, 2), "query": key})
+            print(f"🐢 Query lenta ({elapsed_ms:.0f} ms) en {route}: {key[:200]}")
+
+    # Por request
+    def begin_request(self, scope):
+        return current_request.set(RequestQueries(scope))
+
+    def end_request(self, token):
+        request = current_request.get()
+        current_request.reset(token)
+        if request is None or not request.count:
+            return
+        route = request.route
+        with self._lock:
+            stats = self.routes.setdefault(route, [0, 0, 0])
+            stats[0] += 1
+            stats[1] += request.count
+            stats[2] = max(stats[2], request.count)
+        if request.count > self.request_threshold:
+            top, repeated = request.fingerprints.most_common(1)[0]
+            self.flagged_requests.append({
+                "route": route,
+                "queries": request.count,
+                "ms": round(request.total_ms, 2),
+                "most_repeated": {"query": top, "count": repeated},
+            })
+            print(f"⚠️ {route} ejecutó {request.count} queries (umbral {self.request_threshold}); "
+                  f"la más repetida, {repeated} veces: {top[:120]}")
+
+    def stats(self, top=20):
+        with self._lock:
+            fingerprints = sorted(self.fingerprints.items(), key=lambda item: item[1][1], reverse=True)[:top]
+            routes = sorted(self.routes.items(), key=lambda item: item[1][1] / item[1][0], reverse=True)
+            return {
+                "slow_ms": self.slow_ms,
+                "request_threshold": self.request_threshold,
+                "fingerprints": [
+                    {"query": key, "count": count, "total_ms": round(total, 2),
+                     "mean_ms": round(total / count, 3), "max_ms": round(longest, 2)}
+                    for key, (count, total, longest) in fingerprints
+                ],
+                "routes": [
+                    {"route": route, "requests": requests, "queries_per_request": round(queries / requests, 2),
+                     "max_queries": most}
+                    for route, (requests, queries, most) in routes
+                ],
+                "slow_queries": list(self.slow_queries),
+                "flagged_requests": list(self.flagged_requests),
+            }
+
+
+class QueryProfilerMiddleware:
+    """Abre el contador de queries de cada request HTTP"""
+
+    def __init__(self, app, profiler=None):
+        self.app = app
+        self.profiler = profiler or query_profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = self.profiler.begin_request(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.end_request(token)
+
+
+query_profiler = QueryProfiler(slow_ms=QUERY_SLOW_MS, request_threshold=QUERY_COUNT_THRESHOLD)
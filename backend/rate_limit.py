@@ -0,0 +1,76 @@
+"""Rate limiting en memoria con token buckets por clave (IP, usuario, sid...)."""
+import time
+from collections import OrderedDict
+
+
+class TokenBucket:
+    """`capacity` tokens como ráfaga máxima, recargados a `rate` tokens por segundo"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate, capacity, now=None):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic() if now is None else now
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def consume(self, amount=1, now=None):
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return True
+        return False
+
+    def retry_after(self, amount=1):
+        """Segundos hasta que haya `amount` tokens disponibles"""
+        missing = amount - self.tokens
+        return max(0.0, missing / self.rate) if self.rate else float("inf")
+
+
+class KeyedRateLimiter:
+    """Un TokenBucket por clave, con un máximo de claves en memoria (LRU)"""
+
+    def __init__(self, rate, capacity, max_keys=10000):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+
+    @classmethod
+    def per_minute(cls, limit, max_keys=10000):
+        return cls(rate=limit / 60.0, capacity=limit, max_keys=max_keys)
+
+    def bucket(self, key):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.capacity)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def allow(self, key, amount=1):
+        if self.bucket(key).consume(amount):
+            self.allowed += 1
+            return True
+        self.limited += 1
+        return False
+
+    def retry_after(self, key, amount=1):
+        return self.bucket(key).retry_after(amount)
+
+    def forget(self, key):
+        self._buckets.pop(key, None)
+
+    def stats(self):
+        return {"keys": len(self._buckets), "allowed": self.allowed, "limited": self.limited}
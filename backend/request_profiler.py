@@ -0,0 +1,258 @@
+"""Profiler por muestreo de requests HTTP, con salida para flame graphs.
+
+Un hilo toma muestras del stack (sys._current_frames) cada PROFILE_INTERVAL_MS
+mientras haya requests perfilados: el hilo del event loop (JSON, middlewares,
+JWT, handlers) y los del pool de la base ("db_N", el trabajo de run_db). Las
+muestras se agrupan por stack y cada una pesa el tiempo real desde la
+anterior, así el resultado no depende de cuándo el GIL deja correr al hilo.
+
+Se activa por request con el header `X-Profile: 1` o `?profile=1` (solo con
+token de admin) o para una fracción del tráfico con PROFILE_SAMPLE_RATE
+(0.0 - 1.0, por defecto 0). La respuesta trae `X-Profile-Id` y el perfil se
+descarga de /api/profiles/{id} como:
+
+- collapsed: `a;b;c <microsegundos>` por línea (flamegraph.pl, speedscope,
+  inferno)
+- speedscope: JSON para https://www.speedscope.app
+
+Mientras se perfila un request el loop atiende otros: sus stacks también
+aparecen en las muestras. Se guardan los últimos PROFILE_KEEP perfiles en memoria.
+"""
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from urllib.parse import parse_qs
+
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "1"))
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "20"))
+PROFILE_MAX_DEPTH = 128
+
+# Hilos del pool de run_db (thread_name_prefix="db" en database.py)
+DB_THREAD_PREFIX = "db_"
+
+
+def frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse(frame, thread_name):
+    """Stack de raíz a hoja separado por ';', con el hilo como raíz"""
+    labels = []
+    while frame is not None and len(labels) < PROFILE_MAX_DEPTH:
+        labels.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.append(thread_name)
+    return ";".join(reversed(labels))
+
+
+def is_idle_worker(frame):
+    """Hilo de ThreadPoolExecutor bloqueado en la cola esperando una tarea"""
+    while frame is not None and frame.f_code.co_name != "_worker":
+        if frame.f_code.co_name not in ("get", "wait", "acquire"):
+            return False
+        frame = frame.f_back
+    return frame is not None
+
+
+class Profile:
+    def __init__(self, profile_id, method, path, reason):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.reason = reason
+        self.started_at = datetime.now(timezone.utc)
+        self.duration_ms = None
+        self.status = None
+        # stack colapsado -> [muestras, ms]
+        self.stacks = {}
+
+    def add(self, stack, weight_ms):
+        entry = self.stacks.get(stack)
+        if entry is None:
+            self.stacks[stack] = [1, weight_ms]
+        else:
+            entry[0] += 1
+            entry[1] += weight_ms
+
+    def summary(self):
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "reason": self.reason,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": self.duration_ms,
+            "samples": sum(count for count, _ in self.stacks.values()),
+        }
+
+    def collapsed(self):
+        return "".join(f"{stack} {max(1, round(ms * 1000))}\n"
+                       for stack, (_, ms) in sorted(self.stacks.items()))
+
+    def speedscope(self):
+        frames, index = [], {}
+        samples, weights = [], []
+        for stack, (_, ms) in self.stacks.items():
+            sample = []
+            for label in stack.split(";"):
+                if label not in index:
+                    index[label] = len(frames)
+                    name, _, location = label.partition(" (")
+                    file, _, line = location.rstrip(")").rpartition(":")
+                    frame = {"name": name}
+                    if file:
+                        frame.update(file=file, line=int(line))
+                    frames.append(frame)
+                sample.append(index[label])
+            samples.append(sample)
+            weights.append(round(ms, 3))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{self.method} {self.path}",
+            "exporter": "ares-club request_profiler",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": f"{self.method} {self.path} ({self.started_at.isoformat()})",
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 3),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+
+class RequestProfiler:
+    def __init__(self, interval_ms=1.0, keep=20, sample_rate=0.0):
+        self.interval = interval_ms / 1000
+        self.sample_rate = sample_rate
+        self.profiles = OrderedDict()
+        self.keep = keep
+        self._ids = itertools.count(1)
+        # perfil -> id del hilo del loop que atiende el request
+        self._active = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._switch_interval = None
+
+    def start(self, method, path, loop_thread_id, reason):
+        profile = Profile(f"{int(time.time())}-{next(self._ids)}", method, path, reason)
+        with self._lock:
+            self._active[profile] = loop_thread_id
+            if self._thread is None:
+                # El loop retiene el GIL hasta 5 ms seguidos: mientras se perfila,
+                # que lo suelte a la frecuencia del muestreo
+                self._switch_interval = sys.getswitchinterval()
+                sys.setswitchinterval(min(self._switch_interval, self.interval))
+                self._thread = threading.Thread(target=self._sample, name="request-profiler", daemon=True)
+                self._thread.start()
+        return profile
+
+    def stop(self, profile, duration_ms, status):
+        profile.duration_ms = round(duration_ms, 2)
+        profile.status = status
+        with self._lock:
+            self._active.pop(profile, None)
+            self.profiles[profile.id] = profile
+            while len(self.profiles) > self.keep:
+                self.profiles.popitem(last=False)
+
+    def get(self, profile_id):
+        with self._lock:
+            return self.profiles.get(profile_id)
+
+    def list(self):
+        with self._lock:
+            return [profile.summary() for profile in reversed(self.profiles.values())]
+
+    def _sample(self):
+        last = time.perf_counter()
+        while True:
+            time.sleep(self.interval)
+            now = time.perf_counter()
+            weight_ms, last = (now - last) * 1000, now
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            frames = sys._current_frames()
+            db_stacks = [
+                collapse(frame, names[thread_id].rstrip("0123456789") + "N")
+                for thread_id, frame in frames.items()
+                # Los hilos de la base esperando trabajo no suman
+                if names.get(thread_id, "").startswith(DB_THREAD_PREFIX) and not is_idle_worker(frame)
+            ]
+            with self._lock:
+                if not self._active:
+                    # Sin requests perfilados el hilo termina; se relanza con el próximo
+                    sys.setswitchinterval(self._switch_interval)
+                    self._thread = None
+                    return
+                for profile, loop_thread_id in self._active.items():
+                    frame = frames.get(loop_thread_id)
+                    if frame is not None:
+                        profile.add(collapse(frame, "event-loop"), weight_ms)
+                    for stack in db_stacks:
+                        profile.add(stack, weight_ms)
+
+    def should_sample(self):
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+
+def profile_requested(scope):
+    for name, value in scope.get("headers", ()):
+        if name == b"x-profile" and value not in (b"", b"0", b"false"):
+            return True
+    query = scope.get("query_string", b"")
+    if b"profile=" in query:
+        value = parse_qs(query.decode("latin-1")).get("profile", [""])[0]
+        return value not in ("", "0", "false")
+    return False
+
+
+class ProfilerMiddleware:
+    """Perfilar los requests pedidos por un admin o elegidos al azar
+
+    authorize(scope) -> bool (async) decide si el request puede pedir un perfil.
+    """
+
+    def __init__(self, app, authorize, profiler=None):
+        self.app = app
+        self.authorize = authorize
+        self.profiler = profiler or request_profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if profile_requested(scope) and await self.authorize(scope):
+            reason = "requested"
+        elif self.profiler.should_sample():
+            reason = "sampled"
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        profile = self.profiler.start(scope["method"], scope["path"], threading.get_ident(), reason)
+        status = [500]
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile.id.encode())]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            self.profiler.stop(profile, (time.perf_counter() - started) * 1000, status[0])
+
+
+request_profiler = RequestProfiler(interval_ms=PROFILE_INTERVAL_MS, keep=PROFILE_KEEP, sample_rate=PROFILE_SAMPLE_RATE)
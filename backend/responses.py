@@ -0,0 +1,121 @@
+"""Serialización JSON de las respuestas de la API.
+
+- FastJSONResponse es la clase de respuesta por defecto de la app: codifica
+  con orjson (o msgspec) en vez de json de la stdlib. JSON_ENCODER elige el
+  encoder (orjson, msgspec o json); por defecto el primero instalado.
+- PrecomputedResponse sirve endpoints cuyo contenido casi no cambia: el
+  cuerpo se serializa una sola vez a bytes y se sirve con un ETag fuerte y
+  Cache-Control; si el cliente manda If-None-Match con ese ETag se responde
+  304. Opcionalmente se guarda también la versión gzip para no comprimir por
+  request; esa versión lleva el mismo ETag pero débil (W/), porque no son los
+  mismos bytes.
+"""
+import gzip
+import hashlib
+import json
+import os
+
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa msgspec o json
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+CATALOG_CACHE_MAX_AGE = int(os.getenv("CATALOG_CACHE_MAX_AGE", "300"))
+
+
+def _json_dumps(content):
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+# Todos producen JSON compacto en UTF-8; orjson y msgspec además codifican
+# datetime, UUID y dataclasses sin pasar por un default en Python
+ENCODERS = {"json": _json_dumps}
+if orjson is not None:
+    ENCODERS["orjson"] = lambda content: orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+if msgspec is not None:
+    ENCODERS["msgspec"] = msgspec.json.Encoder().encode
+
+
+def select_encoder(name=None):
+    """Nombre del encoder a usar: el pedido si está instalado, si no el más rápido disponible"""
+    if name in ENCODERS:
+        return name
+    fallback = next(candidate for candidate in ("orjson", "msgspec", "json") if candidate in ENCODERS)
+    if name:
+        print(f"⚠️ JSON_ENCODER={name} no está disponible; se usa {fallback}")
+    return fallback
+
+
+JSON_ENCODER = select_encoder(os.getenv("JSON_ENCODER"))
+serialize = ENCODERS[JSON_ENCODER]
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse que codifica con el encoder elegido en JSON_ENCODER
+
+    Con response_model en la ruta FastAPI arma el contenido con pydantic-core
+    (sin jsonable_encoder) y acá solo se pasa a bytes.
+    """
+
+    def render(self, content) -> bytes:
+        return serialize(content)
+
+
+def content_version(content):
+    """Hash corto y estable del contenido (versión de una sección)"""
+    return hashlib.sha256(serialize(content)).hexdigest()[:16]
+
+
+def accepts_encoding(request, encoding):
+    accept = request.headers.get("accept-encoding", "")
+    for part in accept.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() == encoding and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            return True
+    return False
+
+
+def etag_matches(if_none_match, etag):
+    """Comparación débil de If-None-Match (RFC 9110), incluyendo '*'"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class PrecomputedResponse:
+    """Cuerpo JSON serializado una vez, con ETag y soporte de 304 Not Modified"""
+
+    media_type = "application/json"
+
+    def __init__(self, content, max_age=CATALOG_CACHE_MAX_AGE, compress=False):
+        self.body = serialize(content)
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+        self.gzip_body = gzip.compress(self.body, compresslevel=9) if compress else None
+        self.headers = {
+            "ETag": self.etag,
+            "Cache-Control": f"public, max-age={max_age}",
+        }
+        self.gzip_headers = None
+        if compress:
+            self.headers["Vary"] = "Accept-Encoding"
+            self.gzip_headers = dict(self.headers, **{"ETag": "W/" + self.etag, "Content-Encoding": "gzip"})
+
+    def respond(self, request):
+        if self.gzip_body is not None and accepts_encoding(request, "gzip"):
+            body, headers = self.gzip_body, self.gzip_headers
+        else:
+            body, headers = self.body, self.headers
+        if etag_matches(request.headers.get("if-none-match"), self.etag):
+            headers = {name: value for name, value in headers.items() if name != "Content-Encoding"}
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type=self.media_type, headers=headers)
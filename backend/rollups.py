@@ -0,0 +1,199 @@
+"""Agregados incrementales de interacciones para /api/stats.
+
+Cada lote ingerido suma sus eventos en buckets por hora, por día y en un total
+histórico (tabla interaction_rollups), de modo que las estadísticas se leen de
+unas pocas filas en lugar de recorrer las tablas crudas.
+
+Las ventanas de /api/stats (hour, day, week) se arman con buckets enteros: el
+que está en curso más los completos que entran en la duración, sin el bucket
+más viejo que quedaría cortado. Cubren entre la duración menos un bucket y la
+duración (hour: lo que va de la hora en curso; day: 23 a 24 h; week: 6 a 7 días).
+
+Reconstruir los agregados desde las tablas crudas:
+
+    cd backend && python rollups.py backfill
+
+La reconstrucción bloquea la escritura de agregados hasta terminar: los lotes
+que la ingesta vuelque mientras tanto esperan (y se reintentan) en vez de
+sumarse a los agregados que se están reemplazando.
+"""
+import argparse
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, text
+
+from database import SessionLocal, Contact, GameInteraction, PromoInteraction, InteractionRollup
+
+# Inicio fijo del bucket "all" (total histórico)
+ALL_TIME = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Modelo crudo -> (tipo de agregado, columna que identifica el nombre)
+ROLLUP_SOURCES = {
+    GameInteraction: ("game", "game_name"),
+    PromoInteraction: ("promo", "promo_name"),
+    Contact: ("contact", "source"),
+}
+
+# Ventana -> (granularidad, duración). Se cuentan solo buckets enteros dentro de
+# la duración, así que la ventana real es hasta un bucket más corta
+WINDOWS = {
+    "hour": ("hour", timedelta(hours=1)),
+    "day": ("hour", timedelta(days=1)),
+    "week": ("day", timedelta(days=7)),
+}
+
+
+def floor_hour(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def floor_day(moment):
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def as_utc(moment):
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def count_event(counts, kind, name, created_at, amount=1):
+    """Sumar un evento (o `amount` eventos de la misma hora) a los tres buckets"""
+    created_at = as_utc(created_at)
+    name = name or "unknown"
+    counts[(kind, name, "hour", floor_hour(created_at))] += amount
+    counts[(kind, name, "day", floor_day(created_at))] += amount
+    counts[(kind, name, "all", ALL_TIME)] += amount
+
+
+def upsert_counts(db, counts):
+    """Sumar los contadores a interaction_rollups con INSERT ... ON CONFLICT"""
+    if not counts:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    table = InteractionRollup.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["kind", "name", "period", "bucket_start"],
+        set_={"count": table.c.count + stmt.excluded["count"]},
+    )
+    # Orden determinista para que lotes concurrentes no se bloqueen mutuamente
+    rows = [
+        {"kind": kind, "name": name, "period": period, "bucket_start": bucket_start, "count": amount}
+        for (kind, name, period, bucket_start), amount in sorted(counts.items())
+    ]
+    db.execute(stmt, rows)
+
+
+def record_batch(db, batch):
+    """Hook de la cola de ingesta: actualiza los agregados en la misma transacción"""
+    counts = Counter()
+    for model, row in batch:
+        source = ROLLUP_SOURCES.get(model)
+        if source is None:
+            continue
+        kind, name_column = source
+        count_event(counts, kind, row.get(name_column), row.get("created_at") or datetime.now(timezone.utc))
+    upsert_counts(db, counts)
+
+
+def record_contact(db, source):
+    counts = Counter()
+    count_event(counts, "contact", source, datetime.now(timezone.utc))
+    upsert_counts(db, counts)
+
+
+def query_rollup_stats(db, window="all", top=5):
+    """Totales por tipo y top juegos para la ventana pedida (all, hour, day, week)"""
+    query = db.query(InteractionRollup.kind, InteractionRollup.name, func.sum(InteractionRollup.count).label("total"))
+    if window == "all":
+        query = query.filter(InteractionRollup.period == "all")
+    else:
+        period, span = WINDOWS[window]
+        since = datetime.now(timezone.utc) - span
+        # El bucket que contiene el inicio de la ventana queda afuera: sumarlo
+        # entero alargaría la ventana hasta casi el doble (hour = 1 a 2 h)
+        if period == "hour":
+            since = floor_hour(since) + timedelta(hours=1)
+        else:
+            since = floor_day(since) + timedelta(days=1)
+        query = query.filter(InteractionRollup.period == period, InteractionRollup.bucket_start >= since)
+    rows = query.group_by(InteractionRollup.kind, InteractionRollup.name).all()
+
+    totals = Counter()
+    games = []
+    for kind, name, total in rows:
+        totals[kind] += total
+        if kind == "game":
+            games.append((name, total))
+    games.sort(key=lambda game: (-game[1], game[0]))
+
+    return {
+        "window": window,
+        "total_contacts": totals["contact"],
+        "total_game_interactions": totals["game"],
+        "total_promo_interactions": totals["promo"],
+        "top_games": [{"name": name, "clicks": clicks} for name, clicks in games[:top]],
+    }
+
+
+def hour_bucket(db, column):
+    if db.get_bind().dialect.name == "postgresql":
+        return func.date_trunc("hour", column)
+    return func.strftime("%Y-%m-%d %H:00:00", column)
+
+
+def lock_rollups(db):
+    """Bloquear la escritura de interaction_rollups hasta el commit.
+
+    La ingesta inserta las filas crudas y suma los agregados en la misma
+    transacción: con el lock tomado antes de leer las tablas crudas, un lote ya
+    commiteado se ve en la lectura y uno que no espera y se suma después, sin
+    perderse ni contarse dos veces.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE interaction_rollups IN EXCLUSIVE MODE"))
+    # SQLite: el DELETE de rebuild_rollups, primera escritura de la
+    # transacción, toma el lock de escritura de toda la base
+
+
+def rebuild_rollups(db):
+    """Reconstruir todos los agregados agrupando las tablas crudas por hora"""
+    lock_rollups(db)
+    db.query(InteractionRollup).delete()
+    counts = Counter()
+    for model, (kind, name_column) in ROLLUP_SOURCES.items():
+        name = getattr(model, name_column)
+        bucket = hour_bucket(db, model.created_at)
+        rows = db.query(name, bucket, func.count()).filter(model.created_at.isnot(None)).group_by(name, bucket)
+        for row_name, row_bucket, amount in rows:
+            if isinstance(row_bucket, str):
+                row_bucket = datetime.strptime(row_bucket, "%Y-%m-%d %H:%M:%S")
+            count_event(counts, kind, row_name, row_bucket, amount)
+
+    upsert_counts(db, counts)
+    db.commit()
+    return len(counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agregados de interacciones de Ares Club")
+    parser.add_argument("command", choices=["backfill"])
+    parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        buckets = rebuild_rollups(db)
+        print(f"✅ Agregados reconstruidos: {buckets} buckets")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
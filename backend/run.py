@@ -0,0 +1,139 @@
+"""Arranque de producción: gunicorn con varios workers de uvicorn.
+
+    cd backend && python run.py
+
+La app se importa una vez en el proceso maestro (preload) y los workers la
+heredan al hacer fork, así el catálogo, las respuestas precalculadas y el
+resto del estado de solo lectura se comparten entre procesos (copy-on-write).
+Al recibir SIGTERM cada worker deja de aceptar conexiones, espera a los
+requests en curso y corre el shutdown de la app, que vuelca las colas de
+interacciones y de chat.
+
+Variables (todas opcionales):
+
+- PORT / HOST             dirección de escucha (8001 / 0.0.0.0)
+- WEB_CONCURRENCY         cantidad de workers (núcleos disponibles si hay
+                          SOCKETIO_MESSAGE_QUEUE, si no 1: sin message queue
+                          los workers no comparten el chat)
+- UVICORN_LOOP            auto | uvloop | asyncio (auto usa uvloop si está instalado)
+- UVICORN_HTTP            auto | httptools | h11
+- KEEPALIVE               segundos de keep-alive HTTP (65, más que el idle
+                          timeout típico de los proxies)
+- BACKLOG                 conexiones pendientes en el socket de escucha (2048)
+- GRACEFUL_TIMEOUT        segundos para terminar requests y volcar colas (30)
+- WORKER_TIMEOUT          segundos sin heartbeat antes de reiniciar un worker (60)
+- MAX_REQUESTS            reciclar cada worker tras N requests (0 = nunca)
+- PRELOAD                 importar la app en el maestro (true)
+- FORWARDED_ALLOW_IPS     IPs o CIDR de proxies confiables para X-Forwarded-For
+                          (127.0.0.1). "*" confía en cualquier peer: usarlo solo
+                          si la app es accesible únicamente a través del proxy,
+                          si no un cliente puede falsear su IP y esquivar los
+                          límites por IP de login y chat
+
+Sin gunicorn (ej. Windows) arranca un solo proceso de uvicorn con las mismas opciones.
+"""
+import gc
+import multiprocessing
+import os
+
+from uvicorn.workers import UvicornWorker
+
+from database import env_flag
+from socket_config import ws_per_message_deflate
+
+
+def default_workers():
+    if os.getenv("SOCKETIO_MESSAGE_QUEUE"):
+        return multiprocessing.cpu_count()
+    return 1
+
+
+WORKERS = int(os.getenv("WEB_CONCURRENCY", str(default_workers())))
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+# Mismo valor por defecto que uvicorn
+FORWARDED_ALLOW_IPS = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+if WORKERS > 1:
+    # El long-polling necesita que todos los requests de una sesión lleguen al
+    # mismo worker, y gunicorn no tiene sesiones sticky: solo WebSocket
+    os.environ.setdefault("SOCKETIO_TRANSPORTS", "websocket")
+
+
+def uvicorn_options():
+    return {
+        "loop": os.getenv("UVICORN_LOOP", "auto"),
+        "http": os.getenv("UVICORN_HTTP", "auto"),
+        "ws_per_message_deflate": ws_per_message_deflate(),
+        # Dejar margen dentro de GRACEFUL_TIMEOUT para el shutdown de la app (volcar colas)
+        "timeout_graceful_shutdown": max(1, GRACEFUL_TIMEOUT - 5),
+    }
+
+
+class AresUvicornWorker(UvicornWorker):
+    CONFIG_KWARGS = uvicorn_options()
+
+
+def gunicorn_options():
+    return {
+        "bind": f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8001')}",
+        "workers": WORKERS,
+        "worker_class": "run.AresUvicornWorker",
+        "keepalive": int(os.getenv("KEEPALIVE", "65")),
+        "backlog": int(os.getenv("BACKLOG", "2048")),
+        "graceful_timeout": GRACEFUL_TIMEOUT,
+        "timeout": int(os.getenv("WORKER_TIMEOUT", "60")),
+        "max_requests": int(os.getenv("MAX_REQUESTS", "0")),
+        "max_requests_jitter": int(os.getenv("MAX_REQUESTS_JITTER", "0")),
+        "preload_app": env_flag("PRELOAD", True),
+        "forwarded_allow_ips": FORWARDED_ALLOW_IPS,
+        "post_fork": post_fork,
+    }
+
+
+def load_app():
+    from server import socket_app
+
+    # Congelar los objetos cargados hasta acá: el GC de los workers no los
+    # recorre y las páginas compartidas no se copian al tocarles el refcount de GC
+    gc.collect()
+    gc.freeze()
+    return socket_app
+
+
+def post_fork(server, worker):
+    # Por si el maestro abrió alguna conexión: que cada worker arme su propio pool
+    from database import engine
+    engine.dispose(close=False)
+
+
+def main():
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        import uvicorn
+        print("⚠️ gunicorn no está instalado: arrancando un solo proceso de uvicorn")
+        uvicorn.run(
+            load_app(),
+            host=os.getenv("HOST", "0.0.0.0"),
+            port=int(os.getenv("PORT", "8001")),
+            timeout_keep_alive=int(os.getenv("KEEPALIVE", "65")),
+            backlog=int(os.getenv("BACKLOG", "2048")),
+            forwarded_allow_ips=FORWARDED_ALLOW_IPS,
+            **uvicorn_options(),
+        )
+        return
+
+    class AresApplication(BaseApplication):
+        def load_config(self):
+            for key, value in gunicorn_options().items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return load_app()
+
+    print(f"🚀 Arrancando {WORKERS} worker(s) en {gunicorn_options()['bind']}")
+    AresApplication().run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Modelos de respuesta de la API.
+
+Declarados como response_model, FastAPI valida y convierte el contenido con
+pydantic-core en lugar de recorrerlo con jsonable_encoder, y el resultado lo
+codifica FastJSONResponse. También documentan las respuestas en /docs.
+
+Las fechas que ya llegan como texto ISO 8601 (los mensajes del chat se
+formatean una vez al publicarlos y se comparten con los emits de Socket.IO)
+se declaran como str para no parsearlas y volver a formatearlas.
+Los modelos del catálogo aceptan campos extra: el catálogo puede traer más
+datos que los que se listan acá y se devuelven tal cual.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class CatalogItem(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+
+class Game(CatalogItem):
+    id: int
+    name: str
+    provider: Optional[str] = None
+    image: Optional[str] = None
+    category: Optional[str] = None
+    description: Optional[str] = None
+
+
+class RootResponse(BaseModel):
+    message: str
+    version: str
+    database: str
+    status: str
+
+
+class HealthResponse(BaseModel):
+    status: str
+    database: str
+    timestamp: datetime
+
+
+class DataResponse(BaseModel):
+    """Respuesta genérica {"success": true, "data": {...}} (stats y diagnósticos)"""
+    success: bool
+    data: Dict[str, Any]
+
+
+class ListResponse(BaseModel):
+    success: bool
+    data: List[Dict[str, Any]]
+
+
+class MessageResponse(BaseModel):
+    success: bool
+    message: str
+
+
+class GamesPage(BaseModel):
+    success: bool
+    data: List[Game]
+    total: int
+    offset: int
+    limit: Optional[int]
+
+
+class GameResponse(BaseModel):
+    success: bool
+    data: Game
+
+
+class GameInteractionResponse(MessageResponse):
+    game: str
+    whatsapp_url: str
+
+
+class PromoInteractionResponse(MessageResponse):
+    promo: str
+    whatsapp_url: str
+
+
+class ContactResponse(MessageResponse):
+    whatsapp_url: str
+
+
+class IngestStatsResponse(DataResponse):
+    chat: Dict[str, Any]
+
+
+class QueryStatsResponse(DataResponse):
+    enabled: bool
+
+
+class UserOut(BaseModel):
+    id: int
+    username: str
+    email: Optional[str] = None
+    is_admin: bool
+
+
+class LoginResponse(BaseModel):
+    access_token: str
+    token_type: str
+    user: UserOut
+
+
+class ChatMessageOut(BaseModel):
+    id: int
+    room: str
+    username: str
+    message: str
+    is_admin: Optional[bool] = None
+    # ISO 8601
+    created_at: str
+
+
+class ChatMessagesPage(BaseModel):
+    success: bool
+    data: List[ChatMessageOut]
+    next_before_id: Optional[int]
+
+
+class ChatRoom(BaseModel):
+    room: str
+    last_id: int
+    messages: int
+
+
+class ChatRoomsResponse(BaseModel):
+    success: bool
+    data: List[ChatRoom]
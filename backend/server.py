@@ -1,43 +1,108 @@
-from fastapi import FastAPI, HTTPException, Depends, Request
+import time
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Depends, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, text, func
+from sqlalchemy import desc, func, text
+import asyncio
 import os
+import re
 from dotenv import load_dotenv
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
 import jwt
 from datetime import timedelta
 import socketio
 
-from database import get_db, create_tables, check_db_connection, Contact, GameInteraction, PromoInteraction, User, ChatMessage, authenticate_user
+from database import engine, run_db, run_in_db_executor, check_schema, env_flag, get_user_by_username, get_pool_status, Contact, GameInteraction, PromoInteraction, ChatMessage
+from ingest import interaction_queue, QueueFullError
+from rollups import record_contact, query_rollup_stats, WINDOWS
+from catalog import games_catalog, promotions_catalog, paginate, active_promotions, PAYMENT_METHODS, FAQ
+from responses import FastJSONResponse, PrecomputedResponse, content_version
+import schemas
+from compression import CompressionMiddleware, PrecompressedStaticFiles
+from password_hashing import password_pool, PasswordPoolBusy
+from rate_limit import KeyedRateLimiter
+from user_cache import user_cache, CachedUser
+from socket_bus import build_client_manager, on_pubsub_emit
+from socket_config import socketio_server_options, ws_per_message_deflate
+from startup import startup_report
+from chat_history import chat_history, chat_rooms
+from chat_writer import chat_ids, chat_writer, sync_floor
+from chat_flood import chat_flood, BroadcastCoalescer, BROADCAST_WINDOW
+from partitions import maintain_partitions, PARTITION_MAINTENANCE_INTERVAL
+import metrics
+from metrics import MetricsMiddleware, registry
+from query_profiler import query_profiler, QueryProfilerMiddleware, QUERY_PROFILER
+from request_profiler import request_profiler, ProfilerMiddleware
 
 # Cargar variables de entorno
 load_dotenv()
 
-app = FastAPI(title="Ares Club Casino API", version="1.0.0")
+# Respuestas codificadas con orjson/msgspec (JSON_ENCODER en responses.py)
+app = FastAPI(title="Ares Club Casino API", version="1.0.0", default_response_class=FastJSONResponse)
 
 # Configuración JWT
 SECRET_KEY = os.getenv("SECRET_KEY", "ares-club-secret-key-2024")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Configuración Socket.IO
+# Límite de intentos de login por minuto (por IP y por usuario)
+login_ip_limiter = KeyedRateLimiter.per_minute(int(os.getenv("LOGIN_ATTEMPTS_PER_IP", "20")))
+login_user_limiter = KeyedRateLimiter.per_minute(int(os.getenv("LOGIN_ATTEMPTS_PER_USER", "5")))
+
+# Configuración Socket.IO (SOCKETIO_MESSAGE_QUEUE reparte los emits entre workers;
+# logging, heartbeat, compresión y transportes en socket_config.py)
 sio = socketio.AsyncServer(
     async_mode='asgi',
+    client_manager=build_client_manager(),
     cors_allowed_origins="*",
-    logger=True,
-    engineio_logger=True
+    **socketio_server_options()
 )
 
+# Salas de chat: una por visitante (visitor:<id>) y el lobby donde están los admins
+LOBBY = "lobby"
+VISITOR_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+def record_in_history(message):
+    chat_history.append(message)
+    chat_rooms.append(message)
+
+def record_batch_in_history(messages):
+    for message in messages:
+        record_in_history(message)
+
+# Los mensajes emitidos por otros workers también alimentan el historial local
+on_pubsub_emit(sio.manager, 'new_message', record_in_history)
+on_pubsub_emit(sio.manager, 'new_messages', record_batch_in_history)
+
+# Métricas: fan-out de los emits y queries de SQLAlchemy
+metrics.instrument_socketio(sio.manager)
+metrics.instrument_engine(engine)
+if QUERY_PROFILER:
+    query_profiler.instrument(engine)
+
+# Estado que ya se lleva en otros módulos: se lee recién al scrapear
+registry.gauge("ares_db_pool_checked_out", "Conexiones del pool en uso",
+               function=lambda: get_pool_status()["checked_out"])
+registry.gauge("ares_queue_depth", "Filas pendientes de escribir por cola", labels=("queue",),
+               function=lambda: {("interactions",): interaction_queue.stats()["depth"],
+                                 ("chat",): chat_writer.stats()["depth"]})
+registry.gauge("ares_interaction_queue_dropped", "Eventos de interacción descartados por cola llena (acumulado)",
+               function=lambda: interaction_queue.dropped)
+
+# Las ráfagas de mensajes se emiten agrupadas en un solo `new_messages`
+chat_broadcast = BroadcastCoalescer(sio.emit, window=BROADCAST_WINDOW)
+
 # Crear la aplicación ASGI con Socket.IO
 socket_app = socketio.ASGIApp(sio, app)
 
 # Security
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 # Configuración CORS
 app.add_middleware(
@@ -48,98 +113,101 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Montar archivos estáticos
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Comprimir respuestas JSON/texto por encima de COMPRESSION_MIN_SIZE
+app.add_middleware(CompressionMiddleware)
+
+# Queries por request (huellas, lentas y N+1)
+if QUERY_PROFILER:
+    app.add_middleware(QueryProfilerMiddleware)
+
+# Latencia por ruta y requests en curso (el último agregado envuelve a los demás)
+app.add_middleware(MetricsMiddleware)
+
+async def profile_authorized(scope) -> bool:
+    """Solo un admin puede pedir el perfil de su request (X-Profile / ?profile=1)"""
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            return scheme.lower() == "bearer" and await admin_from_token(token) is not None
+    return False
+
+# Profiler por muestreo: envuelve todo, incluidos CORS, compresión y métricas
+app.add_middleware(ProfilerMiddleware, authorize=profile_authorized)
+
+# Montar archivos estáticos (sirve variantes .br/.gz/.webp/.avif generadas por build_assets.py)
+app.mount("/static", PrecompressedStaticFiles(directory="static"), name="static")
+
+# El esquema se migra en el deploy (`alembic upgrade head`); al iniciar solo se
+# verifica la versión. DB_AUTO_MIGRATE=true migra al arrancar (desarrollo) y
+# DB_SCHEMA_CHECK=strict no arranca si la base no está en la última versión.
+DB_AUTO_MIGRATE = env_flag("DB_AUTO_MIGRATE", False)
+DB_SCHEMA_CHECK = os.getenv("DB_SCHEMA_CHECK", "warn")
+partition_task = None
+loop_lag_task = None
+
+async def partition_maintenance_loop():
+    """Crear las particiones de los próximos meses y borrar las vencidas (solo Postgres)"""
+    while True:
+        try:
+            report = await run_db(maintain_partitions)
+            if report["created"] or report["dropped"]:
+                print(f"🗂️ Particiones creadas: {report['created'] or '-'}; borradas: {report['dropped'] or '-'}")
+        except Exception as e:
+            print(f"⚠️ Error en el mantenimiento de particiones: {e}")
+        await asyncio.sleep(PARTITION_MAINTENANCE_INTERVAL)
 
-# Crear tablas al iniciar
 @app.on_event("startup")
 async def startup_event():
+    global partition_task, loop_lag_task
     print("🚀 Iniciando Ares Club Casino API...")
-    if check_db_connection():
-        print("✅ Conexión a PostgreSQL exitosa")
-        create_tables()
-        print("✅ Tablas creadas/verificadas")
+    loop_lag_task = asyncio.create_task(metrics.monitor_loop_lag())
+    with startup_report.phase("schema"):
+        try:
+            schema = await run_in_db_executor(check_schema, DB_AUTO_MIGRATE)
+        except Exception as e:
+            schema = None
+            print(f"❌ Error conectando a la base de datos: {e}")
+    
+    if schema is not None and not schema["ok"]:
+        message = f"❌ Esquema en la versión {schema['current']}, se esperaba {schema['head']}: correr `alembic upgrade head`"
+        if DB_SCHEMA_CHECK == "strict":
+            raise RuntimeError(message)
+        print(message)
+    elif schema is not None:
+        print(f"✅ Esquema en la versión {schema['head']}")
+    schema_ok = schema is not None and schema["ok"]
+    
+    # Re-aplicar el spool de chat antes de sembrar el historial. Sin base el
+    # writer arranca igual: los mensajes reintentan y van al spool
+    with startup_report.phase("chat_spool"):
+        await chat_ids.claim_slot()
+        await chat_writer.start()
+    
+    # Sin sembrar, el buffer no se da por completo y las páginas que no cubre se
+    # piden a la base: este worker no sirve un historial vacío
+    if schema_ok:
+        with startup_report.phase("chat_history"):
+            try:
+                chat_history.seed(await run_db(query_chat_messages, None, chat_history.capacity))
+            except Exception as e:
+                print(f"⚠️ Historial del chat sin sembrar ({e}): se lee de la base hasta llenarse")
+        partition_task = asyncio.create_task(partition_maintenance_loop())
     else:
-        print("❌ Error conectando a PostgreSQL")
-
-# Juegos disponibles
-GAMES = [
-    {
-        "id": 1,
-        "name": "Volcano Rising",
-        "provider": "RubyPlay",
-        "image": "https://images.pexels.com/photos/2258536/pexels-photo-2258536.jpeg?auto=compress&cs=tinysrgb&w=400",
-        "category": "slots",
-        "description": "Una aventura volcánica llena de premios ardientes"
-    },
-    {
-        "id": 2,
-        "name": "Sweet Bonanza 1000",
-        "provider": "Pragmatic Play",
-        "image": "https://images.pexels.com/photos/1191710/pexels-photo-1191710.jpeg?auto=compress&cs=tinysrgb&w=400",
-        "category": "slots",
-        "description": "Dulces premios te esperan en esta deliciosa tragamonedas"
-    },
-    {
-        "id": 3,
-        "name": "Reactoonz",
-        "provider": "Play n' Go",
-        "image": "https://images.pexels.com/photos/163064/play-stone-network-networked-interactive-163064.jpeg?auto=compress&cs=tinysrgb&w=400",
-        "category": "slots",
-        "description": "Alienígenas divertidos con grandes multiplicadores"
-    },
-    {
-        "id": 4,
-        "name": "Book of Dead",
-        "provider": "Play n' Go",
-        "image": "https://images.pexels.com/photos/256541/pexels-photo-256541.jpeg?auto=compress&cs=tinysrgb&w=400",
-        "category": "slots",
-        "description": "Explora el antiguo Egipto en busca de tesoros"
-    },
-    {
-        "id": 5,
-        "name": "Zeus Rush Fever Deluxe",
-        "provider": "RubyPlay",
-        "image": "https://images.pexels.com/photos/2258536/pexels-photo-2258536.jpeg?auto=compress&cs=tinysrgb&w=400",
-        "category": "slots",
-        "description": "El poder de Zeus en tus manos para grandes premios"
-    },
-    {
-        "id": 6,
-        "name": "Wolf Gold",
-        "provider": "Pragmatic Play",
-        "image": "https://images.pexels.com/photos/1118873/pexels-photo-1118873.jpeg?auto=compress&cs=tinysrgb&w=400",
-        "category": "slots",
-        "description": "Caza junto a los lobos por el oro más preciado"
-    }
-]
-
-# Promociones y bonos
-PROMOTIONS = [
-    {
-        "id": 1,
-        "title": "Bono de Bienvenida",
-        "description": "Los nuevos jugadores son recibidos con un bono del 20% más en tu primer carga!",
-        "type": "welcome_bonus",
-        "percentage": 20,
-        "active": True
-    },
-    {
-        "id": 2,
-        "title": "Eventos Especiales",
-        "description": "Participa en eventos especiales donde puedes ganar recompensas y premios exclusivos.",
-        "type": "special_events",
-        "active": True
-    }
-]
-
-# Métodos de pago
-PAYMENT_METHODS = [
-    {"name": "Visa", "type": "card", "icon": "💳", "image": "https://images.pexels.com/photos/164501/pexels-photo-164501.jpeg?auto=compress&cs=tinysrgb&w=200"},
-    {"name": "Mastercard", "type": "card", "icon": "💳", "image": "https://images.pexels.com/photos/164501/pexels-photo-164501.jpeg?auto=compress&cs=tinysrgb&w=200"},
-    {"name": "Transferencia Bancaria", "type": "bank", "icon": "🏦", "image": "https://images.pexels.com/photos/259027/pexels-photo-259027.jpeg?auto=compress&cs=tinysrgb&w=200"},
-    {"name": "E-Wallets", "type": "ewallet", "icon": "📱", "image": "https://images.pexels.com/photos/4386321/pexels-photo-4386321.jpeg?auto=compress&cs=tinysrgb&w=200"}
-]
+        print("⚠️ Historial del chat sin sembrar y mantenimiento de particiones desactivado: sin base o con el esquema desactualizado")
+    
+    interaction_queue.start()
+    startup_report.ready()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    for task in (partition_task, loop_lag_task):
+        if task is not None:
+            task.cancel()
+    # Volcar las interacciones y mensajes pendientes antes de salir
+    await interaction_queue.stop()
+    print("✅ Cola de interacciones volcada")
+    await chat_writer.stop()
+    print("✅ Mensajes de chat volcados")
 
 # Funciones de autenticación
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -152,23 +220,48 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def username_from_token(token: str) -> Optional[str]:
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        return username
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        return payload.get("sub")
     except jwt.PyJWTError:
+        return None
+
+def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    username = username_from_token(credentials.credentials)
+    if username is None:
         raise HTTPException(status_code=401, detail="Invalid token")
+    return username
 
-def get_current_user(db: Session = Depends(get_db), username: str = Depends(verify_token)):
-    user = db.query(User).filter(User.username == username).first()
+async def get_current_user(username: str = Depends(verify_token)) -> CachedUser:
+    # Solo se consulta Postgres si el usuario no está en la caché (o expiró)
+    user = user_cache.get(username)
     if user is None:
-        raise HTTPException(status_code=401, detail="User not found")
+        db_user = await run_db(get_user_by_username, username)
+        if db_user is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        user = user_cache.put(db_user)
+    if not user.is_active:
+        raise HTTPException(status_code=401, detail="Inactive user")
     return user
 
-@app.get("/")
+async def admin_from_token(token: Optional[str]) -> Optional[CachedUser]:
+    """Admin dueño del token, o None si no hay token / no es válido / no es admin"""
+    username = username_from_token(token) if token else None
+    if username is None:
+        return None
+    try:
+        user = await get_current_user(username)
+    except HTTPException:
+        return None
+    return user if user.is_admin else None
+
+async def get_optional_admin(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> Optional[CachedUser]:
+    return await admin_from_token(credentials.credentials if credentials else None)
+
+@app.get("/", response_model=schemas.RootResponse)
 async def root():
     return {
         "message": "Bienvenido a Ares Club Casino API",
@@ -177,11 +270,99 @@ async def root():
         "status": "active"
     }
 
-@app.get("/api/health")
-async def health_check(db: Session = Depends(get_db)):
+# Acceso a datos: funciones síncronas que se ejecutan en el pool de DB vía run_db
+def ping_database(db: Session):
+    db.execute(text("SELECT 1"))
+
+def save_contact(db: Session, contact_data: dict):
+    contact = Contact(
+        name=contact_data.get("name"),
+        phone=contact_data.get("phone"),
+        email=contact_data.get("email"),
+        message=contact_data.get("message", "Contacto desde landing page"),
+        source=contact_data.get("source", "whatsapp")
+    )
+    db.add(contact)
+    record_contact(db, contact.source)
+    db.commit()
+
+def serialize_chat_message(msg: ChatMessage):
+    return {
+        "id": msg.id,
+        "room": msg.room,
+        "username": msg.username,
+        "message": msg.message,
+        "is_admin": msg.is_admin,
+        "created_at": msg.created_at.isoformat()
+    }
+
+def query_chat_messages(db: Session, before_id: Optional[int] = None, limit: int = 50, room: Optional[str] = None):
+    """Últimos `limit` mensajes (anteriores a before_id) de una sala o de todas, paginando por la PK"""
+    query = db.query(ChatMessage)
+    if room is not None:
+        query = query.filter(ChatMessage.room == room)
+    if before_id is not None:
+        query = query.filter(ChatMessage.id < before_id)
+    messages = query.order_by(desc(ChatMessage.id)).limit(limit).all()
+    return [serialize_chat_message(msg) for msg in reversed(messages)]
+
+def merge_buffered(rows, buffered):
+    """Filas de la base más los mensajes en memoria que la escritura en lotes
+    todavía no volcó, sin repetidos y por id"""
+    by_id = {message["id"]: message for message in rows}
+    by_id.update((message["id"], message) for message in buffered)
+    return [by_id[message_id] for message_id in sorted(by_id)]
+
+def query_chat_messages_after(db: Session, last_id: int, limit: int, room: Optional[str] = None):
+    query = db.query(ChatMessage).filter(ChatMessage.id > last_id)
+    if room is not None:
+        query = query.filter(ChatMessage.room == room)
+    messages = query.order_by(ChatMessage.id).limit(limit).all()
+    return [serialize_chat_message(msg) for msg in messages]
+
+def query_chat_rooms(db: Session, limit: int):
+    """Salas de visitantes con actividad, la más reciente primero"""
+    last_id = func.max(ChatMessage.id).label("last_id")
+    rows = (
+        db.query(ChatMessage.room, last_id, func.count(ChatMessage.id))
+        .filter(ChatMessage.room != LOBBY)
+        .group_by(ChatMessage.room)
+        .order_by(desc(last_id))
+        .limit(limit)
+        .all()
+    )
+    return [{"room": room, "last_id": room_last_id, "messages": count} for room, room_last_id, count in rows]
+
+async def publish_chat_message(room: str, username: str, message: str, is_admin: bool, user_id: Optional[int] = None):
+    """Emitir un mensaje a su sala y al lobby, con id asignado por el servidor, y persistirlo en segundo plano"""
+    row = {
+        "id": chat_ids.next_id(),
+        "room": room,
+        "user_id": user_id,
+        "username": username,
+        "message": message,
+        "is_admin": is_admin,
+        "created_at": datetime.now(timezone.utc),
+    }
+    chat_writer.write(row)
+    chat_message = {
+        "id": row["id"],
+        "room": room,
+        "username": username,
+        "message": message,
+        "is_admin": is_admin,
+        "created_at": row["created_at"].isoformat()
+    }
+    record_in_history(chat_message)
+    # Solo a los participantes de la sala y a los admins del lobby
+    await chat_broadcast.publish(chat_message, room=(room, LOBBY) if room != LOBBY else LOBBY)
+    return chat_message
+
+@app.get("/api/health", response_model=schemas.HealthResponse)
+async def health_check():
     """Verificar estado de la API y base de datos"""
     try:
-        db.execute(text("SELECT 1"))
+        await run_db(ping_database)
         return {
             "status": "healthy",
             "database": "connected",
@@ -190,31 +371,144 @@ async def health_check(db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=503, detail=f"Database connection failed: {str(e)}")
 
-@app.get("/api/games")
-async def get_games():
-    """Obtener lista de juegos disponibles"""
+@app.get("/api/health/startup", response_model=schemas.DataResponse)
+async def startup_health():
+    """Duración del import y de cada fase del último arranque de este worker"""
+    return {"success": True, "data": startup_report.summary()}
+
+@app.get("/metrics")
+async def prometheus_metrics(request: Request):
+    """Métricas de este worker en formato de texto de Prometheus"""
+    if metrics.METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {metrics.METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(registry.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/api/health/pool", response_model=schemas.DataResponse)
+async def pool_status():
+    """Estado del pool de conexiones (checked-out, overflow, tiempos de espera)"""
     return {
         "success": True,
-        "data": GAMES,
-        "total": len(GAMES)
+        "data": get_pool_status()
     }
 
-@app.get("/api/games/{game_id}")
-async def get_game(game_id: int, db: Session = Depends(get_db)):
+# Respuestas de los endpoints de catálogo serializadas una sola vez (con ETag)
+static_responses = {}
+
+def refresh_static_responses():
+    games = games_catalog.items
+    promotions = active_promotions()
+    static_responses["games"] = PrecomputedResponse({
+        "success": True,
+        "data": games,
+        "total": len(games),
+        "offset": 0,
+        "limit": None
+    })
+    static_responses["promotions"] = PrecomputedResponse({
+        "success": True,
+        "data": promotions,
+        "total": len(promotions)
+    })
+    static_responses["payment-methods"] = PrecomputedResponse({
+        "success": True,
+        "data": PAYMENT_METHODS,
+        "total": len(PAYMENT_METHODS)
+    })
+    static_responses["faq"] = PrecomputedResponse({
+        "success": True,
+        "data": FAQ,
+        "total": len(FAQ)
+    })
+    
+    # Secciones del bootstrap de la landing, cada una con su versión
+    bootstrap_sections.clear()
+    bootstrap_sections.update({
+        name: {"version": content_version(data), "data": data}
+        for name, data in (
+            ("games", games),
+            ("promotions", promotions),
+            ("payment_methods", PAYMENT_METHODS),
+            ("faq", FAQ),
+        )
+    })
+    bootstrap_responses.clear()
+
+bootstrap_sections = {}
+# Respuestas de /api/bootstrap ya comprimidas, por conjunto de secciones omitidas
+bootstrap_responses = {}
+
+def get_bootstrap_response(known: Optional[str]):
+    """Armar (o reutilizar) el payload omitiendo las secciones que el cliente ya tiene"""
+    known_versions = dict(
+        part.split(":", 1) for part in (known or "").split(",") if ":" in part
+    )
+    unchanged = frozenset(
+        name for name, section in bootstrap_sections.items()
+        if known_versions.get(name) == section["version"]
+    )
+    response = bootstrap_responses.get(unchanged)
+    if response is None:
+        response = PrecomputedResponse({
+            "success": True,
+            "version": content_version({name: s["version"] for name, s in bootstrap_sections.items()}),
+            "sections": {
+                name: section for name, section in bootstrap_sections.items() if name not in unchanged
+            },
+            "unchanged": sorted(unchanged)
+        }, compress=True)
+        bootstrap_responses[unchanged] = response
+    return response
+
+refresh_static_responses()
+games_catalog.subscribe(refresh_static_responses)
+promotions_catalog.subscribe(refresh_static_responses)
+
+@app.get("/api/bootstrap")
+async def get_bootstrap(request: Request, known: Optional[str] = None):
+    """Datos de la landing (juegos, promociones, métodos de pago y FAQ) en un solo payload
+
+    known: versiones que el cliente ya tiene, ej. "games:ab12...,faq:cd34...";
+    esas secciones se omiten y se listan en "unchanged".
+    """
+    return get_bootstrap_response(known).respond(request)
+
+@app.get("/api/games", response_model=schemas.GamesPage)
+async def get_games(
+    request: Request,
+    provider: Optional[str] = None,
+    category: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500)
+):
+    """Obtener lista de juegos disponibles (filtrable por proveedor/categoría y paginada)"""
+    if provider is None and category is None and offset == 0 and limit is None:
+        return static_responses["games"].respond(request)
+    
+    games = games_catalog.filter(provider=provider, category=category)
+    return {
+        "success": True,
+        "data": paginate(games, offset, limit),
+        "total": len(games),
+        "offset": offset,
+        "limit": limit
+    }
+
+@app.get("/api/games/{game_id}", response_model=schemas.GameResponse)
+async def get_game(game_id: int):
     """Obtener detalles de un juego específico"""
-    game = next((g for g in GAMES if g["id"] == game_id), None)
+    game = games_catalog.get(game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Juego no encontrado")
     
-    # Registrar interacción
+    # Registrar interacción (best effort: si la cola está llena se descarta)
     try:
-        interaction = GameInteraction(
+        interaction_queue.enqueue(
+            GameInteraction,
             game_name=game["name"],
-            interaction_type="view"
+            interaction_type="view",
+            created_at=datetime.now(timezone.utc)
         )
-        db.add(interaction)
-        db.commit()
-    except Exception as e:
+    except QueueFullError as e:
         print(f"Error registrando interacción: {e}")
     
     return {
@@ -222,27 +516,26 @@ async def get_game(game_id: int, db: Session = Depends(get_db)):
         "data": game
     }
 
-@app.post("/api/games/{game_id}/interact")
+@app.post("/api/games/{game_id}/interact", response_model=schemas.GameInteractionResponse)
 async def interact_with_game(
     game_id: int, 
-    request: Request,
-    db: Session = Depends(get_db)
+    request: Request
 ):
     """Registrar interacción con un juego (Meta Pixel tracking)"""
-    game = next((g for g in GAMES if g["id"] == game_id), None)
+    game = games_catalog.get(game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Juego no encontrado")
     
     try:
-        # Registrar interacción en la base de datos
-        interaction = GameInteraction(
+        # Encolar la interacción; se persiste en lote en segundo plano
+        interaction_queue.enqueue(
+            GameInteraction,
             game_name=game["name"],
             interaction_type="click",
             user_agent=request.headers.get("user-agent"),
-            ip_address=request.client.host
+            ip_address=request.client.host,
+            created_at=datetime.now(timezone.utc)
         )
-        db.add(interaction)
-        db.commit()
         
         return {
             "success": True,
@@ -250,39 +543,33 @@ async def interact_with_game(
             "game": game["name"],
             "whatsapp_url": "https://wa.me/5491178419956?text=Hola!%20Buenas!!%20vengo%20por%20mi%20usuario%20de%20la%20suerte%20🍀"
         }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error registrando interacción: {str(e)}")
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=f"Error registrando interacción: {str(e)}")
 
 @app.get("/api/promotions")
-async def get_promotions():
+async def get_promotions(request: Request):
     """Obtener lista de promociones disponibles"""
-    active_promotions = [p for p in PROMOTIONS if p.get("active", True)]
-    return {
-        "success": True,
-        "data": active_promotions,
-        "total": len(active_promotions)
-    }
+    return static_responses["promotions"].respond(request)
 
-@app.post("/api/promotions/{promo_id}/interact")
+@app.post("/api/promotions/{promo_id}/interact", response_model=schemas.PromoInteractionResponse)
 async def interact_with_promotion(
     promo_id: int,
-    request: Request,
-    db: Session = Depends(get_db)
+    request: Request
 ):
     """Registrar interacción con una promoción"""
-    promo = next((p for p in PROMOTIONS if p["id"] == promo_id), None)
+    promo = promotions_catalog.get(promo_id)
     if not promo:
         raise HTTPException(status_code=404, detail="Promoción no encontrada")
     
     try:
-        interaction = PromoInteraction(
+        interaction_queue.enqueue(
+            PromoInteraction,
             promo_name=promo["title"],
             interaction_type="click",
             user_agent=request.headers.get("user-agent"),
-            ip_address=request.client.host
+            ip_address=request.client.host,
+            created_at=datetime.now(timezone.utc)
         )
-        db.add(interaction)
-        db.commit()
         
         return {
             "success": True,
@@ -290,36 +577,23 @@ async def interact_with_promotion(
             "promo": promo["title"],
             "whatsapp_url": "https://wa.me/5491178419956?text=Hola!%20Buenas!!%20vengo%20por%20mi%20usuario%20de%20la%20suerte%20🍀"
         }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error registrando interacción: {str(e)}")
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=f"Error registrando interacción: {str(e)}")
 
 @app.get("/api/payment-methods")
-async def get_payment_methods():
+async def get_payment_methods(request: Request):
     """Obtener métodos de pago disponibles"""
-    return {
-        "success": True,
-        "data": PAYMENT_METHODS,
-        "total": len(PAYMENT_METHODS)
-    }
+    return static_responses["payment-methods"].respond(request)
 
-@app.post("/api/contact")
+@app.post("/api/contact", response_model=schemas.ContactResponse)
 async def contact_form(
     contact_data: dict,
-    request: Request,
-    db: Session = Depends(get_db)
+    request: Request
 ):
     """Endpoint para formularios de contacto (Meta Pixel tracking)"""
     try:
         # Registrar contacto en la base de datos
-        contact = Contact(
-            name=contact_data.get("name"),
-            phone=contact_data.get("phone"),
-            email=contact_data.get("email"),
-            message=contact_data.get("message", "Contacto desde landing page"),
-            source=contact_data.get("source", "whatsapp")
-        )
-        db.add(contact)
-        db.commit()
+        await run_db(save_contact, contact_data)
         
         return {
             "success": True,
@@ -330,81 +604,110 @@ async def contact_form(
         raise HTTPException(status_code=500, detail=f"Error registrando contacto: {str(e)}")
 
 @app.get("/api/faq")
-async def get_faq():
+async def get_faq(request: Request):
     """Obtener preguntas frecuentes"""
-    faq_data = [
-        {
-            "id": 1,
-            "question": "¿Es Ares Club seguro?",
-            "answer": "Sí, Ares Club es seguro para todos los jugadores. El sitio utiliza tecnología de cifrado avanzada para proteger tu información personal y financiera.",
-            "category": "security"
-        },
-        {
-            "id": 2,
-            "question": "¿Cuanto tiempo demora hacer mi usuario?",
-            "answer": "Los usuarios se crean al instante que lo solicitas.",
-            "category": "account"
-        },
-        {
-            "id": 3,
-            "question": "¿Cuánto tardan los retiros?",
-            "answer": "Los retiros son en el momento que lo solicitas.",
-            "category": "payments"
-        },
-        {
-            "id": 4,
-            "question": "¿Hay política de reembolsos?",
-            "answer": "Sí, la plataforma tiene una política de reembolsos. Puedes contactar al soporte al cliente para recibir asistencia.",
-            "category": "policies"
-        },
-        {
-            "id": 5,
-            "question": "¿Hay códigos promocionales?",
-            "answer": "Los jugadores nuevos y existentes pueden aprovechar los bonos y promociones regulares disponibles en el sitio.",
-            "category": "promotions"
-        },
-        {
-            "id": 6,
-            "question": "¿Cuanto demoran las recargas?",
-            "answer": "Las recargas son en el momento apenas impacte el deposito que solicitas.",
-            "category": "payments"
-        }
-    ]
-    return {
-        "success": True,
-        "data": faq_data,
-        "total": len(faq_data)
-    }
+    return static_responses["faq"].respond(request)
+
+@app.get("/api/stats", response_model=schemas.DataResponse)
+async def get_stats(window: str = "all"):
+    """Obtener estadísticas básicas (para admin) desde los agregados incrementales
 
-@app.get("/api/stats")
-async def get_stats(db: Session = Depends(get_db)):
-    """Obtener estadísticas básicas (para admin)"""
+    window: all, hour, day o week
+    """
+    if window != "all" and window not in WINDOWS:
+        raise HTTPException(status_code=400, detail="window debe ser all, hour, day o week")
     try:
-        total_contacts = db.query(Contact).count()
-        total_game_interactions = db.query(GameInteraction).count()
-        total_promo_interactions = db.query(PromoInteraction).count()
-        
-        # Top juegos más clickeados
-        top_games = db.query(GameInteraction.game_name, func.count(GameInteraction.id).label('clicks'))\
-                     .group_by(GameInteraction.game_name)\
-                     .order_by(desc('clicks'))\
-                     .limit(5).all()
-        
         return {
             "success": True,
-            "data": {
-                "total_contacts": total_contacts,
-                "total_game_interactions": total_game_interactions,
-                "total_promo_interactions": total_promo_interactions,
-                "top_games": [{"name": game[0], "clicks": game[1]} for game in top_games]
-            }
+            "data": await run_db(query_rollup_stats, window)
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error obteniendo estadísticas: {str(e)}")
 
+@app.get("/api/stats/ingest", response_model=schemas.IngestStatsResponse)
+async def get_ingest_stats():
+    """Contadores de la cola de interacciones (profundidad, latencia de flush, descartes)"""
+    return {
+        "success": True,
+        "data": interaction_queue.stats(),
+        "chat": chat_writer.stats()
+    }
+
+@app.get("/api/stats/chat", response_model=schemas.DataResponse)
+async def get_chat_stats():
+    """Métricas del chat: mensajes aceptados/rechazados por motivo, emits agrupados y escritura"""
+    return {
+        "success": True,
+        "data": {
+            "flood": chat_flood.stats(),
+            "broadcast": chat_broadcast.stats(),
+            "writer": chat_writer.stats(),
+            "history": chat_history.stats(),
+            "rooms": chat_rooms.stats()
+        }
+    }
+
+@app.get("/api/stats/auth", response_model=schemas.DataResponse)
+async def get_auth_stats():
+    """Métricas de autenticación: caché de usuarios, pool de bcrypt y rate limits de login"""
+    return {
+        "success": True,
+        "data": {
+            "user_cache": user_cache.stats(),
+            "password_pool": password_pool.stats(),
+            "login_ip_limiter": login_ip_limiter.stats(),
+            "login_user_limiter": login_user_limiter.stats()
+        }
+    }
+
+@app.get("/api/stats/queries", response_model=schemas.QueryStatsResponse)
+async def get_query_stats(
+    top: int = Query(20, ge=1, le=200),
+    reset: bool = False,
+    current_user: CachedUser = Depends(get_current_user)
+):
+    """Perfil de queries: huellas por tiempo total, queries por request de cada ruta,
+    queries lentas y requests con demasiadas queries (solo admins)
+
+    reset=true vacía los contadores después de leerlos.
+    """
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Only admins can read query stats")
+    data = query_profiler.stats(top)
+    if reset:
+        query_profiler.reset()
+    return {"success": True, "enabled": QUERY_PROFILER, "data": data}
+
+@app.get("/api/profiles", response_model=schemas.ListResponse)
+async def list_profiles(current_user: CachedUser = Depends(get_current_user)):
+    """Perfiles de requests guardados en este worker (solo admins)"""
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Only admins can read profiles")
+    return {"success": True, "data": request_profiler.list()}
+
+@app.get("/api/profiles/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    format: str = Query("speedscope", pattern="^(speedscope|collapsed)$"),
+    current_user: CachedUser = Depends(get_current_user)
+):
+    """Descargar un perfil como JSON de speedscope o stacks colapsados (solo admins)"""
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Only admins can read profiles")
+    profile = request_profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Perfil no encontrado (puede estar en otro worker)")
+    if format == "collapsed":
+        return Response(profile.collapsed(), media_type="text/plain", headers={
+            "Content-Disposition": f'attachment; filename="profile-{profile_id}.collapsed.txt"'
+        })
+    return FastJSONResponse(profile.speedscope(), headers={
+        "Content-Disposition": f'attachment; filename="profile-{profile_id}.speedscope.json"'
+    })
+
 # Endpoints de autenticación
-@app.post("/api/auth/login")
-async def login(login_data: dict, db: Session = Depends(get_db)):
+@app.post("/api/auth/login", response_model=schemas.LoginResponse)
+async def login(login_data: dict, request: Request):
     """Login de usuario"""
     username = login_data.get("username")
     password = login_data.get("password")
@@ -412,8 +715,22 @@ async def login(login_data: dict, db: Session = Depends(get_db)):
     if not username or not password:
         raise HTTPException(status_code=400, detail="Username and password required")
     
-    user = authenticate_user(db, username, password)
-    if not user:
+    client_ip = request.client.host if request.client else "unknown"
+    for limiter, key in ((login_ip_limiter, client_ip), (login_user_limiter, username)):
+        if not limiter.allow(key):
+            raise HTTPException(
+                status_code=429,
+                detail="Too many login attempts",
+                headers={"Retry-After": str(int(limiter.retry_after(key)) + 1)}
+            )
+    
+    user = await run_db(get_user_by_username, username)
+    try:
+        # bcrypt corre en su propio pool acotado, nunca en el event loop
+        valid = user is not None and await password_pool.verify(password, user.hashed_password)
+    except PasswordPoolBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -432,8 +749,8 @@ async def login(login_data: dict, db: Session = Depends(get_db)):
         }
     }
 
-@app.get("/api/auth/me")
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+@app.get("/api/auth/me", response_model=schemas.UserOut)
+async def get_current_user_info(current_user: CachedUser = Depends(get_current_user)):
     """Obtener información del usuario actual"""
     return {
         "id": current_user.id,
@@ -443,103 +760,184 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
     }
 
 # Endpoints de chat
-@app.get("/api/chat/messages")
-async def get_chat_messages(db: Session = Depends(get_db)):
-    """Obtener mensajes del chat"""
-    messages = db.query(ChatMessage).order_by(desc(ChatMessage.created_at)).limit(50).all()
+def is_valid_room(room: str) -> bool:
+    return room == LOBBY or (room.startswith("visitor:") and bool(VISITOR_ID_PATTERN.match(room[len("visitor:"):])))
+
+def history_for(room: Optional[str]):
+    """Buffer en memoria de una sala (None = todas las salas, lo que ve el lobby)"""
+    return chat_history if room is None else chat_rooms.get(room)
+
+@app.get("/api/chat/messages", response_model=schemas.ChatMessagesPage)
+async def get_chat_messages(
+    room: Optional[str] = Query(None, max_length=100),
+    before_id: Optional[int] = Query(None, ge=1),
+    limit: int = Query(50, ge=1, le=200),
+    admin: Optional[CachedUser] = Depends(get_optional_admin)
+):
+    """Obtener mensajes de una sala del chat
+
+    El id del visitante es el secreto de su sala; sin `room` se devuelven todas
+    las salas y hace falta ser admin. Se sirven desde el buffer en memoria;
+    solo las páginas más viejas que el buffer consultan la base.
+    next_before_id es el cursor de la página siguiente (None si no hay más).
+    """
+    if room is None and admin is None:
+        raise HTTPException(status_code=403, detail="Only admins can read every room")
+    if room is not None and not is_valid_room(room):
+        raise HTTPException(status_code=400, detail="Invalid room")
+    
+    history = history_for(room)
+    messages = history.page(before_id, limit)
+    if messages is None:
+        rows = await run_db(query_chat_messages, before_id, limit, room)
+        messages = merge_buffered(rows, history.buffered(before_id=before_id))[-limit:]
     return {
         "success": True,
-        "data": [
-            {
-                "id": msg.id,
-                "username": msg.username,
-                "message": msg.message,
-                "is_admin": msg.is_admin,
-                "created_at": msg.created_at.isoformat()
-            }
-            for msg in reversed(messages)
-        ]
+        "data": messages,
+        "next_before_id": messages[0]["id"] if len(messages) == limit else None
     }
 
-@app.post("/api/chat/send")
+@app.post("/api/chat/send", response_model=schemas.MessageResponse)
 async def send_chat_message(
     message_data: dict,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user)
 ):
-    """Enviar mensaje al chat (solo admins)"""
+    """Enviar mensaje a la sala de un visitante (o al lobby) (solo admins)"""
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Only admins can send messages")
     
     message_text = message_data.get("message")
     if not message_text:
         raise HTTPException(status_code=400, detail="Message is required")
+    room = message_data.get("room") or LOBBY
+    if not isinstance(room, str) or not is_valid_room(room):
+        raise HTTPException(status_code=400, detail="Invalid room")
     
-    chat_message = ChatMessage(
-        user_id=current_user.id,
-        username=current_user.username,
-        message=message_text,
-        is_admin=True
-    )
-    
-    db.add(chat_message)
-    db.commit()
-    
-    # Emitir mensaje a todos los clientes conectados
-    await sio.emit('new_message', {
-        'id': chat_message.id,
-        'username': chat_message.username,
-        'message': chat_message.message,
-        'is_admin': True,
-        'created_at': chat_message.created_at.isoformat()
-    })
+    # Emitir a la sala y al lobby; se guarda en segundo plano
+    await publish_chat_message(room, current_user.username, message_text, True, user_id=current_user.id)
     
     return {"success": True, "message": "Message sent"}
 
+@app.get("/api/chat/rooms", response_model=schemas.ChatRoomsResponse)
+async def get_chat_rooms(
+    limit: int = Query(50, ge=1, le=200),
+    current_user: CachedUser = Depends(get_current_user)
+):
+    """Conversaciones de visitantes para el lobby de admins (solo admins)"""
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Only admins can list rooms")
+    return {"success": True, "data": await run_db(query_chat_rooms, limit)}
+
+# Historial que se envía por Socket.IO al conectar / sincronizar
+HISTORY_PAGE_SIZE = 50
+MAX_SYNC_DELTA = 200
+
+async def build_history(last_id: Optional[int], room: Optional[str] = None):
+    """Historial de una sala (None = todas) para un cliente: solo lo posterior a
+    last_id, o la última página completa
+
+    full=True indica que el cliente debe reemplazar lo que tiene.
+    """
+    history = history_for(room)
+    if last_id is not None:
+        # Re-enviar también un margen antes de last_id: otro worker puede haber
+        # emitido después un id menor (ver chat_writer.py). El cliente deduplica por id
+        last_id = sync_floor(last_id)
+        delta = history.since(last_id)
+        if delta is None:
+            rows = await run_db(query_chat_messages_after, last_id, MAX_SYNC_DELTA + 1, room)
+            delta = merge_buffered(rows, history.buffered(after_id=last_id))
+        if len(delta) <= MAX_SYNC_DELTA:
+            return {'room': room or LOBBY, 'messages': delta, 'full': False}
+    
+    # Cliente nuevo o demasiado atrasado: enviar la última página
+    messages = history.page(None, HISTORY_PAGE_SIZE)
+    if messages is None:
+        rows = await run_db(query_chat_messages, None, HISTORY_PAGE_SIZE, room)
+        messages = merge_buffered(rows, history.buffered())[-HISTORY_PAGE_SIZE:]
+    return {'room': room or LOBBY, 'messages': messages, 'full': True}
+
+def parse_last_id(value):
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
 # Socket.IO events
 @sio.event
-async def connect(sid, environ):
+async def connect(sid, environ, auth=None):
     print(f"Cliente conectado: {sid}")
-    await sio.emit('connected', {'message': 'Conectado al chat de Ares Club'}, room=sid)
+    metrics.socket_connections.inc()
+    metrics.socket_events.inc("connect")
+    # auth: {last_id, visitor_id, token}; también se aceptan por query string
+    params = dict(part.partition('=')[::2] for part in environ.get('QUERY_STRING', '').split('&'))
+    if isinstance(auth, dict):
+        params.update({key: value for key, value in auth.items() if value is not None})
+    
+    # Los admins (token válido) entran al lobby y ven todas las salas;
+    # cada visitante entra a su propia sala
+    if await admin_from_token(params.get('token')) is not None:
+        room = LOBBY
+    else:
+        visitor_id = str(params.get('visitor_id') or '')
+        room = f"visitor:{visitor_id if VISITOR_ID_PATTERN.match(visitor_id) else sid}"
+    await sio.enter_room(sid, room)
+    
+    client = environ.get('asgi.scope', {}).get('client')
+    await sio.save_session(sid, {'ip': client[0] if client else 'unknown', 'room': room})
+    await sio.emit('connected', {'message': 'Conectado al chat de Ares Club', 'room': room}, room=sid)
+    
+    # El cliente manda el último id que vio y recibe solo lo que le falta
+    try:
+        history = await build_history(parse_last_id(params.get('last_id')), None if room == LOBBY else room)
+        await sio.emit('history', history, room=sid)
+    except Exception as e:
+        print(f"Error enviando historial: {e}")
+
+@sio.event
+async def sync(sid, data):
+    """Pedir lo que falta desde un id (ej. después de un corte de red sin reconectar)"""
+    metrics.socket_events.inc("sync")
+    last_id = parse_last_id((data or {}).get('last_id')) if isinstance(data, dict) else None
+    room = (await sio.get_session(sid)).get('room', LOBBY)
+    await sio.emit('history', await build_history(last_id, None if room == LOBBY else room), room=sid)
 
 @sio.event
 async def disconnect(sid):
     print(f"Cliente desconectado: {sid}")
+    metrics.socket_connections.dec()
+    metrics.socket_events.inc("disconnect")
+    chat_flood.forget(sid)
 
 @sio.event
 async def user_message(sid, data):
     """Manejar mensajes de usuarios"""
-    username = data.get('username', 'Usuario Anónimo')
+    metrics.socket_events.inc("user_message")
+    if not isinstance(data, dict):
+        return
+    username = str(data.get('username') or 'Usuario Anónimo')[:50]
     message = data.get('message', '')
     
-    if not message.strip():
+    if not isinstance(message, str) or not message.strip():
+        return
+    
+    # Longitud, rate limit por conexión/IP y duplicados en la sala del visitante
+    # (en el lobby, varios admins comparten sala: por conexión)
+    session = await sio.get_session(sid)
+    room = session.get('room', LOBBY)
+    reason = chat_flood.check(sid, session.get('ip', 'unknown'), message, room=None if room == LOBBY else room)
+    if reason is not None:
+        await sio.emit('message_rejected', {'reason': reason}, room=sid)
         return
     
-    # Guardar mensaje en la base de datos
-    db = SessionLocal()
+    # Emitir a la sala del visitante y al lobby; la escritura en la base va por lotes
     try:
-        chat_message = ChatMessage(
-            username=username,
-            message=message,
-            is_admin=False
-        )
-        db.add(chat_message)
-        db.commit()
-        
-        # Emitir mensaje a todos los clientes
-        await sio.emit('new_message', {
-            'id': chat_message.id,
-            'username': username,
-            'message': message,
-            'is_admin': False,
-            'created_at': chat_message.created_at.isoformat()
-        })
-        
+        await publish_chat_message(room, username, message, False)
     except Exception as e:
-        print(f"Error guardando mensaje: {e}")
-    finally:
-        db.close()
+        print(f"Error enviando mensaje: {e}")
+
+startup_report.record("import", _import_started)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(socket_app, host="0.0.0.0", port=8001)
\ No newline at end of file
+    uvicorn.run(socket_app, host="0.0.0.0", port=8001, ws_per_message_deflate=ws_per_message_deflate())
\ No newline at end of file
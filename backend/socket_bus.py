@@ -0,0 +1,186 @@
+"""Client managers de Socket.IO para repartir emits entre workers y hosts.
+
+SOCKETIO_MESSAGE_QUEUE elige el backend de pub/sub:
+
+- sin definir            -> un solo proceso (AsyncManager por defecto)
+- redis://host:6379/0    -> socketio.AsyncRedisManager (requiere `redis`)
+- postgresql://...       -> LISTEN/NOTIFY de Postgres (requiere `asyncpg`)
+- memory://canal         -> bus en memoria entre servidores del mismo proceso,
+                            solo para tests
+"""
+import asyncio
+import json
+import os
+import pickle
+import threading
+import uuid
+from collections import OrderedDict
+
+import socketio
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+try:
+    import asyncpg
+except ImportError:  # asyncpg es opcional: solo hace falta para postgresql://
+    asyncpg = None
+
+DEFAULT_CHANNEL = os.getenv("SOCKETIO_CHANNEL", "ares_socketio")
+# NOTIFY rechaza payloads de 8000 bytes o más (configuración por defecto de Postgres)
+NOTIFY_MAX_BYTES = 7999
+
+
+class InMemoryPubSubManager(AsyncPubSubManager):
+    """Pub/sub en memoria compartido por todos los servidores de este proceso.
+
+    Cada servidor puede correr en su propio event loop (un hilo por "worker"),
+    así que la entrega a otros loops usa call_soon_threadsafe.
+    """
+    name = "inmemory"
+
+    _subscribers = {}
+    _lock = threading.Lock()
+
+    async def _publish(self, data):
+        payload = pickle.dumps(data)
+        with self._lock:
+            subscribers = list(self._subscribers.get(self.channel, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, payload)
+
+    async def _listen(self):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers.setdefault(self.channel, []).append(subscriber)
+        try:
+            while True:
+                yield await subscriber[1].get()
+        finally:
+            with self._lock:
+                self._subscribers[self.channel].remove(subscriber)
+
+
+def notify_frames(payload, limit=NOTIFY_MAX_BYTES):
+    """Partir un payload JSON (ASCII) en partes que entren en un NOTIFY.
+
+    Cada parte lleva adelante "~<id> <n>/<total> "; un JSON nunca empieza con "~".
+    """
+    if len(payload) <= limit:
+        return [payload]
+    message_id = uuid.uuid4().hex
+    size = limit - len(f"~{message_id} 99999/99999 ")
+    parts = [payload[start:start + size] for start in range(0, len(payload), size)]
+    return [f"~{message_id} {index}/{len(parts)} {part}" for index, part in enumerate(parts, 1)]
+
+
+class NotifyAssembler:
+    """Rearma los payloads que notify_frames partió"""
+
+    def __init__(self, max_partial=100):
+        self.max_partial = max_partial
+        self._partial = OrderedDict()
+
+    def feed(self, frame):
+        """Payload completo, o None si todavía faltan partes"""
+        if not frame.startswith("~"):
+            return frame
+        message_id, position, part = frame[1:].split(" ", 2)
+        index, total = (int(value) for value in position.split("/"))
+        parts = self._partial.setdefault(message_id, {})
+        parts[index] = part
+        if len(parts) < total:
+            # Las partes de un publicador que se cayó a mitad no quedan para siempre
+            while len(self._partial) > self.max_partial:
+                self._partial.popitem(last=False)
+            return None
+        del self._partial[message_id]
+        return "".join(parts[i] for i in range(1, total + 1))
+
+
+class AsyncPostgresManager(AsyncPubSubManager):
+    """Pub/sub sobre LISTEN/NOTIFY de Postgres.
+
+    Los mensajes viajan como JSON. NOTIFY admite menos de 8000 bytes por
+    payload y un lote de new_messages (o un solo mensaje con emojis, que JSON
+    escapa) lo supera: se parte con notify_frames y se publica en una
+    transacción, así los listeners reciben todas las partes juntas.
+    """
+    name = "asyncpostgres"
+
+    def __init__(self, url, channel=DEFAULT_CHANNEL, write_only=False, logger=None):
+        if asyncpg is None:
+            raise RuntimeError("Instalá asyncpg para usar Postgres como message queue de Socket.IO")
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        # asyncpg no entiende el sufijo de driver de SQLAlchemy (postgresql+psycopg2://)
+        scheme, _, rest = url.partition("://")
+        self.url = scheme.split("+")[0] + "://" + rest
+        self._publish_conn = None
+
+    async def _publish(self, data):
+        frames = notify_frames(json.dumps(data))
+        for attempt in (1, 2):
+            try:
+                if self._publish_conn is None or self._publish_conn.is_closed():
+                    self._publish_conn = await asyncpg.connect(self.url)
+                async with self._publish_conn.transaction():
+                    for frame in frames:
+                        await self._publish_conn.execute("SELECT pg_notify($1, $2)", self.channel, frame)
+                return
+            except (OSError, asyncpg.PostgresError):
+                self._publish_conn = None
+                if attempt == 2:
+                    self._get_logger().error("Cannot publish to postgres... giving up")
+
+    async def _listen(self):
+        retry_sleep = 1
+        while True:
+            queue = asyncio.Queue()
+            assembler = NotifyAssembler()
+            try:
+                conn = await asyncpg.connect(self.url)
+                await conn.add_listener(self.channel, lambda c, pid, channel, payload: queue.put_nowait(payload))
+                retry_sleep = 1
+                while not conn.is_closed():
+                    try:
+                        payload = assembler.feed(await asyncio.wait_for(queue.get(), timeout=30))
+                    except asyncio.TimeoutError:
+                        # Verificar que la conexión sigue viva
+                        await conn.execute("SELECT 1")
+                        continue
+                    if payload is not None:
+                        yield payload
+            except (OSError, asyncpg.PostgresError):
+                self._get_logger().error(f"Cannot receive from postgres... retrying in {retry_sleep} secs")
+                await asyncio.sleep(retry_sleep)
+                retry_sleep = min(retry_sleep * 2, 60)
+
+
+def on_pubsub_emit(manager, event, callback):
+    """Llamar callback(data) por cada emit de `event` que pase por el bus,
+    tanto los de este worker como los que llegan de otros.
+
+    Sin message queue (un solo proceso) no hace nada: el llamador ya ve sus emits.
+    """
+    if not isinstance(manager, AsyncPubSubManager):
+        return
+    original = manager._handle_emit
+
+    async def handle_emit(message):
+        if message.get("event") == event:
+            callback(message.get("data"))
+        await original(message)
+
+    manager._handle_emit = handle_emit
+
+
+def build_client_manager(url=None, channel=DEFAULT_CHANNEL):
+    """Client manager para SOCKETIO_MESSAGE_QUEUE (None = un solo proceso)"""
+    url = url if url is not None else os.getenv("SOCKETIO_MESSAGE_QUEUE")
+    if not url:
+        return None
+    if url.startswith(("redis://", "rediss://")):
+        return socketio.AsyncRedisManager(url, channel=channel)
+    if url.startswith("postgres"):
+        return AsyncPostgresManager(url, channel=channel)
+    if url.startswith("memory://"):
+        return InMemoryPubSubManager(channel=url[len("memory://"):] or channel)
+    raise ValueError(f"SOCKETIO_MESSAGE_QUEUE no soportado: {url}")
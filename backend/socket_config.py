@@ -0,0 +1,63 @@
+"""Configuración de Socket.IO / Engine.IO desde variables de entorno.
+
+Por defecto no se loguea cada paquete (engineio_logger=True escribe una línea
+por paquete de cada conexión). Variables:
+
+- SOCKETIO_LOG_LEVEL        off | error | warning | info | debug (eventos de Socket.IO)
+- ENGINEIO_LOG_LEVEL        off | error | warning | info | debug (paquetes de Engine.IO)
+- SOCKETIO_PING_INTERVAL    segundos entre pings (25)
+- SOCKETIO_PING_TIMEOUT     segundos sin pong antes de cortar (20)
+- SOCKETIO_MAX_HTTP_BUFFER_SIZE  tamaño máximo de un mensaje entrante (65536)
+- SOCKETIO_HTTP_COMPRESSION comprimir respuestas de long-polling (true)
+- SOCKETIO_COMPRESSION_THRESHOLD bytes mínimos para comprimir (1024)
+- SOCKETIO_TRANSPORTS       "polling,websocket" o "websocket" (sin long-polling
+                            ni upgrade; el cliente tiene que usar solo websocket)
+- WS_PER_MESSAGE_DEFLATE    permessage-deflate en WebSocket (lo aplica uvicorn)
+"""
+import logging
+import os
+
+from database import env_flag
+
+LOG_LEVELS = {
+    "error": logging.ERROR,
+    "warning": logging.WARNING,
+    "info": logging.INFO,
+    "debug": logging.DEBUG,
+}
+
+
+def build_logger(name, level_name):
+    """Logger con el nivel pedido, o False para dejar solo los errores por defecto"""
+    level = LOG_LEVELS.get((level_name or "off").strip().lower())
+    if level is None:
+        return False
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    if not logger.handlers:
+        logger.addHandler(logging.StreamHandler())
+    return logger
+
+
+def transports():
+    value = os.getenv("SOCKETIO_TRANSPORTS", "polling,websocket")
+    return [transport.strip() for transport in value.split(",") if transport.strip()]
+
+
+def socketio_server_options():
+    """kwargs para socketio.AsyncServer"""
+    return {
+        "logger": build_logger("socketio.server", os.getenv("SOCKETIO_LOG_LEVEL")),
+        "engineio_logger": build_logger("engineio.server", os.getenv("ENGINEIO_LOG_LEVEL")),
+        "ping_interval": float(os.getenv("SOCKETIO_PING_INTERVAL", "25")),
+        "ping_timeout": float(os.getenv("SOCKETIO_PING_TIMEOUT", "20")),
+        "max_http_buffer_size": int(os.getenv("SOCKETIO_MAX_HTTP_BUFFER_SIZE", "65536")),
+        "http_compression": env_flag("SOCKETIO_HTTP_COMPRESSION", True),
+        "compression_threshold": int(os.getenv("SOCKETIO_COMPRESSION_THRESHOLD", "1024")),
+        "transports": transports(),
+    }
+
+
+def ws_per_message_deflate():
+    """permessage-deflate para uvicorn (cuesta memoria por conexión: un contexto zlib cada una)"""
+    return env_flag("WS_PER_MESSAGE_DEFLATE", True)
@@ -0,0 +1,53 @@
+"""Tiempos del arranque en frío: import de la app y cada fase del startup.
+
+El reporte se imprime al terminar el startup y queda en /api/health/startup.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+
+def process_age_ms():
+    """Milisegundos desde que arrancó el proceso (Linux), o None"""
+    try:
+        with open("/proc/self/stat") as stat:
+            started_ticks = int(stat.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as uptime:
+            uptime_seconds = float(uptime.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round((uptime_seconds - started_ticks / os.sysconf("SC_CLK_TCK")) * 1000, 1)
+
+
+class StartupReport:
+    def __init__(self):
+        self.phases = {}
+        self.ready_after_ms = None
+
+    def record(self, name, started):
+        """Guardar la duración de una fase que empezó en `started` (perf_counter)"""
+        self.phases[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, started)
+
+    def ready(self):
+        self.ready_after_ms = process_age_ms()
+        phases = ", ".join(f"{name} {ms:.0f} ms" for name, ms in self.phases.items())
+        since_start = f" ({self.ready_after_ms:.0f} ms desde el inicio del proceso)" if self.ready_after_ms else ""
+        print(f"⏱️ Arranque: {phases}{since_start}")
+
+    def summary(self):
+        return {
+            "pid": os.getpid(),
+            "phases_ms": self.phases,
+            "ready_after_process_start_ms": self.ready_after_ms,
+        }
+
+
+startup_report = StartupReport()
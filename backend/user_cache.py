@@ -0,0 +1,123 @@
+"""Caché TTL + LRU de usuarios autenticados.
+
+get_current_user consulta primero esta caché en lugar de ir a Postgres en cada
+request con token. Las entradas se invalidan al actualizar o borrar un
+usuario vía ORM (eventos de SQLAlchemy) y expiran solas tras USER_CACHE_TTL.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from database import User
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Copia inmutable de los campos de User que usan los endpoints"""
+    id: int
+    username: str
+    email: str
+    is_admin: bool
+    is_active: bool
+
+    @classmethod
+    def from_model(cls, user):
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            is_admin=bool(user.is_admin),
+            is_active=user.is_active is not False,
+        )
+
+
+class UserCache:
+    def __init__(self, max_size=1024, ttl=60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        # Las invalidaciones llegan desde los hilos del pool de DB
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, username):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[username]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(username)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, user):
+        cached = CachedUser.from_model(user)
+        with self._lock:
+            self._entries[cached.username] = (cached, time.monotonic() + self.ttl)
+            self._entries.move_to_end(cached.username)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return cached
+
+    def invalidate(self, username):
+        with self._lock:
+            if self._entries.pop(username, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+user_cache = UserCache(
+    max_size=int(os.getenv("USER_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("USER_CACHE_TTL", "60")),
+)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_updated_user(mapper, connection, target):
+    user_cache.invalidate(target.username)
+    # Si cambió el username, invalidar también el anterior
+    for old_username in inspect(target).attrs.username.history.deleted:
+        user_cache.invalidate(old_username)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_deleted_user(mapper, connection, target):
+    user_cache.invalidate(target.username)
+
+
+@event.listens_for(Session, "after_bulk_update")
+@event.listens_for(Session, "after_bulk_delete")
+def _invalidate_bulk_changes(update_context):
+    # query(User).update()/delete() no dispara eventos por fila: vaciar la caché
+    mapper = getattr(update_context, "mapper", None)
+    if mapper is not None and mapper.class_ is User:
+        user_cache.clear()
@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+Ares Club Casino - Benchmark Suite
+Runs the API in-process (uvicorn in a background thread, temporary SQLite
+database unless --database-url points at a local Postgres), hits every HTTP
+endpoint and the Socket.IO chat flows with concurrent clients, and reports
+throughput and p50/p95/p99 latency per scenario. A final mixed phase runs
+tracking, catalog reads and chat at the same time (load_test.LoadTester).
+
+    python benchmark_suite.py --save-baseline    # record benchmark_baseline.json
+    python benchmark_suite.py                    # compare; exit 1 on regression
+
+A scenario regresses when its p50 or p95 grows, or its throughput drops, by
+more than --margin (and by more than --min-delta-ms for latencies, so that
+sub-millisecond noise does not fail the run). --repeat N keeps the best of N
+runs per scenario for steadier numbers. Baselines are only comparable
+on the same machine and with the same settings; the file records both.
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+
+import requests
+import socketio
+
+from load_test import LoadTester, percentile
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+ADMIN = {"username": "admin", "password": "admin123"}
+
+# Limits that would otherwise reject benchmark traffic (set before importing the app)
+BENCHMARK_ENV = {
+    "DB_AUTO_MIGRATE": "true",
+    "LOGIN_ATTEMPTS_PER_IP": "1000000",
+    "LOGIN_ATTEMPTS_PER_USER": "1000000",
+    "CHAT_MESSAGES_PER_SECOND": "100000",
+    "CHAT_MESSAGE_BURST": "100000",
+    "CHAT_MESSAGES_PER_SECOND_PER_IP": "100000",
+    "CHAT_MESSAGE_BURST_PER_IP": "100000",
+    "CHAT_DUPLICATE_WINDOW": "0",
+}
+# Per-room window in which the server coalesces chat broadcasts (same default as chat_flood.py)
+BROADCAST_WINDOW = float(os.getenv("CHAT_BROADCAST_WINDOW", "0.05"))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class InProcessServer:
+    """The real ASGI app served by uvicorn from a background thread"""
+
+    def __init__(self, database_url=None):
+        self.workdir = tempfile.mkdtemp(prefix="ares-bench-")
+        self.database_url = database_url or f"sqlite:///{self.workdir}/bench.db"
+        self.url = None
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        import uvicorn
+
+        os.environ["DATABASE_URL"] = self.database_url
+        os.environ.setdefault("CHAT_SPOOL_PATH", os.path.join(self.workdir, "chat_spool.jsonl"))
+        for key, value in BENCHMARK_ENV.items():
+            os.environ.setdefault(key, value)
+        # server.py serves ./static and reads backend modules from sys.path
+        os.makedirs(os.path.join(self.workdir, "static"), exist_ok=True)
+        os.chdir(self.workdir)
+        sys.path.insert(0, BACKEND_DIR)
+        from server import socket_app
+
+        class ThreadServer(uvicorn.Server):
+            def install_signal_handlers(self):
+                # Signals can only be handled in the main thread
+                pass
+
+        port = free_port()
+        config = uvicorn.Config(socket_app, host="127.0.0.1", port=port, log_level="warning", loop="asyncio")
+        self._server = ThreadServer(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        deadline = time.time() + 60
+        while not self._server.started:
+            if not self._thread.is_alive() or time.time() > deadline:
+                raise RuntimeError("The in-process server did not start")
+            time.sleep(0.05)
+        self.url = f"http://127.0.0.1:{port}"
+        return self.url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=30)
+
+
+class ScenarioResult:
+    def __init__(self, name, samples, errors, elapsed):
+        self.name = name
+        self.samples = samples
+        self.errors = errors
+        self.elapsed = elapsed
+
+    def summary(self):
+        return {
+            "count": len(self.samples),
+            "errors": self.errors,
+            "rps": round(len(self.samples) / self.elapsed, 1) if self.elapsed else 0.0,
+            "mean": round(statistics.mean(self.samples), 2) if self.samples else 0.0,
+            "p50": round(percentile(self.samples, 50), 2),
+            "p95": round(percentile(self.samples, 95), 2),
+            "p99": round(percentile(self.samples, 99), 2),
+        }
+
+
+def run_closed_loop(name, total, concurrency, make_worker, pause=0.0):
+    """Run `total` operations over `concurrency` workers, each looping as fast as it can
+
+    make_worker(worker_id) returns (operation, close); operation(i) raises on
+    failure. The first operation of every worker is a warm-up and not timed.
+    `pause` seconds are left between the operations of a worker, untimed.
+    """
+    samples, errors = [], [0]
+    lock = threading.Lock()
+    per_worker = max(1, total // concurrency)
+
+    def worker(worker_id):
+        try:
+            operation, close = make_worker(worker_id)
+        except Exception:
+            with lock:
+                errors[0] += per_worker
+            return
+        try:
+            for i in range(per_worker + 1):
+                if i and pause:
+                    time.sleep(pause)
+                started = time.perf_counter()
+                try:
+                    operation(worker_id * per_worker + i)
+                except Exception:
+                    with lock:
+                        errors[0] += 1
+                    continue
+                if i:
+                    with lock:
+                        samples.append((time.perf_counter() - started) * 1000)
+        finally:
+            close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    return ScenarioResult(name, samples, errors[0], time.perf_counter() - started)
+
+
+class BenchmarkSuite:
+    def __init__(self, url, args):
+        self.url = url.rstrip("/")
+        self.args = args
+        self.token = None
+        self.results = {}
+
+    # Scenarios
+    def http_scenarios(self):
+        """(name, method, path(i), json body(i) or None, needs admin token, relative weight[, headers])
+
+        Every request goes through MetricsMiddleware and QueryProfilerMiddleware
+        (unless QUERY_PROFILER=false); the "(profiled)" scenario also has
+        ProfilerMiddleware sample the stacks for the whole request.
+        """
+        visitor_room = lambda i: f"visitor:bench-room-{i % 20:04d}"
+        metrics_token = os.getenv("METRICS_TOKEN")
+        metrics_headers = {"Authorization": f"Bearer {metrics_token}"} if metrics_token else {}
+        return [
+            ("GET /", "get", lambda i: "/", None, False, 1),
+            ("GET /api/health", "get", lambda i: "/api/health", None, False, 1),
+            ("GET /api/health/startup", "get", lambda i: "/api/health/startup", None, False, 1),
+            ("GET /api/health/pool", "get", lambda i: "/api/health/pool", None, False, 1),
+            ("GET /api/bootstrap", "get", lambda i: "/api/bootstrap", None, False, 1),
+            ("GET /api/games", "get", lambda i: "/api/games", None, False, 1),
+            ("GET /api/games?offset&limit", "get", lambda i: f"/api/games?offset={i % 3}&limit=2", None, False, 1),
+            ("GET /api/games/{id}", "get", lambda i: f"/api/games/{i % 6 + 1}", None, False, 1),
+            ("POST /api/games/{id}/interact", "post", lambda i: f"/api/games/{i % 6 + 1}/interact", None, False, 1),
+            ("GET /api/promotions", "get", lambda i: "/api/promotions", None, False, 1),
+            ("POST /api/promotions/{id}/interact", "post", lambda i: f"/api/promotions/{i % 2 + 1}/interact",
+             None, False, 1),
+            ("GET /api/payment-methods", "get", lambda i: "/api/payment-methods", None, False, 1),
+            ("POST /api/contact", "post", lambda i: "/api/contact",
+             lambda i: {"name": f"Bench {i}", "phone": "+5491100000000", "source": "benchmark"}, False, 1),
+            ("GET /api/faq", "get", lambda i: "/api/faq", None, False, 1),
+            ("GET /api/stats", "get", lambda i: "/api/stats", None, False, 1),
+            ("GET /api/stats?window=day", "get", lambda i: "/api/stats?window=day", None, False, 1),
+            ("GET /api/stats/ingest", "get", lambda i: "/api/stats/ingest", None, False, 1),
+            ("GET /api/stats/chat", "get", lambda i: "/api/stats/chat", None, False, 1),
+            ("GET /api/stats/auth", "get", lambda i: "/api/stats/auth", None, False, 1),
+            ("GET /api/stats (profiled)", "get", lambda i: "/api/stats", None, True, 1, {"X-Profile": "1"}),
+            ("GET /api/stats/queries", "get", lambda i: "/api/stats/queries", None, True, 1),
+            ("GET /api/profiles", "get", lambda i: "/api/profiles", None, True, 1),
+            ("GET /metrics", "get", lambda i: "/metrics", None, False, 1, metrics_headers),
+            # bcrypt on every call: a tenth of the requests
+            ("POST /api/auth/login", "post", lambda i: "/api/auth/login", lambda i: ADMIN, False, 0.1),
+            ("GET /api/auth/me", "get", lambda i: "/api/auth/me", None, True, 1),
+            ("POST /api/chat/send", "post", lambda i: "/api/chat/send",
+             lambda i: {"message": f"bench reply {i}", "room": visitor_room(i)}, True, 1),
+            ("GET /api/chat/messages?room", "get", lambda i: f"/api/chat/messages?room={visitor_room(i)}",
+             None, False, 1),
+            ("GET /api/chat/messages (admin)", "get", lambda i: "/api/chat/messages", None, True, 1),
+            ("GET /api/chat/rooms", "get", lambda i: "/api/chat/rooms", None, True, 1),
+        ]
+
+    def http_worker(self, method, path, body, admin, headers=None):
+        def make_worker(worker_id):
+            session = requests.Session()
+            session.headers.update(headers or {})
+            if admin:
+                session.headers["Authorization"] = f"Bearer {self.token}"
+
+            def operation(i):
+                kwargs = {"timeout": 30}
+                if body is not None:
+                    kwargs["json"] = body(i)
+                response = getattr(session, method)(f"{self.url}{path(i)}", **kwargs)
+                if response.status_code >= 400:
+                    raise RuntimeError(f"HTTP {response.status_code}")
+
+            return operation, session.close
+        return make_worker
+
+    def socket_connect_worker(self, worker_id):
+        """Connect, receive the history snapshot, disconnect"""
+        def operation(i):
+            client = socketio.Client(reconnection=False)
+            history = threading.Event()
+            client.on("history", lambda data: history.set())
+            client.connect(self.url, transports=["websocket"], auth={"visitor_id": f"bench-connect-{i:06d}"},
+                           wait_timeout=30)
+            try:
+                if not history.wait(timeout=30):
+                    raise TimeoutError("history")
+            finally:
+                client.disconnect()
+        return operation, lambda: None
+
+    def socket_session_worker(self, on_ready):
+        """A connected client in its own visitor room; on_ready(client) builds the operation"""
+        def make_worker(worker_id):
+            client = socketio.Client(reconnection=False)
+            operation = on_ready(client, worker_id)
+            client.connect(self.url, transports=["websocket"], auth={"visitor_id": f"bench-session-{worker_id:04d}"},
+                           wait_timeout=30)
+            return operation, client.disconnect
+        return make_worker
+
+    def message_round_trip(self, client, worker_id):
+        """user_message until the broadcast of that same message comes back"""
+        pending = {"text": None}
+        delivered = threading.Event()
+
+        def on_messages(batch):
+            if any(message.get("message") == pending["text"] for message in batch):
+                delivered.set()
+
+        client.on("new_message", lambda data: on_messages([data]))
+        client.on("new_messages", on_messages)
+        client.on("message_rejected", lambda data: delivered.set())
+
+        def operation(i):
+            delivered.clear()
+            pending["text"] = f"bench-{worker_id}-{i}"
+            client.emit("user_message", {"username": f"bench-{worker_id}", "message": pending["text"]})
+            if not delivered.wait(timeout=30):
+                raise TimeoutError("new_message")
+        return operation
+
+    def sync_round_trip(self, client, worker_id):
+        history = threading.Event()
+        client.on("history", lambda data: history.set())
+
+        def operation(i):
+            history.clear()
+            client.emit("sync", {"last_id": 0})
+            if not history.wait(timeout=30):
+                raise TimeoutError("history")
+        return operation
+
+    def selected(self, name):
+        return not self.args.only or any(part.lower() in name.lower() for part in self.args.only)
+
+    def run_scenario(self, name, total, concurrency, make_worker, pause=0.0):
+        if not self.selected(name):
+            return
+        # Best of N (lowest p95) to filter out one-off stalls on a busy machine
+        runs = [run_closed_loop(name, total, concurrency, make_worker, pause).summary()
+                for _ in range(self.args.repeat)]
+        self.results[name] = min(runs, key=lambda run: (run["errors"], run["p95"]))
+        print(f"  {name:<40} {self.results[name]['rps']:>8.1f} req/s  p95 {self.results[name]['p95']:.1f} ms",
+              file=sys.__stdout__, flush=True)
+
+    def run(self):
+        args = self.args
+        login = requests.post(f"{self.url}/api/auth/login", json=ADMIN, timeout=60)
+        login.raise_for_status()
+        self.token = login.json()["access_token"]
+
+        for name, method, path, body, admin, weight, *headers in self.http_scenarios():
+            total = max(args.concurrency, int(args.requests * weight))
+            self.run_scenario(name, total, args.concurrency, self.http_worker(method, path, body, admin, *headers))
+
+        self.run_scenario("socket connect+history", args.requests, args.chat_clients, self.socket_connect_worker)
+        # Every client chats in its own room. A conversation sends one message at
+        # a time, so leave the room's broadcast window between messages: this
+        # times a message that goes out at once. The burst variant sends back
+        # to back, and every message after the first waits out the window
+        self.run_scenario("socket user_message", args.requests, args.chat_clients,
+                          self.socket_session_worker(self.message_round_trip), pause=BROADCAST_WINDOW)
+        self.run_scenario("socket user_message burst", args.requests, args.chat_clients,
+                          self.socket_session_worker(self.message_round_trip))
+        self.run_scenario("socket sync", args.requests, args.chat_clients,
+                          self.socket_session_worker(self.sync_round_trip))
+
+        if args.mixed_duration > 0 and self.selected("mixed"):
+            tester = LoadTester(self.url, args.mixed_duration, args.concurrency, args.chat_clients)
+            tester.deadline = time.time() + args.mixed_duration
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency + args.chat_clients) as pool:
+                futures = [pool.submit(tester.http_worker, i) for i in range(args.concurrency)]
+                futures += [pool.submit(tester.chat_worker, i) for i in range(args.chat_clients)]
+                for future in futures:
+                    future.result()
+            elapsed = time.perf_counter() - started
+            for name in sorted(set(tester.recorder.samples) | set(tester.recorder.errors)):
+                result = ScenarioResult(f"mixed {name}", tester.recorder.samples.get(name, []),
+                                        tester.recorder.errors.get(name, 0), elapsed)
+                self.results[result.name] = result.summary()
+        return self.results
+
+
+def settings(args, database):
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "chat_clients": args.chat_clients,
+        "mixed_duration": args.mixed_duration,
+        "repeat": args.repeat,
+        "database": database,
+    }
+
+
+def compare(results, baseline, margin, min_delta_ms):
+    """Regressions of `results` against the stored baseline results"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric in ("p50", "p95"):
+            if current[metric] > previous[metric] * (1 + margin) and current[metric] - previous[metric] > min_delta_ms:
+                regressions.append(f"{name}: {metric} {previous[metric]:.1f} -> {current[metric]:.1f} ms")
+        if previous["rps"] and current["rps"] < previous["rps"] * (1 - margin):
+            regressions.append(f"{name}: throughput {previous['rps']:.1f} -> {current['rps']:.1f} req/s")
+    return regressions
+
+
+def report(results, baseline):
+    print("\n" + "=" * 110)
+    print("📊 BENCHMARK SUMMARY")
+    print("=" * 110)
+    print(f"{'scenario':<42}{'count':>7}{'errors':>7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'p95 vs baseline':>18}")
+    for name, result in results.items():
+        previous = baseline.get(name)
+        delta = ""
+        if previous and previous["p95"]:
+            delta = f"{(result['p95'] / previous['p95'] - 1) * 100:+.0f}%"
+        print(f"{name:<42}{result['count']:>7}{result['errors']:>7}{result['rps']:>9.1f}"
+              f"{result['p50']:>9.1f}{result['p95']:>9.1f}{result['p99']:>9.1f}{delta:>18}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ares Club API and chat benchmark suite")
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--database-url", help="database for the in-process app (default: temporary SQLite)")
+    parser.add_argument("--requests", type=int, default=200, help="timed operations per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent HTTP clients")
+    parser.add_argument("--chat-clients", type=int, default=8, help="concurrent Socket.IO clients")
+    parser.add_argument("--mixed-duration", type=float, default=10, help="seconds of mixed load (0 to skip)")
+    parser.add_argument("--repeat", type=int, default=1, help="run each scenario N times and keep the best")
+    parser.add_argument("--only", nargs="*", help="run only scenarios whose name contains one of these")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--margin", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="ignore latency increases below this")
+    args = parser.parse_args()
+    args.baseline = os.path.abspath(args.baseline)
+
+    server = None
+    log_path = None
+    if args.url:
+        url, database = args.url, "external"
+    else:
+        server = InProcessServer(args.database_url)
+        log_path = os.path.join(server.workdir, "server.log")
+        database = server.database_url.split(":", 1)[0]
+
+    print(f"🔥 Benchmarking {'in-process app' if server else args.url} "
+          f"({args.concurrency} HTTP clients, {args.chat_clients} chat clients, {args.requests} ops per scenario)")
+    # The app prints on every connection: keep its output out of the report
+    with open(log_path or os.devnull, "w") as log, redirect_stdout(log):
+        try:
+            if server:
+                url = server.start()
+            results = BenchmarkSuite(url, args).run()
+        finally:
+            if server:
+                server.stop()
+    if log_path:
+        print(f"Server output: {log_path}")
+
+    stored = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            stored = json.load(baseline_file)
+    report(results, {} if args.save_baseline else stored.get("results", {}))
+
+    failed = any(result["errors"] for result in results.values())
+    if failed:
+        print("\n❌ Some operations failed (see the errors column)")
+
+    current_settings = settings(args, database)
+    if args.save_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump({
+                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "machine": f"{platform.node()} / Python {platform.python_version()}",
+                "settings": current_settings,
+                "results": results,
+            }, baseline_file, indent=2)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+    elif stored:
+        if stored.get("settings") != current_settings:
+            print(f"\n⚠️ Baseline recorded with different settings: {stored.get('settings')}")
+        regressions = compare(results, stored.get("results", {}), args.margin, args.min_delta_ms)
+        if regressions:
+            failed = True
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.margin:.0%}:")
+            for regression in regressions:
+                print(f"   {regression}")
+        else:
+            print(f"\n✅ No regressions beyond {args.margin:.0%} against {args.baseline}")
+    else:
+        print(f"\nNo baseline at {args.baseline} (run with --save-baseline to record one)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
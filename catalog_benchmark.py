@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Ares Club Casino - Catalog Lookup Benchmark
+Compares the old linear scan (next(... for g in GAMES ...)) against the
+indexed Catalog for id lookups and provider/category filters
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from catalog import Catalog  # noqa: E402
+
+PROVIDERS = ["RubyPlay", "Pragmatic Play", "Play n' Go", "NetEnt", "Evolution", "Microgaming", "Hacksaw", "Nolimit City"]
+CATEGORIES = ["slots", "live", "table", "crash", "jackpot"]
+
+
+def build_games(size: int):
+    return [
+        {
+            "id": i,
+            "name": f"Game {i}",
+            "provider": PROVIDERS[i % len(PROVIDERS)],
+            "category": CATEGORIES[i % len(CATEGORIES)],
+        }
+        for i in range(1, size + 1)
+    ]
+
+
+def per_call_us(stmt, number):
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1_000_000
+
+
+def main():
+    print("Ares Club Casino - Catalog Lookup Benchmark")
+    print("-" * 78)
+    print(f"{'entries':>8}  {'scan by id':>12}  {'index by id':>12}  {'scan filter':>12}  {'index filter':>12}")
+    for size in (10, 1_000, 100_000):
+        games = build_games(size)
+        catalog = Catalog(games, indexed_fields=("provider", "category"))
+        ids = [random.randint(1, size) for _ in range(1000)]
+        number = 200 if size >= 100_000 else 2000
+
+        def scan_by_id():
+            game_id = random.choice(ids)
+            return next((g for g in games if g["id"] == game_id), None)
+
+        def index_by_id():
+            return catalog.get(random.choice(ids))
+
+        def scan_filter():
+            return [g for g in games if g["provider"] == "NetEnt" and g["category"] == "slots"]
+
+        def index_filter():
+            return catalog.filter(provider="NetEnt", category="slots")
+
+        assert scan_filter() == index_filter()
+        print(
+            f"{size:>8}  "
+            f"{per_call_us(scan_by_id, number):>10.2f}us  {per_call_us(index_by_id, number):>10.2f}us  "
+            f"{per_call_us(scan_filter, max(number // 10, 10)):>10.2f}us  {per_call_us(index_filter, max(number // 10, 10)):>10.2f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Ares Club Casino - Chat Persistence Throughput Benchmark
+Offers chat messages at a fixed rate (default 1000 msg/s) and compares the
+old per-message commit with the write-behind ChatWriter: handler latency,
+achieved rate and how long persistence lags behind the broadcast.
+Runs against a temporary SQLite database unless DATABASE_URL is set.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/chat_benchmark.db"
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from sqlalchemy import func  # noqa: E402
+
+from chat_writer import ChatIdAllocator, ChatWriter  # noqa: E402
+from database import Base, ChatMessage, engine, run_db, SessionLocal  # noqa: E402
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+def count_messages():
+    db = SessionLocal()
+    try:
+        return db.query(func.count(ChatMessage.id)).scalar()
+    finally:
+        db.close()
+
+
+def commit_one(db, row):
+    # What `user_message` did before: one INSERT + COMMIT per message
+    db.add(ChatMessage(**row))
+    db.commit()
+
+
+def make_row(i):
+    return {"username": f"bench-{i % 50}", "message": f"message {i}", "is_admin": False,
+            "created_at": datetime.now(timezone.utc)}
+
+
+async def offer(handler, rate, duration):
+    """Call handler(i) at `rate` per second; return per-message latency in ms"""
+    latencies = []
+    total = int(rate * duration)
+    started = time.perf_counter()
+
+    async def timed(i, scheduled):
+        await handler(i)
+        latencies.append((time.perf_counter() - scheduled) * 1000)
+
+    tasks = []
+    for i in range(total):
+        scheduled = started + i / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(timed(i, scheduled)))
+    await asyncio.gather(*tasks)
+    return latencies, time.perf_counter() - started
+
+
+def report(name, latencies, elapsed, lag_ms=0.0):
+    print(f"{name:<20}{len(latencies):>8}{len(latencies) / elapsed:>10.0f}{percentile(latencies, 50):>10.2f}"
+          f"{percentile(latencies, 99):>10.2f}{max(latencies):>10.2f}{lag_ms:>10.1f}")
+
+
+async def per_message_commit(rate, duration):
+    async def handler(i):
+        await run_db(commit_one, make_row(i))
+
+    latencies, elapsed = await offer(handler, rate, duration)
+    report("commit per message", latencies, elapsed)
+
+
+async def write_behind(rate, duration, spool_path):
+    ids = ChatIdAllocator()
+    writer = ChatWriter(spool_path=spool_path)
+    await writer.start()
+
+    async def handler(i):
+        writer.write({"id": ids.next_id(), "user_id": None, **make_row(i)})
+
+    latencies, elapsed = await offer(handler, rate, duration)
+    drain_started = time.perf_counter()
+    await writer.stop()
+    lag_ms = (time.perf_counter() - drain_started) * 1000
+    report("write-behind", latencies, elapsed, lag_ms)
+    stats = writer.stats()
+    print(f"  flushes={stats['flushes']} avg batch={stats['written'] / max(stats['flushes'], 1):.0f} "
+          f"max flush={stats['max_flush_ms']} ms")
+
+
+async def spool_recovery(spool_path, messages=500):
+    """Database down while messages arrive: they must land in the spool and be replayed"""
+    ids = ChatIdAllocator()
+    writer = ChatWriter(retries=1, retry_backoff=0.01, spool_path=spool_path)
+    await writer.start()
+    before = count_messages()
+
+    def failing_insert(db, rows):
+        raise ConnectionError("simulated outage")
+
+    writer._insert_rows = failing_insert
+    for i in range(messages):
+        writer.write({"id": ids.next_id(), "user_id": None, **make_row(i)})
+    await writer.flush()
+    spooled = writer.spooled
+
+    del writer._insert_rows
+    await writer.replay_spool()
+    await writer.stop()
+    persisted = count_messages() - before
+    status = "OK" if persisted == messages else "LOST MESSAGES"
+    print(f"spool recovery: {spooled} spooled during outage, {persisted}/{messages} persisted after replay -> {status}")
+    return persisted == messages
+
+
+async def main_async(rate, duration):
+    Base.metadata.create_all(bind=engine)
+    spool_path = os.path.join(tempfile.mkdtemp(), "chat_spool.jsonl")
+
+    print("Ares Club Casino - Chat Persistence Throughput Benchmark")
+    print(f"{rate:.0f} msg/s for {duration:.0f}s on {engine.dialect.name}")
+    print("-" * 78)
+    print(f"{'scenario':<20}{'msgs':>8}{'msg/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'drain ms':>10}")
+    await per_message_commit(rate, duration)
+    await write_behind(rate, duration, spool_path)
+    print("-" * 78)
+    return 0 if await spool_recovery(spool_path) else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ares Club chat persistence benchmark")
+    parser.add_argument("--rate", type=float, default=1000)
+    parser.add_argument("--duration", type=float, default=5)
+    args = parser.parse_args()
+    return asyncio.run(main_async(args.rate, args.duration))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
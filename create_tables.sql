@@ -27,7 +27,8 @@ CREATE TABLE IF NOT EXISTS game_interactions (
 );
 
 -- Crear índices para optimizar consultas de estadísticas
-CREATE INDEX IF NOT EXISTS idx_game_interactions_game_name ON game_interactions(game_name);
+-- (game_name, created_at) sirve al top de juegos por rango de fechas
+CREATE INDEX IF NOT EXISTS idx_game_interactions_game_name_created_at ON game_interactions(game_name, created_at);
 CREATE INDEX IF NOT EXISTS idx_game_interactions_created_at ON game_interactions(created_at);
 CREATE INDEX IF NOT EXISTS idx_game_interactions_type ON game_interactions(interaction_type);
 
@@ -42,10 +43,47 @@ CREATE TABLE IF NOT EXISTS promo_interactions (
 );
 
 -- Crear índices para optimizar consultas de estadísticas
-CREATE INDEX IF NOT EXISTS idx_promo_interactions_promo_name ON promo_interactions(promo_name);
+CREATE INDEX IF NOT EXISTS idx_promo_interactions_promo_name_created_at ON promo_interactions(promo_name, created_at);
 CREATE INDEX IF NOT EXISTS idx_promo_interactions_created_at ON promo_interactions(created_at);
 CREATE INDEX IF NOT EXISTS idx_promo_interactions_type ON promo_interactions(interaction_type);
 
+-- Crear tabla de agregados incrementales (alimenta /api/stats)
+CREATE TABLE IF NOT EXISTS interaction_rollups (
+    id SERIAL PRIMARY KEY,
+    kind VARCHAR(20) NOT NULL,
+    name VARCHAR(100) NOT NULL,
+    period VARCHAR(10) NOT NULL,
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    CONSTRAINT uq_interaction_rollups_bucket UNIQUE (kind, name, period, bucket_start)
+);
+
+CREATE INDEX IF NOT EXISTS ix_interaction_rollups_period_bucket ON interaction_rollups(period, bucket_start);
+
+-- Tabla de mensajes del chat (una sala por visitante + lobby de admins)
+CREATE TABLE IF NOT EXISTS chat_messages (
+    id BIGSERIAL PRIMARY KEY,
+    room VARCHAR(100) NOT NULL DEFAULT 'lobby',
+    user_id INTEGER,
+    username VARCHAR(50) NOT NULL,
+    message TEXT NOT NULL,
+    is_admin BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Bases creadas antes de las salas de chat
+ALTER TABLE chat_messages ADD COLUMN IF NOT EXISTS room VARCHAR(100) NOT NULL DEFAULT 'lobby';
+CREATE INDEX IF NOT EXISTS ix_chat_messages_room_id ON chat_messages(room, id);
+CREATE INDEX IF NOT EXISTS idx_chat_messages_created_at ON chat_messages(created_at);
+-- Ids generados por los workers (milisegundos | secuencia | slot): BIGINT, y
+-- chat_id_slots reparte los slots (migración 0003)
+ALTER TABLE chat_messages ALTER COLUMN id TYPE BIGINT;
+CREATE SEQUENCE IF NOT EXISTS chat_id_slots;
+
+-- El particionado mensual de game_interactions y promo_interactions lo hace
+-- la migración 0002 (`cd backend && alembic upgrade head`) y las particiones
+-- nuevas las crea backend/partitions.py
+
 -- Insertar algunos datos de ejemplo (opcional)
 -- Descomenta las siguientes líneas si quieres datos de prueba
 
@@ -14,6 +14,25 @@ const useMetaPixel = () => {
   return { trackEvent };
 };
 
+// Caché local de las secciones de /api/bootstrap
+const BOOTSTRAP_CACHE_KEY = 'ares_bootstrap';
+
+const loadBootstrapCache = () => {
+  try {
+    return JSON.parse(localStorage.getItem(BOOTSTRAP_CACHE_KEY)) || {};
+  } catch (error) {
+    return {};
+  }
+};
+
+const saveBootstrapCache = (sections) => {
+  try {
+    localStorage.setItem(BOOTSTRAP_CACHE_KEY, JSON.stringify(sections));
+  } catch (error) {
+    // Sin localStorage (modo privado, cuota llena): se descarga todo la próxima vez
+  }
+};
+
 function App() {
   const [games, setGames] = useState([]);
   const [promotions, setPromotions] = useState([]);
@@ -37,17 +56,28 @@ function App() {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const [gamesRes, promotionsRes, paymentRes, faqRes] = await Promise.all([
-          axios.get(`${backendUrl}/api/games`),
-          axios.get(`${backendUrl}/api/promotions`),
-          axios.get(`${backendUrl}/api/payment-methods`),
-          axios.get(`${backendUrl}/api/faq`)
-        ]);
+        // Un solo request para toda la landing; las secciones que ya tenemos
+        // guardadas (misma versión) no se vuelven a descargar
+        const cached = loadBootstrapCache();
+        const known = Object.entries(cached)
+          .map(([name, section]) => `${name}:${section.version}`)
+          .join(',');
+        
+        const response = await axios.get(`${backendUrl}/api/bootstrap`, {
+          params: known ? { known } : {}
+        });
+        
+        const sections = {};
+        (response.data.unchanged || []).forEach((name) => {
+          sections[name] = cached[name];
+        });
+        Object.assign(sections, response.data.sections);
+        saveBootstrapCache(sections);
         
-        setGames(gamesRes.data.data || []);
-        setPromotions(promotionsRes.data.data || []);
-        setPaymentMethods(paymentRes.data.data || []);
-        setFaq(faqRes.data.data || []);
+        setGames(sections.games?.data || []);
+        setPromotions(sections.promotions?.data || []);
+        setPaymentMethods(sections.payment_methods?.data || []);
+        setFaq(sections.faq?.data || []);
       } catch (error) {
         console.error('Error fetching data:', error);
       } finally {
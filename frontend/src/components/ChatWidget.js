@@ -3,6 +3,35 @@ import io from 'socket.io-client';
 import axios from 'axios';
 import './ChatWidget.css';
 
+// Agregar mensajes evitando duplicados y manteniendo el orden por id
+const mergeMessages = (current, incoming) => {
+  const seen = new Set(current.map(message => message.id));
+  const fresh = incoming.filter(message => !seen.has(message.id));
+  if (fresh.length === 0) return current;
+  return [...current, ...fresh].sort((a, b) => a.id - b.id);
+};
+
+// Id persistente del visitante: identifica su sala de soporte (visitor:<id>)
+const VISITOR_ID_KEY = 'ares_chat_visitor';
+
+const getVisitorId = () => {
+  let visitorId = localStorage.getItem(VISITOR_ID_KEY);
+  if (!visitorId) {
+    visitorId = window.crypto?.randomUUID
+      ? window.crypto.randomUUID()
+      : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 12)}`;
+    localStorage.setItem(VISITOR_ID_KEY, visitorId);
+  }
+  return visitorId;
+};
+
+// Solo WebSocket por defecto: sirve con cualquier SOCKETIO_TRANSPORTS del servidor y con
+// varios workers no necesita sesiones sticky ("polling,websocket" habilita el long-polling)
+const SOCKET_TRANSPORTS = (process.env.REACT_APP_SOCKET_TRANSPORTS || 'websocket')
+  .split(',')
+  .map(transport => transport.trim())
+  .filter(Boolean);
+
 const ChatWidget = ({ user }) => {
   const [isOpen, setIsOpen] = useState(false);
   const [messages, setMessages] = useState([]);
@@ -10,13 +39,29 @@ const ChatWidget = ({ user }) => {
   const [username, setUsername] = useState('');
   const [socket, setSocket] = useState(null);
   const [isConnected, setIsConnected] = useState(false);
+  // Sala a la que responde el admin (por defecto la del último visitante que escribió)
+  const [replyRoom, setReplyRoom] = useState(null);
   const messagesEndRef = useRef(null);
+  // Último id recibido: se envía al (re)conectar para recibir solo lo que falta
+  const lastIdRef = useRef(null);
 
   const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
+  const isAdmin = Boolean(user && user.is_admin);
 
   useEffect(() => {
-    // Conectar a Socket.IO
-    const newSocket = io(backendUrl);
+    // Cambiar de visitante a admin cambia de sala: empezar de cero
+    lastIdRef.current = null;
+    setMessages([]);
+
+    // Conectar a Socket.IO: los visitantes entran a su sala, los admins al lobby
+    const newSocket = io(backendUrl, {
+      transports: SOCKET_TRANSPORTS,
+      auth: (cb) => cb({
+        last_id: lastIdRef.current,
+        visitor_id: getVisitorId(),
+        token: isAdmin ? localStorage.getItem('token') : undefined
+      })
+    });
     setSocket(newSocket);
 
     newSocket.on('connect', () => {
@@ -30,7 +75,21 @@ const ChatWidget = ({ user }) => {
     });
 
     newSocket.on('new_message', (message) => {
-      setMessages(prev => [...prev, message]);
+      setMessages(prev => mergeMessages(prev, [message]));
+    });
+
+    // Ráfagas agrupadas por el servidor
+    newSocket.on('new_messages', (batch) => {
+      setMessages(prev => mergeMessages(prev, batch));
+    });
+
+    newSocket.on('message_rejected', (data) => {
+      console.warn('Mensaje rechazado:', data.reason);
+    });
+
+    // Historial al conectar: completo la primera vez, solo el delta al reconectar
+    newSocket.on('history', (data) => {
+      setMessages(prev => (data.full ? data.messages : mergeMessages(prev, data.messages)));
     });
 
     newSocket.on('connected', (data) => {
@@ -40,47 +99,33 @@ const ChatWidget = ({ user }) => {
     return () => {
       newSocket.close();
     };
-  }, [backendUrl]);
-
-  useEffect(() => {
-    // Cargar mensajes existentes cuando se abre el chat
-    if (isOpen && messages.length === 0) {
-      loadMessages();
-    }
-  }, [isOpen]);
+  }, [backendUrl, isAdmin]);
 
   useEffect(() => {
+    lastIdRef.current = messages.length ? messages[messages.length - 1].id : null;
     // Scroll automático al final
     scrollToBottom();
   }, [messages]);
 
-  const loadMessages = async () => {
-    try {
-      const response = await axios.get(`${backendUrl}/api/chat/messages`);
-      if (response.data.success) {
-        setMessages(response.data.data);
-      }
-    } catch (error) {
-      console.error('Error cargando mensajes:', error);
-    }
-  };
-
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
   };
 
+  const lastVisitorMessage = [...messages].reverse().find(message => !message.is_admin);
+  const targetRoom = replyRoom || (lastVisitorMessage && lastVisitorMessage.room);
+
   const handleSendMessage = async (e) => {
     e.preventDefault();
     
     if (!newMessage.trim()) return;
 
-    if (user && user.is_admin) {
+    if (isAdmin) {
       // Admin enviando mensaje a través de la API
       try {
         const token = localStorage.getItem('token');
         await axios.post(
           `${backendUrl}/api/chat/send`,
-          { message: newMessage },
+          { message: newMessage, room: targetRoom },
           {
             headers: {
               Authorization: `Bearer ${token}`
@@ -151,6 +196,7 @@ const ChatWidget = ({ user }) => {
                 <div
                   key={message.id}
                   className={`message ${message.is_admin ? 'admin' : 'user'}`}
+                  onClick={() => isAdmin && setReplyRoom(message.room)}
                 >
                   <div className="message-header">
                     <span className="username">
@@ -171,6 +217,9 @@ const ChatWidget = ({ user }) => {
           </div>
 
           <form className="chat-input-form" onSubmit={handleSendMessage}>
+            {isAdmin && targetRoom && (
+              <div className="reply-room">Respondiendo a: {targetRoom}</div>
+            )}
             {!user && (
               <input
                 type="text"
@@ -178,6 +227,7 @@ const ChatWidget = ({ user }) => {
                 value={username}
                 onChange={(e) => setUsername(e.target.value)}
                 className="username-input"
+                maxLength={50}
                 required
               />
             )}
@@ -188,6 +238,7 @@ const ChatWidget = ({ user }) => {
                 value={newMessage}
                 onChange={(e) => setNewMessage(e.target.value)}
                 className="message-input"
+                maxLength={1000}
                 disabled={!isConnected}
                 required
               />
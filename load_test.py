@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Ares Club Casino - Concurrent Load Test
+Drives chat (Socket.IO) and tracking (HTTP) traffic at the same time and
+reports p50/p95/p99 latency, to check that DB work never stalls the event loop
+"""
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import socketio
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile over a list of latencies"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class LatencyRecorder:
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            self.samples.setdefault(name, []).append(seconds * 1000)
+
+    def error(self, name: str):
+        with self._lock:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def report(self, elapsed: float):
+        print("\n" + "=" * 86)
+        print("📊 LOAD TEST SUMMARY")
+        print("=" * 86)
+        print(f"{'scenario':<36}{'count':>8}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+        for name in sorted(set(self.samples) | set(self.errors)):
+            samples = self.samples.get(name, [])
+            print(
+                f"{name:<36}{len(samples):>8}{self.errors.get(name, 0):>8}"
+                f"{len(samples) / elapsed:>9.1f}"
+                f"{percentile(samples, 50):>9.1f}{percentile(samples, 95):>9.1f}{percentile(samples, 99):>9.1f}"
+            )
+        all_samples = [s for samples in self.samples.values() for s in samples]
+        if all_samples:
+            print(f"\nOverall: {len(all_samples)} ops, mean {statistics.mean(all_samples):.1f} ms, "
+                  f"p99 {percentile(all_samples, 99):.1f} ms")
+
+
+class LoadTester:
+    def __init__(self, base_url: str, duration: float, http_workers: int, chat_clients: int):
+        self.base_url = base_url.rstrip('/')
+        self.duration = duration
+        self.http_workers = http_workers
+        self.chat_clients = chat_clients
+        self.recorder = LatencyRecorder()
+        self.deadline = 0.0
+
+    def http_worker(self, worker_id: int):
+        """Mix of tracking writes and catalog/stats reads"""
+        session = requests.Session()
+        scenarios = [
+            ("POST /api/games/{id}/interact", "post", lambda i: f"/api/games/{i % 6 + 1}/interact"),
+            ("POST /api/promotions/{id}/interact", "post", lambda i: f"/api/promotions/{i % 2 + 1}/interact"),
+            ("GET /api/games/{id}", "get", lambda i: f"/api/games/{i % 6 + 1}"),
+            ("GET /api/health", "get", lambda i: "/api/health"),
+            ("GET /api/chat/messages", "get", lambda i: f"/api/chat/messages?room=visitor:load-test-{i % 10:04d}"),
+        ]
+        i = worker_id
+        while time.time() < self.deadline:
+            name, method, path = scenarios[i % len(scenarios)]
+            started = time.perf_counter()
+            try:
+                response = getattr(session, method)(f"{self.base_url}{path(i)}", timeout=10)
+                if response.status_code >= 400:
+                    self.recorder.error(name)
+                else:
+                    self.recorder.record(name, time.perf_counter() - started)
+            except requests.RequestException:
+                self.recorder.error(name)
+            i += 1
+
+    def chat_worker(self, client_id: int):
+        """Send chat messages and measure the round trip until our broadcast arrives"""
+        client = socketio.Client(reconnection=False)
+        pending = {}
+        received = threading.Event()
+
+        @client.on('new_message')
+        def on_new_message(data):
+            started = pending.pop(data.get('message'), None)
+            if started is not None:
+                self.recorder.record("socket user_message", time.perf_counter() - started)
+                received.set()
+
+        @client.on('new_messages')
+        def on_new_messages(batch):
+            # Bursts are coalesced by the server into a single event
+            for data in batch:
+                on_new_message(data)
+
+        @client.on('message_rejected')
+        def on_message_rejected(data):
+            # Flood control kicked in (raise CHAT_MESSAGES_PER_SECOND* on the server for load tests)
+            self.recorder.error(f"socket rejected ({data.get('reason')})")
+            pending.clear()
+            received.set()
+
+        try:
+            client.connect(self.base_url, wait_timeout=10)
+        except Exception:
+            self.recorder.error("socket connect")
+            return
+
+        seq = 0
+        while time.time() < self.deadline:
+            text = f"load-{client_id}-{seq}"
+            received.clear()
+            pending[text] = time.perf_counter()
+            client.emit('user_message', {'username': f'load-{client_id}', 'message': text})
+            if not received.wait(timeout=10):
+                pending.pop(text, None)
+                self.recorder.error("socket user_message")
+            seq += 1
+        client.disconnect()
+
+    def run(self):
+        print(f"🔥 Load testing {self.base_url} for {self.duration:.0f}s "
+              f"({self.http_workers} HTTP workers, {self.chat_clients} chat clients)")
+        self.deadline = time.time() + self.duration
+        started = time.time()
+        with ThreadPoolExecutor(max_workers=self.http_workers + self.chat_clients) as pool:
+            futures = [pool.submit(self.http_worker, i) for i in range(self.http_workers)]
+            futures += [pool.submit(self.chat_worker, i) for i in range(self.chat_clients)]
+            for future in futures:
+                future.result()
+        self.recorder.report(time.time() - started)
+        return 0 if not self.recorder.errors else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ares Club concurrent load test")
+    parser.add_argument("--url", default="http://localhost:8001")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--http-workers", type=int, default=20)
+    parser.add_argument("--chat-clients", type=int, default=10)
+    args = parser.parse_args()
+
+    tester = LoadTester(args.url, args.duration, args.http_workers, args.chat_clients)
+    return tester.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
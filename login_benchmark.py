@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Ares Club Casino - Login Event-Loop Latency Benchmark
+Measures event-loop lag while N logins verify bcrypt hashes concurrently:
+inline on the loop (old behaviour) vs the bounded password worker pool
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from password_hashing import PasswordWorkerPool, get_password_hash, verify_password  # noqa: E402
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+async def monitor_lag(samples, stop, interval=0.005):
+    """Sleep `interval` in a loop and record how late each wake-up is"""
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+
+async def inline_login(password, hashed):
+    # What `login` did before: bcrypt directly inside the coroutine
+    return verify_password(password, hashed)
+
+
+async def run_scenario(name, make_login, concurrency):
+    samples = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_lag(samples, stop))
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(make_login() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await monitor
+    assert all(results)
+    print(f"{name:<16}{concurrency:>8}{elapsed:>10.2f}s{percentile(samples, 50):>10.1f}"
+          f"{percentile(samples, 99):>10.1f}{max(samples):>10.1f}")
+
+
+async def main_async(concurrency, workers):
+    password = "admin123"
+    hashed = get_password_hash(password)
+    pool = PasswordWorkerPool(workers=workers, max_queue=concurrency)
+
+    print("Ares Club Casino - Login Event-Loop Latency Benchmark")
+    print("-" * 64)
+    print(f"{'mode':<16}{'logins':>8}{'total':>11}{'lag p50':>10}{'lag p99':>10}{'lag max':>10}  (ms)")
+    await run_scenario("inline (before)", lambda: inline_login(password, hashed), concurrency)
+    await run_scenario(f"pool x{workers}", lambda: pool.verify(password, hashed), concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event-loop lag during concurrent logins")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    args = parser.parse_args()
+    asyncio.run(main_async(args.concurrency, args.workers))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
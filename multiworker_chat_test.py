@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Ares Club Casino - Multi-Worker Chat Test
+Runs the real chat (server.py's handlers, visitor rooms and lobby) on two
+workers that share a Socket.IO message queue, and checks that messages and
+history cross from one worker to the other:
+
+- a visitor message on worker A reaches the admins' lobby on worker B
+- it reaches another tab of the same visitor on worker B, but not other visitors
+- an admin message sent over REST to worker B reaches the visitor on worker A
+- a visitor reconnecting to worker B with its last id gets the delta history
+  (worker B's buffer is fed from the bus)
+- a coalesced new_messages batch over 8 KB survives the Postgres bus, which
+  has to split it into NOTIFY payloads under 8000 bytes (runs in every mode)
+
+By default both workers run in this process: two independent copies of the
+app (own Socket.IO server, chat writer and history buffers) on their own
+uvicorn threads, connected by the memory:// bus and sharing a temporary
+SQLite file. It needs nothing else and covers the handlers and the bus
+hooks. To test a real bus, --message-queue (redis://... or postgresql://...)
+starts two `server:socket_app` processes with uvicorn; they must share a
+Postgres (--database-url postgresql://...), since SQLite cannot hand out
+chat ids across processes. With --url-a/--url-b it runs against two workers
+that are already running.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+import requests
+import socketio
+import uvicorn
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+from socket_bus import NOTIFY_MAX_BYTES, NotifyAssembler, notify_frames  # noqa: E402
+
+ADMIN = {"username": "admin", "password": "admin123"}
+TIMEOUT = 10
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_worker(name, workdir, message_queue, database_url):
+    """One worker: the real app in its own uvicorn process"""
+    port = free_port()
+    env = dict(os.environ)
+    env.update({
+        "SOCKETIO_MESSAGE_QUEUE": message_queue,
+        "DATABASE_URL": database_url,
+        "DB_AUTO_MIGRATE": "true",
+        "CHAT_SPOOL_PATH": os.path.join(workdir, f"chat_spool_{name}.jsonl"),
+    })
+    log = open(os.path.join(workdir, f"worker_{name}.log"), "w")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:socket_app", "--app-dir", BACKEND_DIR, "--port", str(port),
+         "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(150):
+        if process.poll() is not None:
+            break
+        try:
+            if requests.get(f"{url}/api/health", timeout=1).ok:
+                return process, url
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Worker {name} did not start (see {workdir}/worker_{name}.log)")
+
+
+def check_notify_chunking():
+    """A full coalesced batch (50 messages of 1000 characters) through the
+    NOTIFY framing, interleaved with another publisher's frames"""
+    def batch(tag):
+        messages = [{"id": i, "room": f"visitor:{tag}", "username": "mw-visitor", "is_admin": False,
+                     "message": ("🍀 mensaje número %d " % i * 100)[:1000],
+                     "created_at": "2026-10-18T00:00:00+00:00"} for i in range(50)]
+        return {"method": "emit", "event": "new_messages", "data": messages, "namespace": "/",
+                "room": [f"visitor:{tag}", "lobby"], "skip_sid": None, "callback": None, "host_id": tag}
+
+    first, second = batch("a"), batch("b")
+    frames_a, frames_b = notify_frames(json.dumps(first)), notify_frames(json.dumps(second))
+    interleaved = [frame for pair in zip(frames_a, frames_b) for frame in pair]
+    interleaved += frames_a[len(frames_b):] + frames_b[len(frames_a):]
+
+    assembler = NotifyAssembler()
+    received = [json.loads(payload) for payload in map(assembler.feed, interleaved) if payload is not None]
+    largest = max(len(frame.encode()) for frame in interleaved)
+    ok = (len(json.dumps(first)) > 8000 and largest <= NOTIFY_MAX_BYTES
+          and sorted(received, key=lambda message: message["host_id"]) == [first, second])
+    print(f"{'✅' if ok else '❌'} NOTIFY batch over 8 KB - {'PASSED' if ok else 'FAILED'} "
+          f"({len(json.dumps(first))} bytes -> {len(frames_a)} frames, largest {largest} bytes)")
+    return ok
+
+
+def load_app_copy(name, workdir):
+    """Import a fresh copy of the app's modules; only socket_bus stays shared,
+    so every copy publishes to the same in-memory bus"""
+    for module_name, module in list(sys.modules.items()):
+        if module_name != "socket_bus" and (getattr(module, "__file__", None) or "").startswith(BACKEND_DIR):
+            del sys.modules[module_name]
+    os.environ["CHAT_SPOOL_PATH"] = os.path.join(workdir, f"chat_spool_{name}.jsonl")
+    return importlib.import_module("server")
+
+
+class InProcessWorker:
+    """One worker: a copy of the app served by uvicorn on its own thread and event loop"""
+
+    def __init__(self, name, workdir, slot):
+        self.server_module = load_app_copy(name, workdir)
+        port = free_port()
+        self.url = f"http://127.0.0.1:{port}"
+        self.server = uvicorn.Server(uvicorn.Config(self.server_module.socket_app, host="127.0.0.1", port=port,
+                                                    log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.thread.start()
+        for _ in range(150):
+            if self.server.started:
+                # Same SQLite file, so no slot from the database: give each copy its own
+                self.server_module.chat_ids.slot = slot
+                return
+            if not self.thread.is_alive():
+                break
+            time.sleep(0.2)
+        raise RuntimeError(f"Worker {name} did not start")
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=30)
+
+
+class ChatClient:
+    """Socket.IO client that records every chat message and history it receives"""
+
+    def __init__(self, url, auth):
+        self.messages = []
+        self.history = None
+        self._changed = threading.Condition()
+        self.client = socketio.Client(reconnection=False)
+        self.client.on("new_message", lambda data: self._add([data]))
+        self.client.on("new_messages", self._add)
+        self.client.on("history", self._set_history)
+        self.client.connect(url, auth=auth, wait_timeout=TIMEOUT)
+
+    def _add(self, messages):
+        with self._changed:
+            self.messages.extend(messages)
+            self._changed.notify_all()
+
+    def _set_history(self, data):
+        with self._changed:
+            self.history = data
+            self._changed.notify_all()
+
+    def wait_for(self, predicate, timeout=TIMEOUT):
+        with self._changed:
+            return self._changed.wait_for(predicate, timeout=timeout)
+
+    def find(self, text):
+        return next((message for message in self.messages if message.get("message") == text), None)
+
+    def close(self):
+        if self.client.connected:
+            self.client.disconnect()
+
+
+class MultiWorkerTester:
+    def __init__(self, url_a: str, url_b: str):
+        self.url_a = url_a
+        self.url_b = url_b
+        self.tests_run = 0
+        self.tests_passed = 0
+        self.clients = []
+
+    def log_test(self, name: str, success: bool, details: str = ""):
+        self.tests_run += 1
+        if success:
+            self.tests_passed += 1
+            print(f"✅ {name} - PASSED")
+        else:
+            print(f"❌ {name} - FAILED: {details}")
+
+    def connect(self, url, **auth):
+        client = ChatClient(url, auth)
+        self.clients.append(client)
+        return client
+
+    def run_all_tests(self):
+        print(f"\n🔍 Worker A: {self.url_a}  Worker B: {self.url_b}")
+        token = requests.post(f"{self.url_b}/api/auth/login", json=ADMIN, timeout=30).json()["access_token"]
+        visitor_id = f"mw-{uuid.uuid4().hex[:12]}"
+        room = f"visitor:{visitor_id}"
+        try:
+            admin_b = self.connect(self.url_b, token=token)
+            visitor_a = self.connect(self.url_a, visitor_id=visitor_id)
+            visitor_tab_b = self.connect(self.url_b, visitor_id=visitor_id)
+            stranger_b = self.connect(self.url_b, visitor_id=f"mw-{uuid.uuid4().hex[:12]}")
+
+            text = f"visitor-{time.time()}"
+            visitor_a.client.emit("user_message", {"username": "mw-visitor", "message": text})
+            received = admin_b.wait_for(lambda: admin_b.find(text) is not None)
+            message = admin_b.find(text) or {}
+            self.log_test("Visitor on A -> lobby on B", received and message.get("room") == room,
+                          f"lobby got {message or 'nothing'}")
+            self.log_test("Visitor on A -> same visitor's tab on B",
+                          visitor_tab_b.wait_for(lambda: visitor_tab_b.find(text) is not None),
+                          "the visitor's second tab did not get the message")
+            time.sleep(0.5)
+            self.log_test("Other visitors on B do not get it", stranger_b.find(text) is None,
+                          "message leaked to another visitor's room")
+
+            reply = f"admin-{time.time()}"
+            response = requests.post(f"{self.url_b}/api/chat/send", json={"message": reply, "room": room},
+                                     headers={"Authorization": f"Bearer {token}"}, timeout=30)
+            self.log_test("Admin REST on B -> visitor on A",
+                          response.ok and visitor_a.wait_for(lambda: visitor_a.find(reply) is not None),
+                          f"status {response.status_code}, visitor on A got nothing")
+
+            last_id = message.get("id", 1) - 1
+            reconnected = self.connect(self.url_b, visitor_id=visitor_id, last_id=last_id)
+            reconnected.wait_for(lambda: reconnected.history is not None)
+            history = reconnected.history or {}
+            texts = [item.get("message") for item in history.get("messages", [])]
+            self.log_test("Reconnect to B with last_id -> delta history",
+                          history.get("room") == room and not history.get("full") and texts[:2] == [text, reply],
+                          f"history {history}")
+        except Exception as e:
+            self.log_test("Multi-worker chat", False, str(e))
+        finally:
+            for client in self.clients:
+                client.close()
+
+        print(f"\nTests Passed: {self.tests_passed}/{self.tests_run}")
+        return 0 if self.tests_passed == self.tests_run else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-worker chat test against the real app")
+    parser.add_argument("--message-queue", default=os.getenv("SOCKETIO_MESSAGE_QUEUE"),
+                        help="redis://... or postgresql://... shared by two worker processes "
+                             "(default: both workers in this process over memory://)")
+    parser.add_argument("--database-url", help="Postgres shared by the worker processes (required with --message-queue)")
+    parser.add_argument("--url-a", help="Worker A URL (external mode)")
+    parser.add_argument("--url-b", help="Worker B URL (external mode)")
+    args = parser.parse_args()
+
+    if not check_notify_chunking():
+        return 1
+    if args.url_a and args.url_b:
+        return MultiWorkerTester(args.url_a, args.url_b).run_all_tests()
+
+    workdir = tempfile.mkdtemp(prefix="multiworker-chat-")
+    os.makedirs(os.path.join(workdir, "static"), exist_ok=True)
+    if args.message_queue and not args.message_queue.startswith("memory://"):
+        if not (args.database_url or "").startswith("postgres"):
+            parser.error("worker processes need a shared Postgres: --database-url postgresql://...")
+        return run_processes(workdir, args.message_queue, args.database_url)
+    return run_in_process(workdir)
+
+
+def run_processes(workdir, message_queue, database_url):
+    processes = []
+    try:
+        # One after the other, so only the first one migrates a new database
+        for name in ("a", "b"):
+            processes.append(start_worker(name, workdir, message_queue, database_url))
+    except RuntimeError as e:
+        for process, _ in processes:
+            process.terminate()
+        print(f"❌ {e}")
+        return 1
+    try:
+        return MultiWorkerTester(processes[0][1], processes[1][1]).run_all_tests()
+    finally:
+        for process, _ in processes:
+            process.terminate()
+            process.wait(timeout=30)
+
+
+def run_in_process(workdir):
+    os.chdir(workdir)
+    os.environ.update({
+        "SOCKETIO_MESSAGE_QUEUE": f"memory://multiworker-{uuid.uuid4().hex[:8]}",
+        "DATABASE_URL": f"sqlite:///{workdir}/chat.db",
+        "DB_AUTO_MIGRATE": "true",
+    })
+    workers = []
+    try:
+        for slot, name in enumerate(("a", "b"), 1):
+            workers.append(InProcessWorker(name, workdir, slot))
+        return MultiWorkerTester(workers[0].url, workers[1].url).run_all_tests()
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        for worker in workers:
+            worker.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
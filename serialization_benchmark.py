@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Ares Club Casino - Response Serialization Benchmark
+Per endpoint, the cost of turning a handler's return value into the response
+body, going through FastAPI's own serialize_response:
+
+- generic: no response_model, jsonable_encoder + stdlib json (JSONResponse)
+- typed:   response_model from schemas.py (pydantic-core) + stdlib json
+- fast:    response_model + FastJSONResponse (JSON_ENCODER: orjson/msgspec)
+
+Payloads mirror what each endpoint returns (real catalog, chat pages of
+50/200 messages, stats of typical size). Both paths must produce the same
+JSON; the script fails otherwise.
+
+    python serialization_benchmark.py
+    JSON_ENCODER=msgspec python serialization_benchmark.py
+"""
+
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+import schemas  # noqa: E402
+from catalog import GAMES  # noqa: E402
+from responses import JSON_ENCODER, FastJSONResponse  # noqa: E402
+
+WHATSAPP_URL = "https://wa.me/5491178419956?text=Hola!%20Buenas!!%20vengo%20por%20mi%20usuario%20de%20la%20suerte%20🍀"
+
+
+def chat_messages(count):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": i,
+            "room": f"visitor:visitor{i % 40:04d}",
+            "username": "admin" if i % 3 == 0 else f"visitante_{i % 40}",
+            "message": f"Hola! quiero mi usuario de la suerte, mensaje número {i} 🍀",
+            "is_admin": i % 3 == 0,
+            "created_at": (start + timedelta(seconds=i)).isoformat(),
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def large_catalog(size):
+    return [dict(GAMES[i % len(GAMES)], id=i + 1, name=f"Game {i + 1}") for i in range(size)]
+
+
+def query_stats(top):
+    return {
+        "slow_ms": 100.0,
+        "request_threshold": 10,
+        "fingerprints": [
+            {"query": f"SELECT chat_messages.id, chat_messages.room FROM chat_messages WHERE chat_messages.id < ? "
+                      f"ORDER BY chat_messages.id DESC LIMIT ? /* {i} */",
+             "count": 1000 + i, "total_ms": 1234.56, "mean_ms": 1.234, "max_ms": 45.6}
+            for i in range(top)
+        ],
+        "routes": [{"route": f"GET /api/route/{i}", "requests": 100, "queries_per_request": 1.5, "max_queries": 3}
+                   for i in range(10)],
+        "slow_queries": [],
+        "flagged_requests": [],
+    }
+
+
+# (endpoint, response_model, payload)
+ENDPOINTS = [
+    ("GET /api/health", schemas.HealthResponse,
+     {"status": "healthy", "database": "connected", "timestamp": datetime.utcnow()}),
+    ("GET /api/games/{id}", schemas.GameResponse, {"success": True, "data": GAMES[0]}),
+    ("POST /api/games/{id}/interact", schemas.GameInteractionResponse,
+     {"success": True, "message": "Interacción registrada", "game": GAMES[0]["name"], "whatsapp_url": WHATSAPP_URL}),
+    ("GET /api/games?provider=", schemas.GamesPage,
+     {"success": True, "data": GAMES, "total": len(GAMES), "offset": 0, "limit": None}),
+    ("GET /api/games?limit=500", schemas.GamesPage,
+     {"success": True, "data": large_catalog(500), "total": 500, "offset": 0, "limit": 500}),
+    ("POST /api/auth/login", schemas.LoginResponse,
+     {"access_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9." + "x" * 120, "token_type": "bearer",
+      "user": {"id": 1, "username": "admin", "email": "admin@aresclub.com", "is_admin": True}}),
+    ("GET /api/chat/messages", schemas.ChatMessagesPage,
+     {"success": True, "data": chat_messages(50), "next_before_id": 1}),
+    ("GET /api/chat/messages?limit=200", schemas.ChatMessagesPage,
+     {"success": True, "data": chat_messages(200), "next_before_id": 1}),
+    ("GET /api/chat/rooms", schemas.ChatRoomsResponse,
+     {"success": True, "data": [{"room": f"visitor:visitor{i:04d}", "last_id": 5000 - i, "messages": 12}
+                                for i in range(50)]}),
+    ("GET /api/stats", schemas.DataResponse,
+     {"success": True, "data": {"window": "all", "total_contacts": 1520, "total_game_interactions": 98231,
+                                "total_promo_interactions": 4410,
+                                "top_games": [{"name": game["name"], "clicks": 1000 - i} for i, game in enumerate(GAMES[:5])]}}),
+    ("GET /api/stats/queries", schemas.QueryStatsResponse,
+     {"success": True, "enabled": True, "data": query_stats(20)}),
+]
+
+
+def run(coroutine):
+    """serialize_response with is_coroutine=True never suspends: drive it by hand"""
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("serialize_response suspended")
+
+
+def generic(payload):
+    content = run(serialize_response(response_content=payload, is_coroutine=True))
+    return JSONResponse(content).body
+
+
+def typed(field, response_class):
+    def encode(payload):
+        content = run(serialize_response(field=field, response_content=payload, is_coroutine=True))
+        return response_class(content).body
+    return encode
+
+
+def per_call_us(function, payload, number):
+    return min(timeit.repeat(lambda: function(payload), number=number, repeat=5)) / number * 1_000_000
+
+
+def main():
+    print(f"Ares Club Casino - Response Serialization Benchmark (fast = {JSON_ENCODER})")
+    print("-" * 92)
+    print(f"{'endpoint':<34} {'bytes':>7}  {'generic':>10}  {'typed':>10}  {'fast':>10}  {'speedup':>8}")
+    for endpoint, model, payload in ENDPOINTS:
+        field = create_response_field(name=f"Response_{model.__name__}", type_=model)
+        typed_json = typed(field, JSONResponse)
+        fast = typed(field, FastJSONResponse)
+
+        body = generic(payload)
+        assert json.loads(fast(payload)) == json.loads(body), f"{endpoint}: typed response differs"
+
+        number = max(20, 200_000 // len(body))
+        generic_us = per_call_us(generic, payload, number)
+        typed_us = per_call_us(typed_json, payload, number)
+        fast_us = per_call_us(fast, payload, number)
+        print(f"{endpoint:<34} {len(body):>7}  {generic_us:>8.1f}us  {typed_us:>8.1f}us  {fast_us:>8.1f}us  "
+              f"{generic_us / fast_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Ares Club Casino - Socket.IO Connection Soak Benchmark
+Starts the API in a subprocess (temporary SQLite database), holds N Socket.IO
+connections in one visitor room and reports server memory per connection,
+idle CPU (heartbeats) and CPU per broadcast fanned out to every connection.
+Compare profiles by toggling logging, transports and permessage-deflate.
+Memory/CPU are read from /proc, so this runs on Linux only.
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import socketio
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+VISITOR_ID = "socket-soak-room"
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+def rss_mb(pid):
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as stat:
+        fields = stat.read().rsplit(")", 1)[1].split()
+    # utime y stime son los campos 14 y 15 (contando desde 1)
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args, workdir):
+    port = free_port()
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{workdir}/soak.db")
+    # Sin flood control para los broadcasts de prueba del admin (REST no lo usa, pero por las dudas)
+    env.setdefault("CHAT_MESSAGES_PER_SECOND", "1000")
+    # Base nueva: crear el esquema (y el admin) al arrancar
+    env.setdefault("DB_AUTO_MIGRATE", "true")
+    if args.verbose_logging:
+        env["SOCKETIO_LOG_LEVEL"] = "info"
+        env["ENGINEIO_LOG_LEVEL"] = "debug"
+    if args.websocket_only:
+        env["SOCKETIO_TRANSPORTS"] = "websocket"
+    os.makedirs(os.path.join(workdir, "static"), exist_ok=True)
+    log = open(os.path.join(workdir, "server.log"), "w")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:socket_app", "--app-dir", BACKEND_DIR, "--port", str(port),
+         "--log-level", "warning", "--ws-per-message-deflate", "true" if args.deflate else "false"],
+        cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            if requests.get(f"{url}/api/health", timeout=1).ok:
+                return process, url
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("El servidor no arrancó (ver server.log)")
+
+
+class SoakClients:
+    def __init__(self, url, count, websocket_only):
+        self.url = url
+        self.count = count
+        self.transports = ["websocket"] if websocket_only else ["polling", "websocket"]
+        self.clients = []
+        self.received = {}
+        self._lock = threading.Lock()
+
+    def _connect(self, index):
+        client = socketio.Client(reconnection=False)
+
+        @client.on("new_message")
+        def on_new_message(data):
+            with self._lock:
+                self.received[data["message"]] = self.received.get(data["message"], 0) + 1
+                if self.received[data["message"]] == self.count:
+                    self.received[data["message"] + ":done"] = time.perf_counter()
+
+        client.connect(self.url, transports=self.transports, auth={"visitor_id": VISITOR_ID}, wait_timeout=30)
+        return client
+
+    def connect_all(self):
+        with ThreadPoolExecutor(max_workers=50) as pool:
+            self.clients = list(pool.map(self._connect, range(self.count)))
+
+    def wait_for(self, text, timeout=30):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self._lock:
+                done = self.received.get(text + ":done")
+            if done is not None:
+                return done
+            time.sleep(0.001)
+        return None
+
+    def disconnect_all(self):
+        with ThreadPoolExecutor(max_workers=50) as pool:
+            list(pool.map(lambda client: client.disconnect(), self.clients))
+
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix="socket-soak-")
+    process, url = start_server(args, workdir)
+    pid = process.pid
+    try:
+        token = requests.post(f"{url}/api/auth/login", json={"username": "admin", "password": "admin123"},
+                              timeout=30).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        time.sleep(1)
+        base_rss = rss_mb(pid)
+
+        clients = SoakClients(url, args.connections, args.websocket_only)
+        started = time.perf_counter()
+        clients.connect_all()
+        connect_seconds = time.perf_counter() - started
+        time.sleep(2)
+        connected_rss = rss_mb(pid)
+
+        # Conexiones ociosas: solo heartbeats
+        idle_cpu = cpu_seconds(pid)
+        time.sleep(args.hold)
+        idle_cpu = cpu_seconds(pid) - idle_cpu
+
+        # Broadcasts a la sala donde están todas las conexiones
+        latencies = []
+        broadcast_cpu = cpu_seconds(pid)
+        session = requests.Session()
+        for i in range(args.broadcasts):
+            text = f"soak-{i}"
+            sent = time.perf_counter()
+            session.post(f"{url}/api/chat/send", json={"message": text, "room": f"visitor:{VISITOR_ID}"},
+                         headers=headers, timeout=30)
+            done = clients.wait_for(text)
+            if done is not None:
+                latencies.append((done - sent) * 1000)
+        broadcast_cpu = cpu_seconds(pid) - broadcast_cpu
+        clients.disconnect_all()
+
+        profile = ", ".join([
+            "verbose logging" if args.verbose_logging else "quiet logging",
+            "websocket only" if args.websocket_only else "polling+websocket",
+            "deflate on" if args.deflate else "deflate off",
+        ])
+        print("Ares Club Casino - Socket.IO Connection Soak Benchmark")
+        print(f"Profile: {profile}")
+        print("-" * 64)
+        print(f"connections           {args.connections:>10} (connected in {connect_seconds:.1f}s)")
+        print(f"server RSS            {base_rss:>10.1f} MB -> {connected_rss:.1f} MB")
+        print(f"memory / connection   {(connected_rss - base_rss) * 1024 / args.connections:>10.1f} KB")
+        print(f"idle CPU              {idle_cpu / args.hold * 100:>10.2f} % over {args.hold:.0f}s")
+        print(f"broadcasts delivered  {len(latencies):>10}/{args.broadcasts}")
+        print(f"CPU / broadcast       {broadcast_cpu / max(args.broadcasts, 1) * 1000:>10.2f} ms "
+              f"({broadcast_cpu / max(args.broadcasts, 1) / args.connections * 1e6:.1f} us per recipient)")
+        print(f"fan-out latency       p50 {percentile(latencies, 50):.1f} ms  p99 {percentile(latencies, 99):.1f} ms")
+        return 0 if len(latencies) == args.broadcasts else 1
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ares Club Socket.IO connection soak benchmark")
+    parser.add_argument("--connections", type=int, default=500)
+    parser.add_argument("--broadcasts", type=int, default=50)
+    parser.add_argument("--hold", type=float, default=10, help="seconds to hold idle connections")
+    parser.add_argument("--verbose-logging", action="store_true", help="old profile: log every packet")
+    parser.add_argument("--websocket-only", action="store_true")
+    parser.add_argument("--no-deflate", dest="deflate", action="store_false", help="disable permessage-deflate")
+    return run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    sys.exit(main())